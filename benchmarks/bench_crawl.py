@@ -0,0 +1,260 @@
+"""
+End-to-end crawl throughput against a local synthetic site graph.
+
+Runs AsyncWebCrawler and AsyncScraper against site_graph.SiteGraph served
+from a separate process (optionally behind a local SOCKS5 stand-in for Tor)
+and reports pages/s, p50/p99 fetch latency, peak RSS and CPU per page.
+Results are written as JSON so releases can be compared:
+
+    python benchmarks/bench_crawl.py --pages 500 --fan-out 8 --latency-ms 20
+    python benchmarks/bench_crawl.py --socks --compare benchmarks/results/crawl-0.3.0-....json
+"""
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+from pathlib import Path
+
+from site_graph import SiteGraph
+
+from omni_scraper.config.settings import config
+from omni_scraper.core.fetcher import Fetcher
+from omni_scraper.modules.async_scraper import AsyncScraper
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGETS = ("crawler", "scraper")
+# Metrics where a larger value is the better one
+HIGHER_IS_BETTER = {"pages_per_s"}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+async def _serve(graph_kwargs, socks, ready):
+    graph = SiteGraph(**graph_kwargs)
+    await graph.start()
+    stub = None
+    if socks:
+        sys.path.insert(0, str(ROOT))
+        from tests.socks_stub import SocksStub
+
+        stub = await SocksStub().start()
+    ready.put((graph.port, stub.port if stub else None))
+    await asyncio.Event().wait()
+
+
+def serve(graph_kwargs, socks, ready):
+    """Server process: the site graph and, with ``socks``, the SOCKS stand-in."""
+    asyncio.run(_serve(graph_kwargs, socks, ready))
+
+
+def _time_fetches(latencies):
+    """Wraps Fetcher.fetch to record each request's latency in ms."""
+    fetch = Fetcher.fetch
+
+    @functools.wraps(fetch)
+    async def timed(self, url):
+        start = time.perf_counter()
+        try:
+            return await fetch(self, url)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    Fetcher.fetch = timed
+
+
+async def _crawl(graph, concurrency, use_tor):
+    crawler = AsyncWebCrawler(
+        seeds=[graph.url(0)],
+        concurrency=concurrency,
+        max_depth=graph.pages,
+        max_pages=graph.pages,
+        use_tor=use_tor,
+        keep_results=False,
+    )
+    crawler.onion_only = False
+    crawler.delay = 0
+    await crawler.run()
+    return crawler.pages, crawler.fetched - crawler.pages
+
+
+async def _scrape(graph, concurrency, use_tor):
+    scraper = AsyncScraper(use_tor=use_tor)
+    ok = errors = 0
+    try:
+        async for result in scraper.scrape_many(graph.urls(), concurrency):
+            if "error" in result:
+                errors += 1
+            else:
+                ok += 1
+    finally:
+        scraper.close()
+    return ok, errors
+
+
+def run_target(target, graph_kwargs, port, socks_port, concurrency, log_level):
+    """Runs one target in a fresh process so RSS and CPU are its own."""
+    # Loggers are configured on first use, so this applies to all of them
+    config.config["logging"]["level"] = log_level
+    if socks_port:
+        config.config["tor"]["socks_ports"] = [socks_port]
+    graph = SiteGraph(**graph_kwargs)
+    graph.port = port
+    latencies = []
+    _time_fetches(latencies)
+    run = _crawl if target == "crawler" else _scrape
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    pages, errors = asyncio.run(run(graph, concurrency, bool(socks_port)))
+    wall = time.perf_counter() - start
+    self_after = resource.getrusage(resource.RUSAGE_SELF)
+    # Parse workers are reaped when the pool closes, so their CPU counts here
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = sum(
+        getattr(after, f) - getattr(before, f)
+        for before, after in ((self_before, self_after), (children_before, children_after))
+        for f in ("ru_utime", "ru_stime")
+    )
+    return {
+        "pages": pages,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "pages_per_s": round(pages / wall, 2) if wall else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 0.50), 2),
+        "latency_p99_ms": round(percentile(latencies, 0.99), 2),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(self_after.ru_maxrss / 1024, 1),
+        "peak_rss_parse_worker_mb": round(children_after.ru_maxrss / 1024, 1),
+        "cpu_ms_per_page": round(cpu * 1000 / pages, 3) if pages else 0.0,
+    }
+
+
+def _environment():
+    try:
+        version = metadata.version("omni-scraper")
+    except metadata.PackageNotFoundError:
+        version = "dev"
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": version,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+    }
+
+
+def compare(old, new):
+    """Prints each metric of ``new`` next to ``old`` with the relative change."""
+    print(f"\nvs {old['environment']['version']} ({old['environment'].get('commit')})")
+    print(f"{'target':<8} {'metric':<26} {'old':>10} {'new':>10} {'change':>8}")
+    for target, metrics in new["results"].items():
+        before = old["results"].get(target, {})
+        for metric, value in metrics.items():
+            if metric not in before or metric in ("pages", "errors"):
+                continue
+            change = (value - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            verdict = ""
+            if abs(change) >= 5:
+                better = (change > 0) == (metric in HIGHER_IS_BETTER)
+                verdict = " better" if better else " worse"
+            print(
+                f"{target:<8} {metric:<26} {before[metric]:>10} {value:>10} "
+                f"{change:>+7.1f}%{verdict}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--fan-out", type=int, default=8)
+    parser.add_argument("--page-kb", type=int, default=20)
+    parser.add_argument("--hosts", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=1, help="keep the median run by pages/s")
+    parser.add_argument("--socks", action="store_true", help="route through a local SOCKS5 stand-in")
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--out-dir", type=Path, default=ROOT / "benchmarks" / "results")
+    parser.add_argument("--compare", type=Path, help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    graph_kwargs = {
+        "pages": args.pages, "fan_out": args.fan_out, "page_kb": args.page_kb,
+        "hosts": args.hosts, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate, "seed": args.seed,
+    }
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    server = ctx.Process(target=serve, args=(graph_kwargs, args.socks, ready), daemon=True)
+    server.start()
+    try:
+        port, socks_port = ready.get(timeout=30)
+        results = {}
+        print(f"{'target':<8} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'rss MB':>7} {'cpu ms/pg':>10}")
+        for target in args.targets:
+            runs = []
+            for _ in range(args.repeat):
+                with ProcessPoolExecutor(1, mp_context=ctx) as executor:
+                    runs.append(executor.submit(
+                        run_target, target, graph_kwargs, port, socks_port,
+                        args.concurrency, args.log_level,
+                    ).result())
+            rates = [r["pages_per_s"] for r in runs]
+            best = runs[rates.index(statistics.median_low(rates))]
+            results[target] = best
+            print(
+                f"{target:<8} {best['pages_per_s']:>9.1f} {best['latency_p50_ms']:>8.1f} "
+                f"{best['latency_p99_ms']:>8.1f} {best['peak_rss_mb']:>7.1f} "
+                f"{best['cpu_ms_per_page']:>10.2f}"
+            )
+    finally:
+        server.terminate()
+        server.join()
+
+    report = {
+        "benchmark": "crawl",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "params": {
+            **graph_kwargs, "concurrency": args.concurrency,
+            "socks": args.socks, "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    name = f"crawl-{report['environment']['version']}-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    path = args.out_dir / name
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Entity extraction throughput: extract_entities vs the legacy email regex.
+
+    python benchmarks/bench_entities.py --size-kb 4000 --repeat 3
+"""
+import argparse
+import re
+import time
+
+from corpus import entity_text
+
+from omni_scraper.utils.entities import extract_entities
+from omni_scraper.utils.helpers import extract_emails
+
+# utils.helpers.EMAIL_RE before the entity engine
+LEGACY_EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+
+
+def legacy_emails(text):
+    return list(set(LEGACY_EMAIL_RE.findall(text)))
+
+
+def mb_per_s(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return len(text) / 1e6 / ((time.perf_counter() - start) / repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    candidates = [
+        ("legacy email regex", legacy_emails),
+        ("extract_emails", extract_emails),
+        ("extract_entities (all)", extract_entities),
+    ]
+    print(f"{'corpus':<12} {'path':<24} {'MB/s':>8}")
+    for corpus, long_runs in (("typical", False), ("long-runs", True)):
+        text = entity_text(args.size_kb, long_runs=long_runs)
+        for name, fn in candidates:
+            print(f"{corpus:<12} {name:<24} {mb_per_s(fn, text, args.repeat):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Single-pass extract_page vs the previous two-tree BeautifulSoup path.
+
+    python benchmarks/bench_extraction.py --page-kb 5000 --repeat 3
+"""
+import argparse
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+from corpus import synthetic_page
+
+from omni_scraper.utils.helpers import extract_emails, is_onion, normalize_url
+from omni_scraper.utils.parsing import available_backends, extract_page
+
+
+def legacy_extract(html, url):
+    """AsyncScraper.scrape before extract_page: two trees, two urljoins per anchor."""
+    text = BeautifulSoup(html, "html.parser").get_text(separator=" ")
+    emails = extract_emails(text)
+    links = [
+        normalize_url(url, a["href"])
+        for a in BeautifulSoup(html, "html.parser").find_all("a", href=True)
+        if is_onion(normalize_url(url, a["href"]))
+    ]
+    return {"emails": emails, "links": links, "snippet": text.strip()[:5000]}
+
+
+def measure(fn, html, repeat):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    elapsed = (time.perf_counter() - start) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--page-kb", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    html = synthetic_page(0, args.page_kb)
+    url = "http://bench.onion/"
+    candidates = [("legacy (2x bs4)", lambda h: legacy_extract(h, url))]
+    for backend in available_backends():
+        candidates.append(
+            (f"extract_page[{backend}]", lambda h, b=backend: extract_page(h, url, b, 5000))
+        )
+
+    print(f"page size: {len(html) / 1e6:.1f} MB")
+    print(f"{'path':<28} {'ms/page':>9} {'MB/s':>7} {'peak MB':>8}")
+    for name, fn in candidates:
+        elapsed, peak = measure(fn, html, args.repeat)
+        print(
+            f"{name:<28} {elapsed * 1000:>9.1f} {len(html) / 1e6 / elapsed:>7.1f} {peak / 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Findings per fetched page: breadth-first vs best-first frontier.
+
+Crawls a synthetic site graph (site_graph.SiteGraph with ``hints``: some
+links to email-bearing pages carry "contact" anchor text and paths, and
+those pages link to each other) under a page budget smaller than the site,
+once per frontier mode, and reports distinct emails found and pages
+fetched per email. Lower pages/email means the budget went to better pages.
+
+    python benchmarks/bench_frontier.py --pages 3000 --budget 300 --hints 0.5
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+from bench_crawl import _environment, serve
+from site_graph import SiteGraph
+
+from omni_scraper.config.settings import config
+from omni_scraper.modules.async_web_crawler import FRONTIERS, AsyncWebCrawler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def crawl(graph, frontier, budget, concurrency):
+    crawler = AsyncWebCrawler(
+        seeds=[graph.url(0)],
+        concurrency=concurrency,
+        max_depth=graph.pages,
+        max_pages=budget,
+        use_tor=False,
+        frontier=frontier,
+    )
+    crawler.onion_only = False
+    crawler.delay = 0
+    crawler.near_dups = None  # synthetic pages are all alike
+    start = time.perf_counter()
+    results = await crawler.run()
+    wall = time.perf_counter() - start
+    emails = {e for r in results for e in r["emails"]}
+    return {
+        "fetched": crawler.fetched,
+        "emails": len(emails),
+        "pages_per_email": round(crawler.fetched / len(emails), 2) if emails else None,
+        "wall_s": round(wall, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=3000)
+    parser.add_argument("--budget", type=int, default=300, help="max_pages per crawl")
+    parser.add_argument("--fan-out", type=int, default=8)
+    parser.add_argument("--page-kb", type=int, default=4)
+    parser.add_argument("--hosts", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--hints", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--out-dir", type=Path, default=ROOT / "benchmarks" / "results")
+    args = parser.parse_args()
+    config.config["logging"]["level"] = args.log_level
+
+    graph_kwargs = {
+        "pages": args.pages, "fan_out": args.fan_out, "page_kb": args.page_kb,
+        "hosts": args.hosts, "latency_ms": args.latency_ms, "jitter_ms": 0.0,
+        "seed": args.seed, "hints": args.hints,
+    }
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    server = ctx.Process(target=serve, args=(graph_kwargs, False, ready), daemon=True)
+    server.start()
+    results = {}
+    try:
+        graph = SiteGraph(**graph_kwargs)
+        graph.port, _ = ready.get(timeout=30)
+        print(f"{'frontier':<9} {'fetched':>8} {'emails':>7} {'pages/email':>12} {'wall s':>7}")
+        for frontier in FRONTIERS:
+            result = results[frontier] = asyncio.run(
+                crawl(graph, frontier, args.budget, args.concurrency)
+            )
+            print(
+                f"{frontier:<9} {result['fetched']:>8} {result['emails']:>7} "
+                f"{result['pages_per_email'] or 0:>12.2f} {result['wall_s']:>7.2f}"
+            )
+    finally:
+        server.terminate()
+        server.join()
+
+    report = {
+        "benchmark": "frontier",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "params": {**graph_kwargs, "budget": args.budget, "concurrency": args.concurrency},
+        "results": results,
+    }
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    name = f"frontier-{report['environment']['version']}-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    path = args.out_dir / name
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
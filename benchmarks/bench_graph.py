@@ -0,0 +1,65 @@
+"""
+Host ranking speed on a large synthetic link graph.
+
+Builds a LinkGraph with power-law in-links (a few hub hosts draw most
+links, as onion directories do), saves and reloads it, and times the
+`graph` command's work: host edge extraction and PageRank. Needs NumPy.
+
+    python benchmarks/bench_graph.py --pages 200000 --fan-out 20 --hosts 20000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from omni_scraper.core.link_graph import LinkGraph, rank_hosts
+
+
+def synthetic(pages, fan_out, hosts, seed):
+    """A graph of ``pages`` crawled pages built straight into the CSR buffers."""
+    rng = np.random.default_rng(seed)
+    graph = LinkGraph()
+    graph.hosts = [f"{h:016x}.onion" for h in range(hosts)]
+    graph.urls = [f"http://{graph.hosts[p % hosts]}/p/{p}" for p in range(pages)]
+    graph.url_host.frombytes((np.arange(pages) % hosts).astype(np.uint32).tobytes())
+    graph.row_node.frombytes(np.arange(pages, dtype=np.uint32).tobytes())
+    counts = rng.poisson(fan_out, pages)
+    graph.indptr.frombytes(np.cumsum(counts).astype(np.uint64).tobytes())  # after the initial 0
+    # Zipf-distributed targets: low page numbers (and so low hosts) are the hubs
+    targets = (rng.zipf(1.3, counts.sum()) - 1) % pages
+    graph.indices.frombytes(targets.astype(np.uint32).tobytes())
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200_000)
+    parser.add_argument("--fan-out", type=int, default=20)
+    parser.add_argument("--hosts", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    graph = synthetic(args.pages, args.fan_out, args.hosts, args.seed)
+    print(graph.summary())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "links.graph"
+        start = time.perf_counter()
+        graph.save(path)
+        saved = time.perf_counter()
+        graph = LinkGraph.load(path)
+        loaded = time.perf_counter()
+        size = path.stat().st_size
+    rows = rank_hosts(graph)
+    ranked = time.perf_counter()
+    print(f"file          {size / 1048576:8.1f} MB")
+    print(f"save          {saved - start:8.2f} s")
+    print(f"load          {loaded - saved:8.2f} s")
+    print(f"rank          {ranked - loaded:8.2f} s  ({graph.edges / (ranked - loaded) / 1e6:.1f}M edges/s)")
+    for row in rows[:5]:
+        print(f"  {row['pagerank']:.5f} in={row['in_degree']} {row['host']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Event-loop lag caused by logging.
+
+Runs a burst of coroutines that each log a per-URL "Fetched" line per
+simulated fetch, alongside a probe task that sleeps 1 ms at a time and
+records how late it wakes up. Each logging mode runs in its own process:
+
+- direct: file and console handlers on the logger (writes on the loop);
+- queue: records handed to the logging thread (``logging.queue``);
+- queue+rate: the same, with per-template rate limiting (``logging.rate_limit``).
+
+Reports probe lag p50/p99/max, workload wall time, records written and the
+time to drain the queue at shutdown. Console output goes to a scratch file.
+
+    python benchmarks/bench_logging.py --tasks 200 --records 100
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_crawl import _environment, percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = {
+    "direct": {"queue": False, "rate_limit": 0},
+    "queue": {"queue": True, "rate_limit": 0},
+    "queue+rate": {"queue": True, "rate_limit": 20},
+}
+
+
+async def workload(logger, tasks, records, probe_ms):
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        interval = probe_ms / 1000
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append((time.perf_counter() - start - interval) * 1000)
+
+    async def fetcher(task):
+        for n in range(records):
+            await asyncio.sleep(0)
+            logger.info("Fetched %s (len=%d)", f"http://host{task}.onion/page/{n}", 4096 + n)
+
+    probing = asyncio.create_task(probe())
+    await asyncio.sleep(probe_ms / 1000 * 5)
+    start = time.perf_counter()
+    await asyncio.gather(*(fetcher(t) for t in range(tasks)))
+    wall = time.perf_counter() - start
+    done.set()
+    await probing
+    return lags, wall
+
+
+def _run_mode(settings, tasks, records, probe_ms, out):
+    from omni_scraper.config.settings import config
+    from omni_scraper.utils import logger as logging_setup
+
+    config.config["logging"].update(settings, level="INFO", file="bench_logging.log")
+    scratch = Path(tempfile.mkdtemp(prefix="bench_logging-"))
+    config.base_dir = scratch  # logs/ goes under it
+    sys.stderr = open(scratch / "console.log", "w")
+    logger = logging_setup.setup_logger("omni_scraper.bench")
+
+    lags, wall = asyncio.run(workload(logger, tasks, records, probe_ms))
+    start = time.perf_counter()
+    logging_setup.stop_logging()
+    drain = time.perf_counter() - start
+    with open(scratch / "logs" / "bench_logging.log", "rb") as f:
+        written = sum(1 for _ in f)
+    out.put(
+        {
+            "lag_p50_ms": round(percentile(lags, 0.50), 3),
+            "lag_p99_ms": round(percentile(lags, 0.99), 3),
+            "lag_max_ms": round(max(lags, default=0.0), 3),
+            "probes": len(lags),
+            "wall_s": round(wall, 3),
+            "drain_s": round(drain, 3),
+            "records_written": written,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--records", type=int, default=100, help="log records per task")
+    parser.add_argument("--probe-ms", type=float, default=1.0)
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES))
+    parser.add_argument("--out-dir", type=Path, default=ROOT / "benchmarks" / "results")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    print(
+        f"{'mode':<11} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} "
+        f"{'wall s':>7} {'drain s':>8} {'written':>8}"
+    )
+    for mode in args.modes:
+        out = ctx.Queue()
+        proc = ctx.Process(
+            target=_run_mode, args=(MODES[mode], args.tasks, args.records, args.probe_ms, out)
+        )
+        proc.start()
+        result = results[mode] = out.get(timeout=600)
+        proc.join()
+        print(
+            f"{mode:<11} {result['lag_p50_ms']:>7.2f} {result['lag_p99_ms']:>7.2f} "
+            f"{result['lag_max_ms']:>7.2f} {result['wall_s']:>7.2f} "
+            f"{result['drain_s']:>8.2f} {result['records_written']:>8}"
+        )
+
+    report = {
+        "benchmark": "logging",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "params": {"tasks": args.tasks, "records": args.records, "probe_ms": args.probe_ms},
+        "results": results,
+    }
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    name = f"logging-{report['environment']['version']}-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    path = args.out_dir / name
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
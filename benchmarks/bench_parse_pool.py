@@ -0,0 +1,49 @@
+"""
+Parse-stage throughput: pages/sec for each parser backend and pool size.
+
+    python benchmarks/bench_parse_pool.py --pages 200 --page-kb 500 --sizes 0 1 2 4
+"""
+import argparse
+import asyncio
+import time
+
+from corpus import synthetic_page
+
+from omni_scraper.core.parse_pool import ParsePool
+from omni_scraper.utils.parsing import available_backends
+
+
+async def run_once(pages, workers, backend, concurrency):
+    async with ParsePool(workers=workers, backend=backend) as pool:
+        # Warm the pool up so process start-up is not measured
+        await pool.parse(pages[0], "http://bench.onion/")
+        queue = list(pages)
+        start = time.perf_counter()
+
+        async def feeder():
+            while queue:
+                await pool.parse(queue.pop(), "http://bench.onion/")
+
+        await asyncio.gather(*(feeder() for _ in range(concurrency)))
+        return len(pages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--page-kb", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--backends", nargs="+", default=available_backends())
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    pages = [synthetic_page(n, args.page_kb) for n in range(args.pages)]
+    print(f"{'backend':<12} {'workers':>7} {'pages/s':>9}")
+    for backend in args.backends:
+        for size in args.sizes:
+            rate = asyncio.run(run_once(pages, size, backend, args.concurrency))
+            print(f"{backend:<12} {size:>7} {rate:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
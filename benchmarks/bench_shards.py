@@ -0,0 +1,113 @@
+"""
+Throughput of sharded crawling (crawl --workers N) as N grows.
+
+Crawls the same synthetic site graph (site_graph.SiteGraph, served from a
+separate process as in bench_crawl.py) with 1, 2, 4... shard processes and
+reports pages/s and the speedup over one shard. Per-shard concurrency is
+fixed, so N shards keep N times as many requests in flight; with the
+default per-page latency the gain is mostly parallel parsing and I/O, and
+it levels off at the number of CPUs.
+
+    python benchmarks/bench_shards.py --pages 1000 --workers 1 2 4
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+from bench_crawl import _environment, serve
+
+from omni_scraper.config.settings import config
+from omni_scraper.modules.sharded_crawler import ShardedCrawler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_shards(workers, seed_url, pages, concurrency, log_level):
+    overrides = {
+        "crawler": {"onion_only": False, "request_delay": 0},
+        "logging": {"level": log_level},
+    }
+    config.config["logging"]["level"] = log_level
+    crawler = ShardedCrawler(
+        workers,
+        seeds=[seed_url],
+        concurrency=concurrency,
+        max_depth=pages,
+        max_pages=pages,
+        use_tor=False,
+        keep_results=False,
+        overrides=overrides,
+    )
+    start = time.perf_counter()
+    crawler.run()
+    wall = time.perf_counter() - start
+    return {
+        "pages": crawler.pages,
+        "wall_s": round(wall, 3),
+        "pages_per_s": round(crawler.pages / wall, 2) if wall else 0.0,
+        "forwarded": sum(s["forwarded"] for s in crawler.shard_stats.values()),
+        "per_shard": [crawler.shard_stats.get(i, {}).get("pages") for i in range(workers)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--fan-out", type=int, default=8)
+    parser.add_argument("--page-kb", type=int, default=20)
+    parser.add_argument("--hosts", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=16, help="per shard")
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--out-dir", type=Path, default=ROOT / "benchmarks" / "results")
+    args = parser.parse_args()
+
+    graph_kwargs = {
+        "pages": args.pages, "fan_out": args.fan_out, "page_kb": args.page_kb,
+        "hosts": args.hosts, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+        "seed": args.seed,
+    }
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    server = ctx.Process(target=serve, args=(graph_kwargs, False, ready), daemon=True)
+    server.start()
+    results = {}
+    try:
+        port, _ = ready.get(timeout=30)
+        # SiteGraph.url(0), without building the graph here
+        seed_url = f"http://127.0.0.1:{port}/p/0"
+        print(f"{'workers':>7} {'pages':>6} {'pages/s':>9} {'speedup':>8} {'forwarded':>10}")
+        for workers in args.workers:
+            result = run_shards(workers, seed_url, args.pages, args.concurrency, args.log_level)
+            base = results.get(args.workers[0], result)["pages_per_s"]
+            result["speedup"] = round(result["pages_per_s"] / base, 2) if base else 0.0
+            results[workers] = result
+            print(
+                f"{workers:>7} {result['pages']:>6} {result['pages_per_s']:>9.1f} "
+                f"{result['speedup']:>7.2f}x {result['forwarded']:>10}"
+            )
+    finally:
+        server.terminate()
+        server.join()
+
+    report = {
+        "benchmark": "shards",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "params": {**graph_kwargs, "concurrency": args.concurrency},
+        "results": results,
+    }
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    name = f"shards-{report['environment']['version']}-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    path = args.out_dir / name
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Deterministic synthetic pages shared by the benchmark scripts."""
+import random
+import string
+
+
+def synthetic_page(n, size_kb, seed=0):
+    rnd = random.Random(seed + n)
+    chunks, total = [], 0
+    while total < size_kb * 1024:
+        word = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 10)))
+        if rnd.random() < 0.05:
+            chunk = f'<a href="/page/{rnd.randint(0, 10_000)}">{word}</a> '
+        elif rnd.random() < 0.01:
+            chunk = f"<p>{word}@{word}.onion</p>"
+        else:
+            chunk = f"<span>{word}</span> "
+        chunks.append(chunk)
+        total += len(chunk)
+    return f"<html><body><div>{''.join(chunks)}</div></body></html>"
+
+
+def entity_text(size_kb, seed=0, long_runs=False):
+    """
+    Page text sprinkled with emails, onion-like hosts, numbers and hex.
+    With ``long_runs`` it also carries multi-KB runs of word characters,
+    the input that makes the legacy email regex backtrack.
+    """
+    rnd = random.Random(seed)
+    chunks, total = [], 0
+    while total < size_kb * 1024:
+        word = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 10)))
+        roll = rnd.random()
+        if roll < 0.01:
+            chunk = f"{word}@{word}.com "
+        elif roll < 0.015:
+            chunk = "".join(rnd.choices("abcdefghijklmnopqrstuvwxyz234567", k=56)) + ".onion "
+        elif roll < 0.05:
+            chunk = f"{rnd.randint(0, 10**6)} "
+        elif roll < 0.052:
+            chunk = f"0x{rnd.getrandbits(160):040x} "
+        elif long_runs and roll < 0.054:
+            chunk = "a" * 4096 + ". "
+        else:
+            chunk = word + " "
+        chunks.append(chunk)
+        total += len(chunk)
+    return "".join(chunks)
@@ -0,0 +1,119 @@
+"""
+A synthetic onion-like site graph served by a local aiohttp server.
+
+Pages are spread over ``hosts`` loopback addresses (127.0.0.1, 127.0.0.2, ...
+all on one port) so per-host politeness and limits behave as they would
+across many onion services. Every page links to the next page, so the whole
+graph is reachable from ``/p/0``, plus ``fan_out - 1`` random pages.
+Every tenth page lists an email address. With ``hints`` > 0, that fraction
+of links to those pages reads "contact staff" and points at
+``/p/<n>/contact``, and of the random links on those pages, so they cluster
+the way contact and directory pages do on real sites.
+"""
+import asyncio
+import random
+import string
+
+from aiohttp import web
+
+
+class SiteGraph:
+    def __init__(
+        self,
+        pages=500,
+        fan_out=8,
+        page_kb=20,
+        hosts=8,
+        latency_ms=20.0,
+        jitter_ms=10.0,
+        error_rate=0.0,
+        seed=0,
+        hints=0.0,
+    ):
+        self.pages = pages
+        self.fan_out = max(1, fan_out)
+        self.page_kb = page_kb
+        self.hosts = max(1, min(hosts, 254))
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self.hints = hints
+        self.port = None
+        self._rnd = random.Random(seed)
+
+    def params(self):
+        return {
+            k: getattr(self, k)
+            for k in ("pages", "fan_out", "page_kb", "hosts", "latency_ms",
+                      "jitter_ms", "error_rate", "seed", "hints")
+        }
+
+    def host(self, n):
+        return f"127.0.0.{1 + n % self.hosts}"
+
+    def url(self, n):
+        return f"http://{self.host(n)}:{self.port}/p/{n}"
+
+    def urls(self):
+        return [self.url(n) for n in range(self.pages)]
+
+    def has_email(self, n):
+        return n % 10 == 0
+
+    def links(self, n):
+        rnd = random.Random(self.seed * 1_000_003 + n)
+        targets = [(n + 1) % self.pages]
+        targets += [rnd.randrange(self.pages) for _ in range(self.fan_out - 1)]
+        if self.hints and self.has_email(n):
+            targets[1:] = [
+                rnd.randrange(0, self.pages, 10) if rnd.random() < self.hints else t
+                for t in targets[1:]
+            ]
+        return targets
+
+    def _anchor(self, n, t):
+        if self.hints and self.has_email(t):
+            if random.Random(self.seed * 7_919 + n * 104_729 + t).random() < self.hints:
+                return f'<a href="{self.url(t)}/contact">contact staff</a> '
+        return f'<a href="{self.url(t)}">page {t}</a> '
+
+    def page(self, n):
+        rnd = random.Random(self.seed + n)
+        chunks = [self._anchor(n, t) for t in self.links(n)]
+        if self.has_email(n):
+            chunks.append(f"<p>contact: admin{n}@site{n % self.hosts}.onion</p>")
+        total = sum(map(len, chunks))
+        while total < self.page_kb * 1024:
+            word = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 10)))
+            chunk = f"<span>{word}</span> "
+            chunks.append(chunk)
+            total += len(chunk)
+        return f"<html><head><title>page {n}</title></head><body>{''.join(chunks)}</body></html>"
+
+    async def _handle(self, request):
+        n = int(request.match_info["n"])
+        if not 0 <= n < self.pages:
+            raise web.HTTPNotFound()
+        delay = self.latency_ms + self.jitter_ms * (2 * self._rnd.random() - 1)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+        if self._rnd.random() < self.error_rate:
+            return web.Response(status=503, text="injected error")
+        return web.Response(text=self.page(n), content_type="text/html")
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/p/{n}", self._handle)
+        app.router.add_get("/p/{n}/{slug}", self._handle)
+        return app
+
+    async def start(self):
+        """Binds every host address on one free port; returns the runner."""
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, self.host(0), 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        for h in range(1, self.hosts):
+            await web.TCPSite(runner, self.host(h), self.port).start()
+        return runner
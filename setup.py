@@ -29,7 +29,13 @@ setup(
             "black>=22.0.0",
             "isort>=5.10.0","pytest-cov>=3.0.0",
             "mypy>=0.950"
-        ]
+        ],
+        "fast": [
+            "lxml>=4.9.0",
+            "selectolax>=0.3.12",
+        ],
+        "zstd": ["zstandard>=0.19.0"],
+        "graph": ["numpy>=1.22"],
     },
     entry_points={
         "console_scripts": [
@@ -1,4 +1,11 @@
-import asyncio
+"""
+Command-line entry point.
+
+Only click is imported up front: each command imports the modules it
+needs (aiohttp, requests, shodan, stem, ...) when it runs, and config and
+logging initialize on first use, so ``--help`` and short one-off commands
+start quickly.
+"""
 import subprocess
 import sys
 from pathlib import Path
@@ -6,15 +13,53 @@ from pathlib import Path
 import click
 
 from .config.settings import config
-from .modules.async_scraper import AsyncScraper
-from .modules.async_web_crawler import AsyncWebCrawler
-from .modules.breach_checker import BreachChecker
-from .modules.shodan_lookup import ShodanLookup
 from .utils.logger import setup_logger
-from .utils.output_handler import OutputHandler
 
 logger = setup_logger(__name__)
-output_handler = OutputHandler()
+_output = None
+
+# Kept in sync with core.http_cache.CACHE_MODES (not imported here to keep startup light)
+CACHE_MODES = ("off", "read-write", "offline")
+
+
+def _output_handler():
+    """The shared OutputHandler, created (with its output directory) on first use."""
+    global _output
+    if _output is None:
+        from .utils.output_handler import OutputHandler
+
+        _output = OutputHandler()
+    return _output
+
+
+cache_mode_option = click.option(
+    "--cache-mode",
+    "cache_mode",
+    type=click.Choice(CACHE_MODES),
+    default=None,
+    help="Response cache: off, read-write (revalidate with 304s) or offline.",
+)
+
+
+def lookup_cache_options(f):
+    f = click.option(
+        "--refresh", is_flag=True, help="Ignore cached lookups but store fresh answers."
+    )(f)
+    return click.option("--no-cache", "no_cache", is_flag=True, help="Bypass the lookup cache.")(f)
+
+
+def _lookup_cache(no_cache, refresh):
+    if no_cache or not config.get("lookup_cache.enabled", True):
+        return None
+    from .core.result_cache import ResultCache
+
+    return ResultCache(refresh=refresh)
+
+
+def _close_lookup_cache(cache):
+    if cache is not None:
+        click.echo(f"[+] {cache.summary()}")
+        cache.close()
 
 
 @click.group()
@@ -29,124 +74,492 @@ def cli():
 @click.option("-m", "--max-pages", "max_pages", type=int, default=None)
 @click.option("-c", "--concurrency", type=int, default=None)
 @click.option("--no-tor", is_flag=True)
-@click.option("--format", "fmt", default="json", type=click.Choice(["json", "csv"]))
-def crawl_cmd(seeds, max_depth, max_pages, concurrency, no_tor, fmt):
+@click.option(
+    "--format", "fmt", default="json", type=click.Choice(["json", "csv", "jsonl"]),
+    help="csv/jsonl stream results to disk as pages complete.",
+)
+@click.option("--compress", type=click.Choice(["none", "gzip", "zstd"]), default=None)
+@click.option("--rotate-mb", "rotate_mb", type=float, default=None, help="Start a new file after N MB.")
+@click.option("--job-id", "job_id", default=None, help="Name for the crawl checkpoint.")
+@click.option("--resume", "resume_id", default=None, help="Resume a checkpointed job id.")
+@click.option(
+    "--workers", type=int, default=1,
+    help="Crawl with N processes, each owning a share of the hosts (no checkpointing).",
+)
+@click.option(
+    "--graph", "graph_path", default=None, type=click.Path(dir_okay=False),
+    help="Record the link graph to this file (rank it with: omni-scraper graph FILE).",
+)
+@click.option(
+    "--frontier", type=click.Choice(["fifo", "priority"]), default=None,
+    help="priority: fetch the most promising URLs first (weights under frontier: in config).",
+)
+@click.option(
+    "--incremental", is_flag=True,
+    help="Only fetch pages due for a revisit and only output new or changed pages.",
+)
+@cache_mode_option
+def crawl_cmd(
+    seeds,
+    max_depth,
+    max_pages,
+    concurrency,
+    no_tor,
+    fmt,
+    compress,
+    rotate_mb,
+    job_id,
+    resume_id,
+    workers,
+    graph_path,
+    frontier,
+    incremental,
+    cache_mode,
+):
     """Crawl seeds (accepts multiple). Example: omni-scraper crawl http://abc.onion"""
-    if not seeds:
+    import asyncio
+
+    from .core.crawl_state import new_job_id
+    from .modules.async_web_crawler import RESULT_FIELDS, AsyncWebCrawler
+
+    output_handler = _output_handler()
+    if workers > 1 and (job_id or resume_id):
+        click.echo("[-] --job-id/--resume are not supported with --workers")
+        sys.exit(2)
+    if resume_id:
+        job_id = resume_id
+    elif not seeds:
         seeds = tuple(config.get("crawler.seeds", []))
         if not seeds:
             click.echo("No seeds. Example: omni-scraper crawl http://example.onion")
             sys.exit(2)
     seeds = list(seeds)
-    click.echo(f"[+] Crawling seeds: {seeds}")
+    if workers == 1:
+        job_id = job_id or new_job_id()
+    if resume_id:
+        click.echo(f"[+] Resuming crawl job {job_id}")
+    elif workers > 1:
+        click.echo(f"[+] Crawling seeds: {seeds} with {workers} shard processes (not checkpointed)")
+    else:
+        click.echo(f"[+] Crawling seeds: {seeds} (job {job_id}, resume with --resume {job_id})")
     if not no_tor:
         subprocess.run(["sudo", "systemctl", "start", "tor"], check=False)
-    crawler = AsyncWebCrawler(
-        seeds=seeds,
-        concurrency=concurrency,
-        max_depth=max_depth,
-        max_pages=max_pages,
-        use_tor=not no_tor,
-    )
+    output_handler.format = fmt
+    sink = None
+    if fmt != "json":
+        sink = output_handler.open_stream(
+            "crawl_results", compression=compress, rotate_mb=rotate_mb, fields=RESULT_FIELDS
+        )
+    if workers > 1:
+        from .modules.sharded_crawler import ShardedCrawler
+
+        crawler = ShardedCrawler(
+            workers,
+            seeds=seeds,
+            concurrency=concurrency,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            use_tor=not no_tor,
+            sink=sink,
+            keep_results=sink is None,
+            cache_mode=cache_mode,
+            link_graph=graph_path,
+            frontier=frontier,
+            incremental=incremental,
+        )
+        run = crawler.run
+    else:
+        crawler = AsyncWebCrawler(
+            seeds=seeds,
+            concurrency=concurrency,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            use_tor=not no_tor,
+            job_id=job_id,
+            resume=bool(resume_id),
+            sink=sink,
+            keep_results=sink is None,
+            cache_mode=cache_mode,
+            link_graph=graph_path,
+            frontier=frontier,
+            incremental=incremental,
+        )
+
+        def run():
+            return asyncio.run(crawler.run())
+
     try:
-        results = asyncio.run(crawler.run())
+        results = run()
+        fetcher = getattr(crawler, "fetcher", None)  # per shard when sharded
+        if fetcher and fetcher.cache:
+            click.echo(f"[+] {fetcher.cache_summary()}")
+        if graph_path:
+            click.echo(f"[+] Link graph saved to {graph_path}")
+        if sink:
+            sink.close()
+            click.echo(f"[+] Streamed {sink.records} results to {', '.join(sink.paths)}")
+        else:
+            out_path = output_handler.save("crawl_results", results)
+            click.echo(f"[+] Saved to {out_path}")
+    except Exception as e:
+        logger.exception(f"Crawl failed: {e}")
+        click.echo(f"[-] Failed: {e}")
+        sys.exit(1)
+    finally:
+        if sink:
+            sink.close()  # no-op after a clean close; keeps partial output on errors
+
+
+@cli.command("graph")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--top", type=int, default=20, help="Hosts to print.")
+@click.option("--damping", type=float, default=None)
+@click.option(
+    "--format", "fmt", default="json", type=click.Choice(["json", "csv", "jsonl"]),
+    help="Export format for the full host ranking.",
+)
+def graph_cmd(path, top, damping, fmt):
+    """Rank hosts in a crawl's link graph (crawl --graph) by PageRank and in-degree."""
+    import time
+
+    from .core.link_graph import LinkGraph, rank_hosts
+
+    output_handler = _output_handler()
+    try:
+        start = time.perf_counter()
+        graph = LinkGraph.load(path)
+        click.echo(f"[+] Loaded {graph.summary()}")
+        rows = rank_hosts(
+            graph,
+            damping=damping or float(config.get("graph.damping", 0.85)),
+            max_iter=int(config.get("graph.max_iter", 100)),
+            tol=float(config.get("graph.tolerance", 1e-9)),
+        )
+        click.echo(f"[+] Ranked {len(rows)} hosts in {time.perf_counter() - start:.2f}s")
+        for row in rows[:top]:
+            click.echo(
+                f"{row['pagerank']:.6f}  in={row['in_degree']:<6} "
+                f"links={row['inbound_links']:<8} pages={row['pages']:<6} {row['host']}"
+            )
         output_handler.format = fmt
-        out_path = output_handler.save("crawl_results", results)
+        if fmt == "json":
+            out_path = output_handler.save("host_rank", rows)
+        else:
+            sink = output_handler.open_stream("host_rank")
+            with sink:
+                for row in rows:
+                    sink.write(row)
+            out_path = ", ".join(sink.paths)
         click.echo(f"[+] Saved to {out_path}")
     except Exception as e:
-        logger.exception(f"Crawl failed: {e}")
+        logger.exception(f"Graph ranking failed: {e}")
         click.echo(f"[-] Failed: {e}")
         sys.exit(1)
 
 
+def _read_lines(stream):
+    """Yields stripped, non-empty, non-comment lines from an input file."""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
 @cli.command("scrape")
-@click.argument("url")
+@click.argument("url", required=False)
+@click.option(
+    "-i", "--input", "input_file", type=click.File("r"), default=None,
+    help="File with one URL per line ('-' for stdin).",
+)
 @click.option("-s", "--save-html", is_flag=True)
 @click.option("--no-tor", is_flag=True)
-@click.option("--format", "fmt", default="json", type=click.Choice(["json", "csv"]))
-def scrape_cmd(url, save_html, no_tor, fmt):
-    """Scrape a single URL and extract emails, links, snippet."""
-    click.echo(f"[+] Scraping {url}")
+@click.option(
+    "--format", "fmt", default=None, type=click.Choice(["json", "csv", "jsonl"]),
+    help="Default: json for one URL, jsonl (streamed) for --input.",
+)
+@click.option("-c", "--concurrency", type=int, default=None, help="Scrapes in flight (batch).")
+@click.option("--limit", type=int, default=None, help="Total pooled connections.")
+@click.option("--limit-per-host", "limit_per_host", type=int, default=None)
+@cache_mode_option
+def scrape_cmd(
+    url, input_file, save_html, no_tor, fmt, concurrency, limit, limit_per_host, cache_mode
+):
+    """Scrape a URL, or a list with --input, and extract emails, links, snippet."""
+    import asyncio
+
+    from .modules.async_scraper import AsyncScraper
+    from .utils.helpers import safe_filename
+
+    output_handler = _output_handler()
+    if bool(url) == bool(input_file):
+        click.echo("Give either a URL or --input FILE. Example: omni-scraper scrape http://abc.onion")
+        sys.exit(2)
+    if input_file and fmt == "json":
+        click.echo("Batch scrapes stream results; use --format jsonl or csv.")
+        sys.exit(2)
     if not no_tor:
         subprocess.run(["sudo", "systemctl", "start", "tor"], check=False)
-    scraper = AsyncScraper(use_tor=not no_tor)
-    html_path = None
+    scraper = AsyncScraper(use_tor=not no_tor, cache_mode=cache_mode)
+    scraper.limit = limit or scraper.limit
+    scraper.limit_per_host = limit_per_host or scraper.limit_per_host
+    html_dir = None
     if save_html:
-        safe_name = url.replace("://", "_").replace("/", "_")
-        html_path = (
-            Path(config.get("output.directory", "data/outputs")) / f"{safe_name}.html"
-        )
-        html_path.parent.mkdir(parents=True, exist_ok=True)
+        html_dir = Path(config.get("output.directory", "data/outputs"))
+        html_dir.mkdir(parents=True, exist_ok=True)
     try:
-        result = asyncio.run(
-            scraper.scrape(
-                url,
-                save_html=save_html,
-                html_path=str(html_path) if html_path else None,
+        if input_file:
+            _scrape_batch(scraper, _read_lines(input_file), fmt or "jsonl", concurrency, html_dir)
+        else:
+            click.echo(f"[+] Scraping {url}")
+            html_path = html_dir / safe_filename(url) if html_dir else None
+            result = asyncio.run(
+                scraper.scrape(
+                    url,
+                    save_html=save_html,
+                    html_path=str(html_path) if html_path else None,
+                )
             )
-        )
-        output_handler.format = fmt
-        out_path = output_handler.save("scrape_result", result)
-        click.echo(f"[+] Saved to {out_path}")
+            if scraper.cache is not None:
+                click.echo(f"[+] {scraper.fetcher.cache_summary()}")
+            output_handler.format = fmt or "json"
+            out_path = output_handler.save("scrape_result", result)
+            click.echo(f"[+] Saved to {out_path}")
     except Exception as e:
         logger.exception(f"Scrape failed: {e}")
         click.echo(f"[-] Failed: {e}")
         sys.exit(1)
+    finally:
+        scraper.close()
+
+
+def _scrape_batch(scraper, urls, fmt, concurrency, html_dir):
+    import asyncio
+
+    output_handler = _output_handler()
+    output_handler.format = fmt
+    sink = output_handler.open_stream(
+        "scrape_results",
+        fields=[
+            "url", "status", "emails", "onions", "pgp_keys", "wallets", "links", "snippet", "error",
+        ],
+    )
+    click.echo(f"[+] Batch scrape (concurrency {concurrency or scraper.batch_concurrency})")
+
+    async def run():
+        ok = failed = 0
+        async for result in scraper.scrape_many(urls, concurrency, html_dir):
+            sink.write(result)
+            if "error" in result:
+                failed += 1
+            else:
+                ok += 1
+        return ok, failed
+
+    try:
+        ok, failed = asyncio.run(run())
+    finally:
+        sink.close()
+    if scraper.cache is not None:
+        click.echo(f"[+] {scraper.fetcher.cache_summary()}")
+    click.echo(f"[+] Scraped {ok} ok, {failed} failed; streamed to {', '.join(sink.paths)}")
 
 
 @cli.command("breach-check")
-@click.argument("email")
-@click.option("--format", "fmt", default="json", type=click.Choice(["json", "csv"]))
-def breach_cmd(email, fmt):
-    """Check email against Intelligence X leaks."""
-    click.echo(f"[+] Checking Intelligence X for {email}")
+@click.argument("email", required=False)
+@click.option(
+    "-i", "--input", "input_file", type=click.File("r"), default=None,
+    help="File with one email per line ('-' for stdin).",
+)
+@click.option(
+    "--format", "fmt", default=None, type=click.Choice(["json", "csv", "jsonl"]),
+    help="Default: json for one email, jsonl (streamed) for --input.",
+)
+@click.option("-c", "--concurrency", type=int, default=None, help="Lookups in flight (batch).")
+@click.option("--job-id", "job_id", default=None, help="Name for the batch checkpoint.")
+@click.option("--resume", "resume_id", default=None, help="Skip emails already checked by a job.")
+@lookup_cache_options
+def breach_cmd(email, input_file, fmt, concurrency, job_id, resume_id, no_cache, refresh):
+    """Check email(s) against Intelligence X leaks."""
+    from .modules.breach_checker import BreachChecker
+
+    output_handler = _output_handler()
+    if bool(email) == bool(input_file):
+        click.echo("Give either an EMAIL or --input FILE. Example: omni-scraper breach-check a@b.com")
+        sys.exit(2)
+    if input_file and fmt == "json":
+        click.echo("Batch checks stream results; use --format jsonl or csv.")
+        sys.exit(2)
+    cache = _lookup_cache(no_cache, refresh)
     try:
-        bc = BreachChecker()
-        data = bc.check_email(email)
-        output_handler.format = fmt
-        out_path = output_handler.save("intelx_results", {email: data})
-        click.echo(f"[+] Saved to {out_path}")
+        if input_file:
+            _breach_batch(
+                _read_lines(input_file), fmt or "jsonl", concurrency, resume_id or job_id, cache
+            )
+            return
+        click.echo(f"[+] Checking Intelligence X for {email}")
+        try:
+            bc = BreachChecker(cache=cache)
+            data = bc.check_email(email)
+            output_handler.format = fmt or "json"
+            out_path = output_handler.save("intelx_results", {email: data})
+            click.echo(f"[+] Saved to {out_path}")
+        except Exception as e:
+            logger.exception(f"Intelligence X check failed: {e}")
+            click.echo(f"[-] Failed: {e}")
+            sys.exit(1)
+    finally:
+        _close_lookup_cache(cache)
+
+
+def _breach_batch(emails, fmt, concurrency, job_id, cache=None):
+    import asyncio
+
+    from .core.crawl_state import CrawlStateStore, new_job_id
+    from .modules.breach_checker import BreachChecker
+
+    output_handler = _output_handler()
+    job_id = job_id or f"breach_{new_job_id()}"
+    store = CrawlStateStore(job_id)
+    bc = BreachChecker(cache=cache)
+    output_handler.format = fmt
+    sink = output_handler.open_stream("intelx_results", fields=["email", "leaks", "error"])
+    click.echo(f"[+] Batch breach check (job {job_id}, resume with --resume {job_id})")
+
+    async def run():
+        found = failed = 0
+        async for result in bc.check_many(emails, concurrency, store):
+            sink.write(result)
+            if "error" in result:
+                failed += 1
+            elif result["leaks"]:
+                found += 1
+        return found, failed
+
+    try:
+        found, failed = asyncio.run(run())
     except Exception as e:
-        logger.exception(f"Intelligence X check failed: {e}")
+        logger.exception(f"Intelligence X batch failed: {e}")
         click.echo(f"[-] Failed: {e}")
         sys.exit(1)
+    finally:
+        sink.close()
+    click.echo(
+        f"[+] {sink.records} checked ({found} with leaks, {failed} failed); "
+        f"streamed to {', '.join(sink.paths)}"
+    )
+    if bc.exhausted:
+        click.echo(f"[!] Quota exhausted; rerun later with --input ... --resume {job_id}")
 
 
 @cli.command("shodan-search")
 @click.argument("query")
-@click.option("-l", "--limit", type=int, default=10)
-@click.option("--format", "fmt", default="json", type=click.Choice(["json", "csv"]))
-def shodan_search_cmd(query, limit, fmt):
+@click.option("-l", "--limit", type=int, default=None, help="Max results (default 10; all pages with --all).")
+@click.option("--all", "all_pages", is_flag=True, help="Walk every result page, streaming matches.")
+@click.option(
+    "--format", "fmt", default=None, type=click.Choice(["json", "csv", "jsonl"]),
+    help="Default: json, or jsonl (streamed) with --all.",
+)
+@lookup_cache_options
+def shodan_search_cmd(query, limit, all_pages, fmt, no_cache, refresh):
     """Search Shodan for a query (requires SHODAN_API_KEY)."""
+    from .modules.shodan_lookup import ShodanLookup
+
+    output_handler = _output_handler()
+    if all_pages and fmt == "json":
+        click.echo("--all streams results; use --format jsonl or csv.")
+        sys.exit(2)
     click.echo(f"[+] Running Shodan search: {query}")
+    cache = _lookup_cache(no_cache, refresh)
     try:
-        s = ShodanLookup()
-        results = s.host_search(query, limit=limit)
-        output_handler.format = fmt
-        out_path = output_handler.save("shodan_search", results)
-        click.echo(f"[+] Saved to {out_path}")
+        s = ShodanLookup(cache=cache)
+        if all_pages:
+            output_handler.format = fmt or "jsonl"
+            sink = output_handler.open_stream(
+                "shodan_search", fields=["ip_str", "port", "org", "data"]
+            )
+            try:
+                for match in s.iter_search(query, max_results=limit):
+                    sink.write(match)
+            finally:
+                sink.close()
+            click.echo(f"[+] Streamed {sink.records} results to {', '.join(sink.paths)}")
+        else:
+            results = s.host_search(query, limit=limit or 10)
+            output_handler.format = fmt or "json"
+            out_path = output_handler.save("shodan_search", results)
+            click.echo(f"[+] Saved to {out_path}")
     except Exception as e:
         logger.exception(f"Shodan search failed: {e}")
         click.echo(f"[-] Failed: {e}")
         sys.exit(1)
+    finally:
+        _close_lookup_cache(cache)
 
 
 @cli.command("shodan-host")
-@click.argument("ip")
-@click.option("--format", "fmt", default="json", type=click.Choice(["json", "csv"]))
-def shodan_host_cmd(ip, fmt):
-    """Get Shodan host details for IP (requires SHODAN_API_KEY)."""
-    click.echo(f"[+] Shodan host lookup: {ip}")
+@click.argument("ip", required=False)
+@click.option(
+    "-i", "--input", "input_file", type=click.File("r"), default=None,
+    help="File with one IP per line ('-' for stdin).",
+)
+@click.option(
+    "--format", "fmt", default=None, type=click.Choice(["json", "csv", "jsonl"]),
+    help="Default: json for one IP, jsonl (streamed) for --input.",
+)
+@click.option("-c", "--concurrency", type=int, default=None, help="Lookups in flight (batch).")
+@lookup_cache_options
+def shodan_host_cmd(ip, input_file, fmt, concurrency, no_cache, refresh):
+    """Get Shodan host details for IP(s) (requires SHODAN_API_KEY)."""
+    from .modules.shodan_lookup import ShodanLookup
+
+    output_handler = _output_handler()
+    if bool(ip) == bool(input_file):
+        click.echo("Give either an IP or --input FILE. Example: omni-scraper shodan-host 8.8.8.8")
+        sys.exit(2)
+    if input_file and fmt == "json":
+        click.echo("Batch lookups stream results; use --format jsonl or csv.")
+        sys.exit(2)
+    cache = _lookup_cache(no_cache, refresh)
     try:
-        s = ShodanLookup()
-        info = s.host_lookup(ip)
-        output_handler.format = fmt
-        out_path = output_handler.save("shodan_host", info)
-        click.echo(f"[+] Saved to {out_path}")
+        s = ShodanLookup(cache=cache)
+        if input_file:
+            _shodan_host_batch(s, _read_lines(input_file), fmt or "jsonl", concurrency)
+        else:
+            click.echo(f"[+] Shodan host lookup: {ip}")
+            info = s.host_lookup(ip)
+            output_handler.format = fmt or "json"
+            out_path = output_handler.save("shodan_host", info)
+            click.echo(f"[+] Saved to {out_path}")
     except Exception as e:
         logger.exception(f"Shodan host failed: {e}")
         click.echo(f"[-] Failed: {e}")
         sys.exit(1)
+    finally:
+        _close_lookup_cache(cache)
+
+
+def _shodan_host_batch(lookup, ips, fmt, concurrency):
+    import asyncio
+
+    output_handler = _output_handler()
+    output_handler.format = fmt
+    sink = output_handler.open_stream("shodan_hosts", fields=["ip", "host", "error"])
+    click.echo(f"[+] Batch Shodan host lookup (concurrency {concurrency or lookup.concurrency})")
+
+    async def run():
+        failed = 0
+        async for result in lookup.host_lookup_many(ips, concurrency):
+            sink.write(result)
+            failed += "error" in result
+        return failed
+
+    try:
+        failed = asyncio.run(run())
+    finally:
+        sink.close()
+    click.echo(
+        f"[+] {sink.records} unique hosts ({failed} failed); streamed to {', '.join(sink.paths)}"
+    )
 
 
 if __name__ == "__main__":
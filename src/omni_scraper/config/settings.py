@@ -1,25 +1,37 @@
 import os
 from pathlib import Path
 
-import yaml
-from dotenv import load_dotenv
-
 
 class Config:
+    """
+    Settings from config/default.yaml plus .env overrides. Nothing is read
+    until a setting is first accessed, so importing a module stays cheap.
+    """
+
     def __init__(self):
         self.base_dir = Path(__file__).resolve().parent.parent.parent.parent
-        self._load_environment()
-        self._load_config()
+        self._config = None
+
+    @property
+    def config(self):
+        if self._config is None:
+            self._load_environment()
+            self._load_config()
+        return self._config
 
     def _load_environment(self):
         env_path = self.base_dir / ".env"
         if env_path.exists():
+            from dotenv import load_dotenv
+
             load_dotenv(env_path)
 
     def _load_config(self):
+        import yaml
+
         config_path = self.base_dir / "config" / "default.yaml"
         with open(config_path, "r", encoding="utf-8") as f:
-            self.config = yaml.safe_load(f) or {}
+            self._config = yaml.safe_load(f) or {}
         # Sensible defaults
         self.config.setdefault("hibp", {})
         self.config.setdefault("tor", {})
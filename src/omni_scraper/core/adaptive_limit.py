@@ -0,0 +1,177 @@
+import asyncio
+import time
+
+from omni_scraper.config.settings import config
+from omni_scraper.core.host_scheduler import host_of
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AIMDLimit:
+    """
+    A concurrency limit tuned by additive increase / multiplicative decrease.
+
+    Each success adds ``increase / limit`` (about ``increase`` per round of
+    requests) while latency stays within ``latency_factor`` times the
+    baseline; an overload signal multiplies the limit by ``backoff``. Only
+    requests started after the last decrease can trigger another one, so a
+    burst of failures from one congested round backs off once.
+    """
+
+    def __init__(
+        self,
+        initial,
+        minimum=1,
+        maximum=64,
+        increase=1.0,
+        backoff=0.5,
+        latency_factor=2.0,
+        clock=time.monotonic,
+    ):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = float(min(max(int(initial), self.minimum), self.maximum))
+        self.increase = float(increase)
+        self.backoff = float(backoff)
+        self.latency_factor = float(latency_factor)
+        self.baseline = None
+        self._clock = clock
+        self._last_decrease = float("-inf")
+
+    @property
+    def value(self):
+        return int(self.limit)
+
+    def on_success(self, latency=None):
+        if latency is not None:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                # Drift up slowly so the baseline follows a site that got slower
+                self.baseline += 0.05 * (latency - self.baseline)
+            if latency > self.latency_factor * self.baseline:
+                return
+        self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+
+    def on_overload(self, started):
+        if started < self._last_decrease:
+            return
+        self._last_decrease = self._clock()
+        self.limit = max(self.minimum, self.limit * self.backoff)
+
+
+def is_overload(result):
+    """Timeouts, 429 and 5xx mean "slow down"; other outcomes do not."""
+    if result.timed_out:
+        return True
+    return result.status is not None and (result.status == 429 or result.status >= 500)
+
+
+class AdaptiveLimiter:
+    """
+    Global and per-host AIMD limits on in-flight requests.
+
+    ``acquire(url)`` waits until both the overall and the host's limit have
+    room; ``release(url, started, result)`` frees the slot and feeds the
+    outcome back into both limits. Every change of a limit is logged and the
+    global one is also kept in ``history`` as (elapsed seconds, limit).
+    """
+
+    def __init__(
+        self,
+        initial=None,
+        host_initial=None,
+        minimum=None,
+        maximum=None,
+        host_maximum=None,
+        clock=time.monotonic,
+    ):
+        cfg = config.get("adaptive") or {}
+        self.minimum = int(minimum or cfg.get("min", 1))
+        self.host_initial = int(host_initial or cfg.get("per_host_initial", 1))
+        self.host_maximum = int(host_maximum or cfg.get("per_host_max", 4))
+        self.backoff = float(cfg.get("backoff", 0.5))
+        self.latency_factor = float(cfg.get("latency_factor", 2.0))
+        self._clock = clock
+        # An explicit starting value above the configured bound raises the bound
+        self.host_maximum = max(self.host_maximum, self.host_initial)
+        initial = int(initial or cfg.get("initial", 4))
+        self.limit = self._new_limit(initial, max(int(maximum or cfg.get("max", 64)), initial))
+        self.hosts = {}
+        self.in_flight = 0
+        self._host_in_flight = {}
+        self._changed = asyncio.Condition()
+        self._start = clock()
+        self.history = [(0.0, self.limit.value)]
+
+    def _new_limit(self, initial, maximum):
+        return AIMDLimit(
+            initial,
+            self.minimum,
+            maximum,
+            backoff=self.backoff,
+            latency_factor=self.latency_factor,
+            clock=self._clock,
+        )
+
+    def host_limit(self, host):
+        limit = self.hosts.get(host)
+        if limit is None:
+            limit = self.hosts[host] = self._new_limit(self.host_initial, self.host_maximum)
+        return limit.value
+
+    def _has_room(self, host):
+        return (
+            self.in_flight < self.limit.value
+            and self._host_in_flight.get(host, 0) < self.host_limit(host)
+        )
+
+    async def acquire(self, url):
+        """Waits for a free slot for ``url``; returns the start time for release."""
+        host = host_of(url)
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._has_room(host))
+            self.in_flight += 1
+            self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+        return self._clock()
+
+    async def release(self, url, started, result=None):
+        host = host_of(url)
+        async with self._changed:
+            self.in_flight -= 1
+            self._host_in_flight[host] -= 1
+            if result is not None:
+                self._observe(host, started, result)
+            self._changed.notify_all()
+
+    def _observe(self, host, started, result):
+        self.host_limit(host)
+        before = self.limit.value, self.hosts[host].value
+        if is_overload(result):
+            self.limit.on_overload(started)
+            self.hosts[host].on_overload(started)
+            reason = "timeout" if result.timed_out else f"status {result.status}"
+        elif result.status is not None and result.status < 400:
+            latency = self._clock() - started
+            self.limit.on_success(latency)
+            self.hosts[host].on_success(latency)
+            reason = None
+        else:
+            return
+        after = self.limit.value, self.hosts[host].value
+        if after[0] != before[0]:
+            self.history.append((round(self._clock() - self._start, 3), after[0]))
+            logger.info(
+                f"Concurrency limit {before[0]} -> {after[0]}"
+                + (f" ({reason} from {host})" if reason else "")
+            )
+        if after[1] != before[1]:
+            logger.debug("Per-host limit for %s: %s -> %s", host, before[1], after[1])
+
+    def stats(self):
+        return {
+            "limit": self.limit.value,
+            "history": list(self.history),
+            "host_limits": {h: limit.value for h, limit in self.hosts.items()},
+        }
@@ -0,0 +1,236 @@
+import statistics
+import time
+import uuid
+
+import aiohttp
+from aiohttp_socks import ProxyConnectionError, ProxyError
+
+from omni_scraper.config.settings import config
+from omni_scraper.core.tor_manager import TorManager
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# SOCKS5 replies that point at the circuit (general failure, TTL expired).
+# Host unreachable, refused and Tor's onion-service codes (0xF0-0xF7) mean a
+# dead or missing site, so they don't count against the circuit.
+CIRCUIT_REPLY_CODES = (0x01, 0x06)
+
+
+def is_circuit_error(exc):
+    """
+    True if ``exc`` is a proxy- or circuit-level failure: a circuit reply
+    code, a SOCKS error without one, or no connection to the SocksPort.
+    Plain timeouts and connection errors are usually the site, not the
+    circuit.
+    """
+    while exc is not None:
+        if isinstance(exc, ProxyConnectionError):
+            return True
+        if isinstance(exc, ProxyError):
+            return exc.error_code is None or exc.error_code in CIRCUIT_REPLY_CODES
+        exc = exc.__cause__
+    return False
+
+
+class Circuit:
+    """One isolated Tor circuit: its own session plus latency/error stats."""
+
+    def __init__(self, isolation, port, session, alpha=0.3, warmup=1):
+        self.isolation = isolation
+        self.port = port
+        self.session = session
+        self.alpha = alpha
+        self.warmup = warmup
+        self.ewma = None
+        self.samples = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.in_flight = 0
+        self.retired = False
+
+    def score(self):
+        """Expected wait on this circuit; circuits still warming up sort first."""
+        if self.samples < self.warmup:
+            return (0, self.in_flight)
+        return (1, self.ewma * (self.in_flight + 1))
+
+    def record(self, latency):
+        self.samples += 1
+        self.consecutive_errors = 0
+        if self.ewma is None:
+            self.ewma = latency
+        else:
+            self.ewma = self.alpha * latency + (1 - self.alpha) * self.ewma
+
+    def record_error(self):
+        self.errors += 1
+        self.consecutive_errors += 1
+
+    def stats(self):
+        return {
+            "isolation": self.isolation,
+            "port": self.port,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "in_flight": self.in_flight,
+        }
+
+
+class _CircuitRequest:
+    """``async with pool.get(url) as resp`` routed through the best circuit."""
+
+    def __init__(self, pool, url, kwargs):
+        self.pool = pool
+        self.url = url
+        self.kwargs = kwargs
+        self.circuit = None
+        self._request = None
+
+    async def __aenter__(self):
+        circuit = self.circuit = self.pool.pick()
+        # Counted once, at dispatch; a failure later on only adds to errors
+        circuit.requests += 1
+        circuit.in_flight += 1
+        start = time.monotonic()
+        try:
+            self._request = circuit.session.get(self.url, **self.kwargs)
+            resp = await self._request.__aenter__()
+        except BaseException as e:
+            await self.pool._finish(circuit, error=is_circuit_error(e))
+            raise
+        # Time to response headers: dominated by the circuit's round trips
+        circuit.record(time.monotonic() - start)
+        return resp
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            return await self._request.__aexit__(exc_type, exc, tb)
+        finally:
+            error = is_circuit_error(exc)
+            await self.pool._finish(self.circuit, error=error)
+
+
+class CircuitPool:
+    """
+    A pool of ``size`` isolated Tor circuits used in place of a ClientSession.
+
+    Each circuit gets a distinct SOCKS username (Tor's IsolateSOCKSAuth puts
+    each one on its own circuit) and, when several SocksPorts are
+    configured, they are used round-robin. Requests go to the circuit with
+    the lowest ``latency * (in_flight + 1)``, after each new circuit has
+    served ``min_samples`` requests to measure it. A circuit is retired and
+    replaced by a fresh one after ``max_errors`` consecutive failures, or
+    once its latency is more than ``slow_factor`` times the pool median.
+    """
+
+    def __init__(
+        self,
+        size=None,
+        tor=None,
+        timeout=None,
+        limit=100,
+        limit_per_host=0,
+        max_errors=None,
+        slow_factor=None,
+        min_samples=None,
+        trace_configs=None,
+    ):
+        cfg = config.get("tor") or {}
+        self.size = max(1, int(size or cfg.get("circuits", 4)))
+        self.tor = tor or TorManager()
+        self.timeout = timeout
+        # The connection limits are shared out across the circuits
+        self.limit = max(1, limit // self.size) if limit else 0
+        self.limit_per_host = max(1, limit_per_host // self.size) if limit_per_host else 0
+        self.max_errors = int(max_errors or cfg.get("circuit_max_errors", 3))
+        self.slow_factor = float(slow_factor or cfg.get("circuit_slow_factor", 3.0))
+        self.min_samples = int(min_samples or cfg.get("circuit_min_samples", 5))
+        self.trace_configs = trace_configs
+        self.circuits = []
+        self.retired = 0
+        self._draining = []
+        self._opened = 0
+
+    def _open_circuit(self):
+        ports = self.tor.socks_ports
+        port = ports[self._opened % len(ports)]
+        self._opened += 1
+        isolation = f"omni-{uuid.uuid4().hex[:12]}"
+        connector = self.tor.proxy_connector(
+            isolation, port, limit=self.limit, limit_per_host=self.limit_per_host
+        )
+        session = aiohttp.ClientSession(
+            connector=connector, timeout=self.timeout, trace_configs=self.trace_configs
+        )
+        return Circuit(isolation, port, session, warmup=self.min_samples)
+
+    async def __aenter__(self):
+        self.circuits = [self._open_circuit() for _ in range(self.size)]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def pick(self):
+        return min(self.circuits, key=Circuit.score)
+
+    def get(self, url, **kwargs):
+        return _CircuitRequest(self, url, kwargs)
+
+    async def _finish(self, circuit, error=False):
+        circuit.in_flight -= 1
+        if circuit.retired:
+            if circuit.in_flight == 0:
+                self._draining.remove(circuit)
+                await circuit.session.close()
+            return
+        if error:
+            circuit.record_error()
+            if circuit.consecutive_errors >= self.max_errors:
+                await self._retire(circuit, f"{circuit.consecutive_errors} consecutive errors")
+        elif self._is_slow(circuit):
+            await self._retire(circuit, f"latency {circuit.ewma * 1000:.0f}ms")
+
+    def _is_slow(self, circuit):
+        if circuit.samples < self.min_samples:
+            return False
+        peers = [
+            c.ewma for c in self.circuits if c.samples >= self.min_samples
+        ]
+        if len(peers) < 2:
+            return False
+        return circuit.ewma > self.slow_factor * statistics.median(peers)
+
+    async def _retire(self, circuit, reason):
+        """Swaps ``circuit`` for a fresh one; its session closes once idle."""
+        circuit.retired = True
+        self.retired += 1
+        replacement = self._open_circuit()
+        self.circuits[self.circuits.index(circuit)] = replacement
+        logger.info(
+            f"Retired circuit {circuit.isolation} ({reason}); "
+            f"replaced by {replacement.isolation}"
+        )
+        if circuit.in_flight:
+            self._draining.append(circuit)
+        else:
+            await circuit.session.close()
+
+    def stats(self):
+        return {
+            "circuits": [c.stats() for c in self.circuits],
+            "retired": self.retired,
+        }
+
+    def summary(self):
+        latencies = [c.ewma for c in self.circuits if c.ewma is not None]
+        median = f"{statistics.median(latencies) * 1000:.0f}ms" if latencies else "n/a"
+        return f"circuits={len(self.circuits)} retired={self.retired} median_latency={median}"
+
+    async def close(self):
+        for circuit in self.circuits + self._draining:
+            await circuit.session.close()
+        self._draining = []
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from omni_scraper.config.settings import config
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, depth INTEGER);
+CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT);
+"""
+
+
+def new_job_id():
+    """Returns a sortable, collision-resistant id for a new crawl job."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    return f"{stamp}_{uuid.uuid4().hex[:6]}"
+
+
+class CrawlStateStore:
+    """
+    SQLite-backed frontier, visited set and result log for one crawl job.
+
+    All methods are blocking and open their own connection, so the crawler can
+    call them from a worker thread while the event loop keeps fetching.
+    """
+
+    def __init__(self, job_id, directory=None):
+        if not job_id:
+            raise ValueError("job_id required")
+        directory = directory or Path(config.base_dir) / config.get(
+            "crawler.state_dir", "data/crawls"
+        )
+        self.job_id = job_id
+        self.path = Path(directory) / f"{job_id}.sqlite3"
+
+    def exists(self):
+        return self.path.exists()
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def save_checkpoint(self, frontier, finished, results, meta=None):
+        """
+        Persists one checkpoint atomically.
+
+        ``frontier`` replaces the stored frontier (it must include in-flight
+        URLs), while ``finished`` URLs and ``results`` are appended.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM frontier")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO frontier (url, depth) VALUES (?, ?)",
+                    frontier,
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO visited (url) VALUES (?)",
+                    ((u,) for u in finished),
+                )
+                conn.executemany(
+                    "INSERT INTO results (data) VALUES (?)",
+                    ((json.dumps(r, ensure_ascii=False),) for r in results),
+                )
+                for key, value in (meta or {}).items():
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                        (key, json.dumps(value)),
+                    )
+        finally:
+            conn.close()
+        logger.debug(
+            f"Checkpoint {self.job_id}: frontier={len(frontier)} "
+            f"finished+={len(finished)} results+={len(results)}"
+        )
+
+    def load(self, include_results=True):
+        """
+        Returns (frontier, visited, results, meta) as stored for this job.
+        ``results`` is empty unless ``include_results`` is set.
+        """
+        if not self.exists():
+            raise FileNotFoundError(f"No crawl state for job {self.job_id}")
+        conn = self._connect()
+        try:
+            frontier = conn.execute(
+                "SELECT url, depth FROM frontier ORDER BY depth"
+            ).fetchall()
+            visited = {row[0] for row in conn.execute("SELECT url FROM visited")}
+            results = (
+                [
+                    json.loads(row[0])
+                    for row in conn.execute("SELECT data FROM results ORDER BY id")
+                ]
+                if include_results
+                else []
+            )
+            meta = {
+                key: json.loads(value)
+                for key, value in conn.execute("SELECT key, value FROM meta")
+            }
+        finally:
+            conn.close()
+        return frontier, visited, results, meta
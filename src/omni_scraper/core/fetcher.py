@@ -0,0 +1,259 @@
+import asyncio
+import codecs
+import time
+
+from omni_scraper.config.settings import config
+from omni_scraper.core.host_scheduler import host_of
+from omni_scraper.core.http_cache import CACHE_MODES, ResponseCache
+from omni_scraper.utils.helpers import canonicalize_url
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Content types that say nothing about the body; these are sniffed
+UNTYPED = ("application/octet-stream", "binary/octet-stream", "")
+HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body", b"<title", b"<a ", b"<div", b"<p>")
+
+
+def looks_like_html(head):
+    head = head.lstrip().lower()
+    return any(marker in head for marker in HTML_MARKERS)
+
+
+def _decode(body, charset):
+    try:
+        return body.decode(codecs.lookup(charset or "utf-8").name, errors="ignore")
+    except LookupError:
+        return body.decode("utf-8", errors="ignore")
+
+
+class FetchResult:
+    __slots__ = (
+        "url", "status", "text", "error", "from_cache", "timed_out", "skipped", "truncated"
+    )
+
+    def __init__(
+        self,
+        url,
+        status=None,
+        text=None,
+        error=None,
+        from_cache=False,
+        timed_out=False,
+        skipped=False,
+        truncated=False,
+    ):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.error = error
+        self.from_cache = from_cache
+        self.timed_out = timed_out
+        # A 200 not read because of its content type
+        self.skipped = skipped
+        # Only the first max_bytes of the body were read
+        self.truncated = truncated
+
+    @property
+    def ok(self):
+        return self.status == 200 and self.text is not None
+
+
+class Fetcher:
+    """
+    GET requests shared by AsyncWebCrawler and AsyncScraper.
+
+    With a response cache in ``read-write`` mode, cached pages are
+    revalidated with If-None-Match / If-Modified-Since so an unchanged page
+    costs a 304 instead of a full download through Tor. ``offline`` mode
+    serves only from the cache and never touches the network.
+
+    Bodies are streamed and reading stops after ``max_bytes`` (the page is
+    kept truncated, and not cached). Responses whose Content-Type is not in
+    ``content_types`` are skipped without reading the body; untyped ones
+    are sniffed and kept only if their first bytes look like HTML.
+    Compressed encodings are requested to cut bytes on the wire.
+
+    With ``metrics`` set, the whole fetch and the body download are timed
+    per host, and responses, errors and bytes are counted.
+    """
+
+    def __init__(
+        self,
+        session,
+        user_agent,
+        timeout,
+        cache_mode="off",
+        cache=None,
+        metrics=None,
+        max_bytes=None,
+        content_types=None,
+    ):
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {cache_mode!r}; choose from {CACHE_MODES}")
+        cfg = config.get("crawler") or {}
+        self.session = session
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,text/plain;q=0.8,*/*;q=0.1",
+            "Accept-Encoding": cfg.get("accept_encoding", "gzip, deflate"),
+        }
+        self.timeout = timeout
+        self.cache_mode = cache_mode
+        if cache_mode != "off" and cache is None:
+            cache = ResponseCache()
+        self.cache = cache if cache_mode != "off" else None
+        self.metrics = metrics
+        self.max_bytes = int(max_bytes or float(cfg.get("max_body_mb", 10)) * 1024 * 1024)
+        self.content_types = frozenset(
+            content_types
+            or cfg.get("content_types")
+            or ("text/html", "application/xhtml+xml", "text/plain")
+        )
+        self.sniff_bytes = int(cfg.get("sniff_bytes", 1024))
+        self.transfer = {
+            "bytes": 0,
+            "skipped": 0,
+            "truncated": 0,
+            "bytes_not_read": 0,
+            "compression_saved": 0,
+        }
+
+    async def fetch(self, url):
+        if self.metrics is None:
+            return await self._fetch(url)
+        host = host_of(url)
+        start = time.perf_counter()
+        result = await self._fetch(url, host)
+        self.metrics.observe("fetch", time.perf_counter() - start, host)
+        if result.from_cache:
+            self.metrics.inc("cache_hits", host=host)
+        elif result.status is not None:
+            self.metrics.inc(f"responses_{result.status // 100}xx", host=host)
+        else:
+            self.metrics.inc("timeouts" if result.timed_out else "errors", host=host)
+        return result
+
+    async def _fetch(self, url, host=None):
+        key = canonicalize_url(url) or url
+        cached = None
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if self.cache_mode == "offline":
+                if cached is None:
+                    self.cache.misses += 1
+                    return FetchResult(url, error="not in cache (offline)")
+                self._count_hit(cached)
+                return FetchResult(url, cached.status, cached.text, from_cache=True)
+        headers = dict(self.headers)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+        try:
+            async with self.session.get(url, headers=headers, timeout=self.timeout) as resp:
+                if resp.status == 304 and cached is not None:
+                    self._count_hit(cached)
+                    self.cache.revalidated += 1
+                    await asyncio.to_thread(self.cache.touch, key)
+                    return FetchResult(url, cached.status, cached.text, from_cache=True)
+                if resp.status != 200:
+                    return FetchResult(url, resp.status, error=f"Status {resp.status}")
+                mimetype = resp.content_type.lower()
+                if mimetype not in self.content_types and mimetype not in UNTYPED:
+                    return self._skip(url, resp, f"content-type {mimetype}", host)
+                if self.metrics is None:
+                    body, truncated = await self._read(resp, mimetype in UNTYPED)
+                else:
+                    with self.metrics.timer("download", host):
+                        body, truncated = await self._read(resp, mimetype in UNTYPED)
+                if body is None:
+                    return self._skip(url, resp, "body does not look like HTML", host)
+                self._count_body(resp, body, truncated, host)
+                text = _decode(body, resp.charset)
+                if self.cache is not None:
+                    self.cache.misses += 1
+                # A cut body would be replayed later as if it were the whole page
+                if self.cache is not None and not truncated:
+                    await asyncio.to_thread(
+                        self.cache.put,
+                        key,
+                        resp.status,
+                        text,
+                        resp.headers.get("ETag"),
+                        resp.headers.get("Last-Modified"),
+                        resp.headers.get("Content-Type"),
+                    )
+                return FetchResult(url, resp.status, text, truncated=truncated)
+        except Exception as e:
+            return FetchResult(
+                url,
+                error=str(e) or type(e).__name__,
+                timed_out=isinstance(e, asyncio.TimeoutError),
+            )
+
+    async def _read(self, resp, sniff):
+        """
+        Reads the body in chunks up to ``max_bytes``; returns ``(body,
+        truncated)``, or ``(None, False)`` when ``sniff`` finds no HTML.
+        """
+        chunks, size, sniffed = [], 0, not sniff
+        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if not sniffed and size >= self.sniff_bytes:
+                if not looks_like_html(b"".join(chunks)[: self.sniff_bytes]):
+                    return None, False
+                sniffed = True
+            if size > self.max_bytes:
+                # Leaving the response unread drops the connection: the rest never arrives
+                return b"".join(chunks)[: self.max_bytes], True
+        body = b"".join(chunks)
+        if not sniffed and not looks_like_html(body):
+            return None, False
+        return body, False
+
+    def _count(self, name, n, host):
+        self.transfer[name] += n
+        if self.metrics is not None:
+            self.metrics.inc(name, n, host)
+
+    def _skip(self, url, resp, reason, host):
+        self._count("skipped", 1, host)
+        if resp.content_length:
+            self._count("bytes_not_read", resp.content_length, host)
+        return FetchResult(url, resp.status, error=f"Skipped: {reason}", skipped=True)
+
+    def _count_body(self, resp, body, truncated, host):
+        self._count("bytes", len(body), host)
+        # Content-Length is the encoded size when the body came compressed
+        length = resp.content_length
+        if truncated:
+            self._count("truncated", 1, host)
+            if length and not resp.headers.get("Content-Encoding"):
+                self._count("bytes_not_read", length - len(body), host)
+        elif length and resp.headers.get("Content-Encoding"):
+            self._count("compression_saved", max(0, len(body) - length), host)
+
+    def transfer_summary(self):
+        t = self.transfer
+        return (
+            f"bytes={t['bytes']} skipped={t['skipped']} truncated={t['truncated']} "
+            f"bytes_not_read={t['bytes_not_read']} compression_saved={t['compression_saved']}"
+        )
+
+    def _count_hit(self, cached):
+        self.cache.hits += 1
+        self.cache.bytes_saved += len(cached.text.encode("utf-8"))
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+    def cache_summary(self):
+        if self.cache is None:
+            return "cache=off"
+        s = self.cache.stats()
+        return (
+            f"cache hits={s['hits']} misses={s['misses']} revalidated={s['revalidated']} "
+            f"bytes_saved={s['bytes_saved']}"
+        )
@@ -0,0 +1,201 @@
+import asyncio
+import heapq
+import itertools
+import time
+from urllib.parse import urlparse
+
+
+def host_of(url):
+    try:
+        return (urlparse(url).hostname or "").lower()
+    except Exception:
+        return ""
+
+
+class _HostState:
+    __slots__ = ("items", "in_flight", "next_allowed", "entry", "waited", "served")
+
+    def __init__(self):
+        # Heap of (-priority, seq, item, enqueued): FIFO among equal priorities
+        self.items = []
+        self.in_flight = 0
+        self.next_allowed = 0.0
+        # Sequence number of the host's live entry in _ready/_available, if any
+        self.entry = None
+        self.waited = 0.0
+        self.served = 0
+
+    def best(self):
+        return -self.items[0][0]
+
+
+class HostScheduler:
+    """
+    Crawl frontier that enforces politeness per host instead of per worker.
+
+    Each host has its own queue, a cooldown of ``delay`` seconds between
+    requests and at most ``per_host_concurrency`` requests in flight. Hosts
+    that are cooling down sit in a heap keyed by the time they become
+    available; hosts that are due move to a second heap keyed by their best
+    queued URL, so ``get`` hands a worker the highest-priority URL of any
+    host that is not cooling down (both heaps are O(log n) per operation).
+    URLs put without a ``priority`` are served FIFO, per host and across
+    hosts in the order they became available. ``host_limit``, if given, is
+    called with a host name and overrides ``per_host_concurrency`` (e.g. an
+    adaptive limit). The interface mirrors ``asyncio.Queue``
+    (``put_nowait``, ``get``, ``task_done``, ``join``) so workers can use it
+    as a drop-in.
+    """
+
+    def __init__(
+        self, delay=0.0, per_host_concurrency=1, clock=time.monotonic, host_limit=None
+    ):
+        self.delay = float(delay)
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self._host_limit = host_limit or (lambda host: self.per_host_concurrency)
+        self._clock = clock
+        self._hosts = {}
+        self._ready = []
+        self._available = []
+        self._seq = itertools.count()
+        self._size = 0
+        self._unfinished = 0
+        self._wakeup = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState()
+        return state
+
+    def _schedule(self, host, state):
+        if (
+            state.entry is None
+            and state.items
+            and state.in_flight < self._host_limit(host)
+        ):
+            state.entry = next(self._seq)
+            heapq.heappush(self._ready, (state.next_allowed, state.entry, host))
+            self._wakeup.set()
+
+    def put_nowait(self, item, priority=0.0):
+        """Queues ``item`` (a ``(url, depth)`` pair); higher ``priority`` is served first."""
+        url, _ = item
+        host = host_of(url)
+        state = self._host(host)
+        # A due host whose best URL just improved gets a fresh entry; the old one is skipped
+        promote = state.entry is not None and state.items and priority > state.best()
+        heapq.heappush(state.items, (-priority, next(self._seq), item, self._clock()))
+        self._size += 1
+        self._unfinished += 1
+        self._finished.clear()
+        if promote:
+            state.entry = None
+        self._schedule(host, state)
+
+    def _pop_ready(self):
+        """Returns the next dispatchable item, or the seconds until one is due."""
+        now = self._clock()
+        ready, available = self._ready, self._available
+        # Hosts whose cooldown has passed compete on their best URL, then on age
+        while ready and ready[0][0] <= now:
+            ready_at, entry, host = heapq.heappop(ready)
+            state = self._hosts[host]
+            if entry == state.entry and state.items:
+                heapq.heappush(available, (-state.best(), ready_at, entry, host))
+        while available:
+            _, _, entry, host = heapq.heappop(available)
+            state = self._hosts[host]
+            if entry != state.entry:
+                continue
+            state.entry = None
+            if not state.items or state.in_flight >= self._host_limit(host):
+                continue
+            if state.next_allowed > now:
+                # Cooldown was extended after this entry was pushed
+                self._schedule(host, state)
+                continue
+            _, _, item, enqueued = heapq.heappop(state.items)
+            self._size -= 1
+            state.in_flight += 1
+            state.served += 1
+            # Time spent queued only because the host was still cooling down
+            state.waited += max(0.0, min(state.next_allowed, now) - enqueued)
+            self._schedule(host, state)
+            return item, None
+        while ready:
+            ready_at, entry, host = ready[0]
+            if entry == self._hosts[host].entry:
+                return None, ready_at - now
+            heapq.heappop(ready)
+        return None, None
+
+    async def get(self):
+        while True:
+            item, wait = self._pop_ready()
+            if item is not None:
+                return item
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, url, cooldown=True):
+        """
+        Marks a dispatched ``url`` as finished. Its host cools down for
+        ``delay`` seconds unless ``cooldown`` is False (nothing was requested).
+        """
+        host = host_of(url)
+        state = self._host(host)
+        state.in_flight = max(0, state.in_flight - 1)
+        if cooldown:
+            state.next_allowed = max(state.next_allowed, self._clock() + self.delay)
+        self._schedule(host, state)
+
+    def task_done(self):
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self):
+        await self._finished.wait()
+
+    def hold(self):
+        """Keeps ``join`` waiting, e.g. while URLs may still arrive from elsewhere."""
+        self._unfinished += 1
+        self._finished.clear()
+
+    def unhold(self):
+        self.task_done()
+
+    def empty(self):
+        return self._size == 0
+
+    def qsize(self):
+        return self._size
+
+    def snapshot(self):
+        return [entry[2] for state in self._hosts.values() for entry in sorted(state.items)]
+
+    def queue_depths(self):
+        """Returns {host: queued URLs} for hosts with pending work."""
+        return {h: len(s.items) for h, s in self._hosts.items() if s.items}
+
+    def stats(self):
+        served = sum(s.served for s in self._hosts.values())
+        waited = sum(s.waited for s in self._hosts.values())
+        return {
+            "hosts": len(self._hosts),
+            "queued": self._size,
+            "served": served,
+            "politeness_wait_total": round(waited, 3),
+            "politeness_wait_avg": round(waited / served, 3) if served else 0.0,
+            "politeness_wait_by_host": {
+                h: round(s.waited, 3) for h, s in self._hosts.items() if s.waited
+            },
+        }
@@ -0,0 +1,160 @@
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from omni_scraper.config.settings import config
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CACHE_MODES = ("off", "read-write", "offline")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    body BLOB,
+    size INTEGER,
+    fetched_at REAL,
+    accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+
+class CachedResponse:
+    __slots__ = ("url", "status", "etag", "last_modified", "content_type", "text", "size", "fetched_at")
+
+    def __init__(self, url, status, etag, last_modified, content_type, body, size, fetched_at):
+        self.url = url
+        self.status = status
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+        self.text = zlib.decompress(body).decode("utf-8")
+        self.size = size
+        self.fetched_at = fetched_at
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    On-disk response cache keyed by canonical URL (SQLite, zlib bodies).
+
+    Entries older than ``max_age`` seconds are dropped on read, and once the
+    stored bodies exceed ``max_bytes`` the least recently used entries are
+    evicted. All methods block; the fetcher calls them from a worker thread.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, max_age=None):
+        cfg = config.get("cache") or {}
+        directory = directory or Path(config.base_dir) / cfg.get("directory", "data/cache")
+        self.path = Path(directory) / "responses.sqlite3"
+        self.max_bytes = int(max_bytes or float(cfg.get("max_mb", 512)) * 1024 * 1024)
+        self.max_age = float(max_age or float(cfg.get("max_age_days", 30)) * 86400)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        # Run counters
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stored = 0
+        self.bytes_saved = 0
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, etag, last_modified, content_type, body, size, fetched_at "
+                "FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[7] > self.max_age:
+                self._delete(url, row[6])
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._conn.commit()
+        return CachedResponse(*row)
+
+    def put(self, url, status, text, etag=None, last_modified=None, content_type=None):
+        body = zlib.compress(text.encode("utf-8"))
+        size = len(body)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, etag, last_modified, content_type, body, size, now, now),
+            )
+            self._total += size - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+            self._conn.commit()
+        self.stored += 1
+
+    def touch(self, url):
+        """Records a successful revalidation (304) of ``url``."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            self._conn.commit()
+
+    def _delete(self, url, size):
+        self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+        self._conn.commit()
+        self._total -= size
+
+    def _evict(self, target):
+        rows = self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        doomed = []
+        total = self._total
+        for url, size in rows:
+            if total <= target:
+                break
+            doomed.append((url,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+        self._total = total
+        logger.info(f"Response cache evicted {len(doomed)} entries")
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "stored": self.stored,
+            "bytes_saved": self.bytes_saved,
+            "size_bytes": self._total,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,219 @@
+"""
+Link graph captured during a crawl, and host-level ranking over it.
+
+URLs and hosts are interned to integer IDs, and edges are kept in a CSR
+(compressed sparse row) layout of flat ``array`` buffers: one row per
+crawled page, holding the IDs of the URLs it links to. That costs about
+4 bytes per edge plus one string per distinct URL, instead of a dict of
+string lists. Ranking (PageRank, in-degree) runs vectorized over the same
+buffers with NumPy, an optional extra (``pip install omni-scraper[graph]``)
+that is imported only when ranking.
+"""
+import json
+import sys
+from array import array
+from pathlib import Path
+
+from .host_scheduler import host_of
+
+MAGIC = b"OMNIGRAPH1\n"
+# Unsigned 32-bit IDs (4 billion URLs) and 64-bit row offsets
+ID, OFFSET = "I", "Q"
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("graph ranking requires NumPy: pip install omni-scraper[graph]") from None
+    return numpy
+
+
+class LinkGraph:
+    """
+    Directed page graph in CSR form. Row ``r`` is crawled page
+    ``row_node[r]``; its out-links are ``indices[indptr[r]:indptr[r + 1]]``.
+    Pages that are only linked to (never crawled) are nodes without a row.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.hosts = []
+        self._url_ids = {}
+        self._host_ids = {}
+        self.url_host = array(ID)
+        self.row_node = array(ID)
+        self.indptr = array(OFFSET, [0])
+        self.indices = array(ID)
+
+    def _url_id(self, url):
+        uid = self._url_ids.get(url)
+        if uid is None:
+            host = host_of(url)
+            hid = self._host_ids.get(host)
+            if hid is None:
+                hid = self._host_ids[host] = len(self.hosts)
+                self.hosts.append(host)
+            uid = self._url_ids[url] = len(self.urls)
+            self.urls.append(url)
+            self.url_host.append(hid)
+        return uid
+
+    def add_page(self, url, links):
+        """Records crawled page ``url`` and its (canonical) out-links; repeats count once."""
+        self.row_node.append(self._url_id(url))
+        targets = {self._url_id(link) for link in links}
+        targets.discard(self.row_node[-1])
+        self.indices.extend(sorted(targets))
+        self.indptr.append(len(self.indices))
+
+    def update(self, other):
+        """Adds every page of ``other`` (e.g. another shard's graph) to this one."""
+        for r, node in enumerate(other.row_node):
+            links = other.indices[other.indptr[r]:other.indptr[r + 1]]
+            self.add_page(other.urls[node], [other.urls[t] for t in links])
+
+    @property
+    def nodes(self):
+        return len(self.urls)
+
+    @property
+    def edges(self):
+        return len(self.indices)
+
+    @property
+    def pages(self):
+        return len(self.row_node)
+
+    def nbytes(self):
+        """Size of the edge and ID buffers (not the interned strings)."""
+        return sum(
+            len(a) * a.itemsize for a in (self.url_host, self.row_node, self.indptr, self.indices)
+        )
+
+    def summary(self):
+        return (
+            f"link graph: pages={self.pages} urls={self.nodes} hosts={len(self.hosts)} "
+            f"edges={self.edges} buffers={self.nbytes() / 1048576:.1f}MB"
+        )
+
+    def save(self, path):
+        """Writes the graph to one binary file: a JSON header, the arrays, then the strings."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        urls = "\n".join(self.urls).encode("utf-8")
+        hosts = "\n".join(self.hosts).encode("utf-8")
+        header = {
+            "byteorder": sys.byteorder,
+            "urls": self.nodes,
+            "hosts": len(self.hosts),
+            "rows": self.pages,
+            "edges": self.edges,
+            "url_bytes": len(urls),
+            "host_bytes": len(hosts),
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for buf in (self.url_host, self.row_node, self.indptr, self.indices):
+                buf.tofile(f)
+            f.write(urls)
+            f.write(hosts)
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        graph = cls()
+        with open(path, "rb") as f:
+            if f.readline() != MAGIC:
+                raise ValueError(f"{path} is not a link graph file")
+            header = json.loads(f.readline())
+            for name, count in (
+                ("url_host", header["urls"]),
+                ("row_node", header["rows"]),
+                ("indptr", header["rows"] + 1),
+                ("indices", header["edges"]),
+            ):
+                buf = array(getattr(graph, name).typecode)
+                buf.fromfile(f, count)
+                if header["byteorder"] != sys.byteorder:
+                    buf.byteswap()
+                setattr(graph, name, buf)
+            urls = f.read(header["url_bytes"]).decode("utf-8")
+            hosts = f.read(header["host_bytes"]).decode("utf-8")
+        graph.urls = urls.split("\n") if header["urls"] else []
+        graph.hosts = hosts.split("\n") if header["hosts"] else []
+        graph._url_ids = {url: i for i, url in enumerate(graph.urls)}
+        graph._host_ids = {host: i for i, host in enumerate(graph.hosts)}
+        return graph
+
+    def host_edges(self):
+        """
+        Distinct host -> host edges (self-links dropped) as NumPy arrays
+        ``(src, dst, links)``, where ``links`` counts the page links behind
+        each edge.
+        """
+        np = _numpy()
+        url_host = np.frombuffer(self.url_host, dtype=np.uint32)
+        rows = np.frombuffer(self.row_node, dtype=np.uint32)
+        counts = np.diff(np.frombuffer(self.indptr, dtype=np.uint64)).astype(np.int64)
+        src = url_host[np.repeat(rows, counts)].astype(np.int64)
+        dst = url_host[np.frombuffer(self.indices, dtype=np.uint32)].astype(np.int64)
+        keep = src != dst
+        keys, links = np.unique(src[keep] * len(self.hosts) + dst[keep], return_counts=True)
+        return keys // len(self.hosts), keys % len(self.hosts), links
+
+
+def pagerank(src, dst, n, damping=0.85, max_iter=100, tol=1e-9):
+    """
+    PageRank by power iteration over edge arrays ``src -> dst`` on ``n``
+    nodes. Rank held by nodes without out-links is spread evenly. Returns
+    ``(ranks, iterations)``; ranks sum to 1.
+    """
+    np = _numpy()
+    if n == 0:
+        return np.zeros(0), 0
+    out_degree = np.bincount(src, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    inv_out = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    rank = np.full(n, 1.0 / n)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        share = (rank * inv_out)[src]
+        new = np.bincount(dst, weights=share, minlength=n)
+        new = damping * (new + rank[dangling].sum() / n) + (1.0 - damping) / n
+        delta = np.abs(new - rank).sum()
+        rank = new
+        if delta < tol:
+            break
+    return rank, iterations
+
+
+def rank_hosts(graph, damping=0.85, max_iter=100, tol=1e-9):
+    """
+    Host-level PageRank and degrees, best first. ``in_degree`` counts
+    distinct linking hosts and ``inbound_links`` the page links behind them;
+    ``pages`` is the number of the host's pages that were crawled.
+    """
+    np = _numpy()
+    n = len(graph.hosts)
+    src, dst, links = graph.host_edges()
+    ranks, _ = pagerank(src, dst, n, damping, max_iter, tol)
+    in_degree = np.bincount(dst, minlength=n)
+    out_degree = np.bincount(src, minlength=n)
+    inbound = np.bincount(dst, weights=links, minlength=n)
+    url_host = np.frombuffer(graph.url_host, dtype=np.uint32)
+    pages = np.bincount(url_host[np.frombuffer(graph.row_node, dtype=np.uint32)], minlength=n)
+    return [
+        {
+            "host": graph.hosts[h],
+            "pagerank": float(ranks[h]),
+            "in_degree": int(in_degree[h]),
+            "inbound_links": int(inbound[h]),
+            "out_degree": int(out_degree[h]),
+            "pages": int(pages[h]),
+        }
+        for h in np.argsort(-ranks, kind="stable")
+    ]
@@ -0,0 +1,297 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+from omni_scraper.config.settings import config
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Histogram bucket upper bounds, in seconds (Tor round trips run to seconds)
+BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+# Hosts beyond ``max_hosts`` are folded into this label
+OTHER_HOST = "other"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus style) with count, sum and max."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimates the ``q`` quantile by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 2),
+            "p99_ms": round(self.quantile(0.99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class Metrics:
+    """
+    Per-stage timings and event counters for a crawl or scrape batch.
+
+    Every observation is kept twice: in the run-wide total and under its
+    host. After ``max_hosts`` distinct hosts further ones share the
+    ``"other"`` label, so a crawl over thousands of onions stays bounded.
+    """
+
+    def __init__(self, max_hosts=None):
+        cfg = config.get("metrics") or {}
+        self.max_hosts = int(max_hosts or cfg.get("max_hosts", 100))
+        self.stages = {}
+        self.counters = {}
+        self.host_stages = {}
+        self.host_counters = {}
+        self.started = time.monotonic()
+
+    def _host(self, host):
+        if host in self.host_stages or len(self.host_stages) < self.max_hosts:
+            return host
+        return OTHER_HOST
+
+    def observe(self, stage, seconds, host=None):
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = Histogram()
+        hist.observe(seconds)
+        if host:
+            stages = self.host_stages.setdefault(self._host(host), {})
+            hist = stages.get(stage)
+            if hist is None:
+                hist = stages[stage] = Histogram()
+            hist.observe(seconds)
+
+    def inc(self, name, n=1, host=None):
+        self.counters[name] = self.counters.get(name, 0) + n
+        if host:
+            counters = self.host_counters.setdefault(self._host(host), {})
+            counters[name] = counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, stage, host=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, host)
+
+    def snapshot(self, per_host=False):
+        snap = {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "counters": dict(sorted(self.counters.items())),
+            "stages": {s: h.summary() for s, h in sorted(self.stages.items())},
+        }
+        if per_host:
+            hosts = sorted(set(self.host_stages) | set(self.host_counters))
+            snap["hosts"] = {
+                host: {
+                    "counters": dict(sorted(self.host_counters.get(host, {}).items())),
+                    "stages": {
+                        s: h.summary() for s, h in sorted(self.host_stages.get(host, {}).items())
+                    },
+                }
+                for host in hosts
+            }
+        return snap
+
+    def stats_line(self):
+        return json.dumps(self.snapshot(), separators=(",", ":"))
+
+    def summary(self):
+        parts = [
+            f"{stage} p50={h['p50_ms']:.0f}ms p99={h['p99_ms']:.0f}ms"
+            for stage, h in self.snapshot()["stages"].items()
+        ]
+        return "stages: " + ("; ".join(parts) or "none")
+
+    def prometheus(self):
+        """Prometheus text exposition of every histogram and counter."""
+        lines = [
+            "# HELP omni_scraper_stage_seconds Time spent per request stage.",
+            "# TYPE omni_scraper_stage_seconds histogram",
+        ]
+        series = [(None, self.stages)] + sorted(self.host_stages.items())
+        for host, stages in series:
+            for stage, hist in sorted(stages.items()):
+                labels = f'stage="{stage}",host="{_escape(host or "all")}"'
+                cumulative = 0
+                for bound, n in zip(hist.bounds + (float("inf"),), hist.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'omni_scraper_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"omni_scraper_stage_seconds_sum{{{labels}}} {hist.sum}")
+                lines.append(f"omni_scraper_stage_seconds_count{{{labels}}} {hist.count}")
+        lines += [
+            "# HELP omni_scraper_events_total Request, response and connection events.",
+            "# TYPE omni_scraper_events_total counter",
+        ]
+        series = [(None, self.counters)] + sorted(self.host_counters.items())
+        for host, counters in series:
+            for name, n in sorted(counters.items()):
+                lines.append(
+                    f'omni_scraper_events_total{{event="{name}",host="{_escape(host or "all")}"}} {n}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Writes the exposition atomically (for node_exporter's textfile collector)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.prometheus())
+        os.replace(tmp, path)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def trace_config(metrics):
+    """
+    aiohttp TraceConfig feeding ``metrics``: DNS and connection setup
+    (TCP plus the SOCKS handshake through Tor), time to response headers,
+    and connection reuse and request failures.
+    """
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, ctx, params):
+        ctx.host = params.url.host
+        ctx.start = time.perf_counter()
+        metrics.inc("requests", host=ctx.host)
+
+    async def on_dns_resolvehost_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(session, ctx, params):
+        metrics.observe("dns", time.perf_counter() - ctx.dns_start, ctx.host)
+
+    async def on_connection_create_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(session, ctx, params):
+        metrics.observe("connect", time.perf_counter() - ctx.connect_start, ctx.host)
+        metrics.inc("connections_created", host=ctx.host)
+
+    async def on_connection_reuseconn(session, ctx, params):
+        metrics.inc("connections_reused", host=ctx.host)
+
+    async def on_request_end(session, ctx, params):
+        # Fired once the response headers are in
+        metrics.observe("ttfb", time.perf_counter() - ctx.start, ctx.host)
+
+    async def on_request_exception(session, ctx, params):
+        metrics.inc("request_errors", host=ctx.host)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace.on_connection_create_start.append(on_connection_create_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+
+class MetricsExporter:
+    """
+    Publishes a Metrics registry while a run is going: a JSON stats line in
+    the log every ``interval`` seconds, the Prometheus exposition rewritten
+    to ``prometheus_file`` and/or served at ``/metrics`` on
+    ``prometheus_port``. On exit it logs the final summary and writes
+    ``summary_file`` (the full snapshot, per host) if set.
+    """
+
+    def __init__(self, metrics, interval=None, prometheus_file=None, prometheus_port=None,
+                 summary_file=None):
+        cfg = config.get("metrics") or {}
+        self.metrics = metrics
+        self.interval = float(cfg.get("interval", 30) if interval is None else interval)
+        self.prometheus_file = prometheus_file or cfg.get("prometheus_file") or None
+        self.prometheus_port = int(prometheus_port or cfg.get("prometheus_port", 0) or 0)
+        self.summary_file = summary_file or cfg.get("summary_file") or None
+        self._task = None
+        self._runner = None
+
+    async def _serve(self, request):
+        return web.Response(
+            text=self.metrics.prometheus(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.export()
+
+    def export(self):
+        logger.info(f"stats {self.metrics.stats_line()}")
+        if self.prometheus_file:
+            try:
+                self.metrics.write_prometheus(self.prometheus_file)
+            except OSError as e:
+                logger.error(f"Could not write metrics to {self.prometheus_file}: {e}")
+
+    async def __aenter__(self):
+        if self.prometheus_port:
+            app = web.Application()
+            app.router.add_get("/metrics", self._serve)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, "127.0.0.1", self.prometheus_port).start()
+            logger.info(f"Serving metrics on http://127.0.0.1:{self.prometheus_port}/metrics")
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.export()
+        logger.info(f"Metrics summary: {self.metrics.summary()}")
+        if self.summary_file:
+            path = Path(self.summary_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.metrics.snapshot(per_host=True), indent=2))
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,87 @@
+import hashlib
+import re
+from collections import Counter
+
+WORD_RE = re.compile(r"\w+")
+
+
+def _popcount(x):
+    return bin(x).count("1")
+
+
+def simhash(text, shingle=3, max_tokens=50_000):
+    """
+    64-bit SimHash of ``text`` over word ``shingle``-grams.
+
+    Pages that differ in a few words map to fingerprints a few bits apart.
+    Only the first ``max_tokens`` words are used so huge pages stay cheap.
+    Feature hashes are blake2b-based (stable across processes, unlike
+    ``hash()``), and bit votes are tallied per byte with Counter rather
+    than 64 Python-level additions per feature.
+    """
+    words = WORD_RE.findall(text.lower())[:max_tokens]
+    if len(words) >= shingle:
+        features = {" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)}
+    else:
+        features = {" ".join(words)} if words else set()
+    if not features:
+        return 0
+    data = b"".join(
+        hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features
+    )
+    half = len(features) / 2
+    fp = 0
+    for pos in range(8):
+        votes = [0] * 8
+        for value, count in Counter(data[pos::8]).items():
+            for bit in range(8):
+                if value >> bit & 1:
+                    votes[bit] += count
+        for bit in range(8):
+            if votes[bit] > half:
+                fp |= 1 << (pos * 8 + bit)
+    return fp
+
+
+def threshold_to_distance(similarity):
+    """Maps a 0..1 similarity threshold to a maximum Hamming distance."""
+    return max(0, min(63, int((1.0 - float(similarity)) * 64)))
+
+
+class SimHashIndex:
+    """
+    Answers "is there a stored fingerprint within ``max_distance`` bits?"
+
+    The 64 bits are split into ``max_distance + 1`` bands; by the pigeonhole
+    principle two fingerprints within that distance agree exactly on at
+    least one band, so a query only compares against fingerprints sharing a
+    band instead of scanning the whole index.
+    """
+
+    def __init__(self, max_distance=3):
+        self.max_distance = int(max_distance)
+        bands = self.max_distance + 1
+        widths = [64 // bands + (1 if i < 64 % bands else 0) for i in range(bands)]
+        self._bands = []
+        shift = 0
+        for width in widths:
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+        self._tables = [{} for _ in self._bands]
+        self._count = 0
+
+    def find(self, fp):
+        """Returns the key of a near-duplicate of ``fp``, or None."""
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for other, key in table.get((fp >> shift) & mask, ()):
+                if _popcount(fp ^ other) <= self.max_distance:
+                    return key
+        return None
+
+    def add(self, fp, key):
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((fp >> shift) & mask, []).append((fp, key))
+        self._count += 1
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from omni_scraper.config.settings import config
+from omni_scraper.core.host_scheduler import host_of
+from omni_scraper.utils.logger import setup_logger
+from omni_scraper.utils.parsing import extract_page, resolve_backend
+
+logger = setup_logger(__name__)
+
+
+class ParsePool:
+    """
+    Parse/extract stage that keeps HTML parsing off the event loop.
+
+    Pages are parsed in a process pool of ``workers`` processes. At most
+    ``max_pending`` pages may be queued for parsing at once; once that bound
+    is hit, ``parse`` blocks the calling fetch worker until a slot frees up,
+    which throttles fetching to what the parsers can keep up with while the
+    other fetch workers keep downloading. ``workers=0`` parses inline on the
+    loop, which is only sensible for one-off scrapes and tests.
+
+    With ``metrics`` set, each page's parse and extract time (measured in
+    the worker) and its ``parse_wait`` (queueing plus IPC) are recorded.
+    """
+
+    def __init__(self, workers=None, backend=None, max_pending=None, metrics=None):
+        cfg = config.get("crawler") or {}
+        self.workers = int(cfg.get("parse_workers", 2) if workers is None else workers)
+        requested = backend or cfg.get("parser", "html.parser")
+        self.backend = resolve_backend(requested)
+        if self.backend != requested:
+            logger.warning(f"Parser backend {requested} not installed; using {self.backend}")
+        self.max_pending = int(max_pending or cfg.get("parse_queue_size", 0) or max(1, self.workers) * 4)
+        self._slots = None
+        self._executor = None
+        self.pending = 0
+        self.parsed = 0
+        self.metrics = metrics
+
+    def _get_executor(self):
+        if self._executor is None and self.workers > 0:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def parse(self, html, base_url, snippet_len=2000, fingerprint=False, anchors=False):
+        start = time.perf_counter()
+        timings = self.metrics is not None
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            self.pending += 1
+            try:
+                executor = self._get_executor()
+                if executor is None:
+                    result = extract_page(
+                        html, base_url, self.backend, snippet_len, fingerprint, timings, anchors
+                    )
+                else:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(
+                        executor,
+                        extract_page,
+                        html,
+                        base_url,
+                        self.backend,
+                        snippet_len,
+                        fingerprint,
+                        timings,
+                        anchors,
+                    )
+            finally:
+                self.pending -= 1
+        self.parsed += 1
+        if timings:
+            self._record(result.pop("timings"), time.perf_counter() - start, base_url)
+        return result
+
+    def _record(self, timings, elapsed, base_url):
+        host = host_of(base_url)
+        for stage, seconds in timings.items():
+            self.metrics.observe(stage, seconds, host)
+        self.metrics.observe("parse_wait", max(0.0, elapsed - sum(timings.values())), host)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.to_thread(self.close)
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """
+    Token bucket: ``rate`` tokens per second, bursts of up to ``capacity``.
+
+    ``acquire`` waits for a token; ``try_acquire`` takes one only if it is
+    available now. ``pause`` holds every caller back for a while, e.g. for a
+    server's Retry-After, without dropping tokens already earned.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return now
+
+    def wait_time(self, tokens=1):
+        """Seconds until ``tokens`` can be taken (inf if they never will)."""
+        now = self._refill()
+        paused = max(0.0, self._paused_until - now)
+        if self.tokens >= tokens:
+            return paused
+        if self.rate <= 0:
+            return float("inf")
+        return max(paused, (tokens - self.tokens) / self.rate)
+
+    def try_acquire(self, tokens=1):
+        if self.wait_time(tokens) > 0:
+            return False
+        self.tokens -= tokens
+        return True
+
+    async def acquire(self, tokens=1):
+        # The lock keeps waiters in FIFO order instead of racing for tokens
+        async with self._lock:
+            while True:
+                wait = self.wait_time(tokens)
+                if wait <= 0:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep(wait)
+
+    def acquire_blocking(self, tokens=1):
+        """``acquire`` for synchronous callers (sleeps the calling thread)."""
+        while not self.try_acquire(tokens):
+            time.sleep(self.wait_time(tokens))
+
+    def pause(self, seconds):
+        self._paused_until = max(self._paused_until, self._clock() + float(seconds))
+
+
+def parse_retry_after(value):
+    """Returns a Retry-After header (seconds or HTTP date) in seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0, retry_after=None):
+    """Exponential backoff for ``attempt`` (0-based), at least ``retry_after``, at most ``cap``."""
+    delay = base * (2 ** attempt)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return min(cap, delay)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from omni_scraper.config.settings import config
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    depth INTEGER,
+    content_hash TEXT,
+    links TEXT,
+    first_seen REAL,
+    last_fetched REAL,
+    last_changed REAL,
+    fetches INTEGER,
+    changes INTEGER,
+    history INTEGER,
+    interval REAL,
+    next_due REAL
+);
+CREATE INDEX IF NOT EXISTS pages_due ON pages (next_due);
+"""
+COLUMNS = (
+    "url", "depth", "content_hash", "links", "first_seen", "last_fetched", "last_changed",
+    "fetches", "changes", "history", "interval", "next_due",
+)
+# Outcomes of the last fetches as bits, newest lowest (1 = changed)
+HISTORY_BITS = 16
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+
+class RecrawlStore:
+    """
+    Per-URL state carried from one crawl to the next: content hash, out-links,
+    fetch/change times and counts, and when the page is next due.
+
+    Revisit intervals adapt per page: a fetch that finds the page changed
+    multiplies its interval by ``shrink``, an unchanged one by ``grow``,
+    within ``minimum``..``maximum`` seconds. New pages start at
+    ``initial``. All methods block; the crawler calls them from a worker
+    thread.
+    """
+
+    def __init__(self, path=None, initial=None, minimum=None, maximum=None, shrink=None, grow=None):
+        cfg = config.get("incremental") or {}
+        self.path = Path(path or Path(config.base_dir) / cfg.get("path", "data/crawls/recrawl.sqlite3"))
+        self.initial = float(initial or float(cfg.get("initial_interval_hours", 24)) * 3600)
+        self.minimum = float(minimum or float(cfg.get("min_interval_hours", 6)) * 3600)
+        self.maximum = float(maximum or float(cfg.get("max_interval_days", 30)) * 86400)
+        self.shrink = float(shrink or cfg.get("shrink", 0.5))
+        self.grow = float(grow or cfg.get("grow", 1.5))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Shards of one crawl share the file: every record is its own short
+        # transaction, so a writer never holds the lock across pages.
+        # synchronous=NORMAL keeps WAL commits cheap (no fsync per commit).
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def get(self, url):
+        """Returns the stored state of ``url`` as a dict, or None if it was never fetched."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        state = dict(zip(COLUMNS, row))
+        state["links"] = json.loads(state["links"]) if state["links"] else []
+        return state
+
+    def due(self, now=None, limit=None):
+        """``(url, depth)`` of pages due for a revisit, most overdue first."""
+        query = "SELECT url, depth FROM pages WHERE next_due <= ? ORDER BY next_due"
+        params = [time.time() if now is None else now]
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def _interval(self, state, changed):
+        if state is None:
+            return self.initial
+        interval = state["interval"] * (self.shrink if changed else self.grow)
+        return min(self.maximum, max(self.minimum, interval))
+
+    def record(self, url, depth, digest, links=None, state=None, now=None):
+        """
+        Records a fetch of ``url`` whose content hashed to ``digest`` and
+        returns "new", "changed" or "unchanged". ``state`` is the result of
+        an earlier ``get`` (looked up again if omitted); ``links`` replace the
+        stored out-links unless None.
+        """
+        now = time.time() if now is None else now
+        if state is None:
+            state = self.get(url)
+        if state is None:
+            status, changed = "new", True
+        else:
+            changed = digest != state["content_hash"]
+            status = "changed" if changed else "unchanged"
+        interval = self._interval(state, changed)
+        previous = state or {}
+        history = ((previous.get("history") or 0) << 1 | changed) & ((1 << HISTORY_BITS) - 1)
+        row = (
+            url,
+            min(depth, previous.get("depth", depth)),
+            digest,
+            json.dumps(links) if links is not None else json.dumps(previous.get("links", [])),
+            previous.get("first_seen", now),
+            now,
+            now if changed else previous.get("last_changed", now),
+            previous.get("fetches", 0) + 1,
+            previous.get("changes", 0) + (changed and state is not None),
+            history,
+            interval,
+            now + interval,
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO pages VALUES ({', '.join('?' * len(COLUMNS))})", row
+            )
+        return status
+
+    def stats(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            pages, due, avg = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(next_due <= ?), 0), COALESCE(AVG(interval), 0) "
+                "FROM pages",
+                (now,),
+            ).fetchone()
+        return {"pages": pages, "due": due, "avg_interval_h": round(avg / 3600, 1)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
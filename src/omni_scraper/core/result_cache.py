@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from omni_scraper.config.settings import config
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookups (
+    key TEXT PRIMARY KEY,
+    service TEXT,
+    value TEXT,
+    negative INTEGER,
+    size INTEGER,
+    expires_at REAL,
+    accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS lookups_accessed ON lookups (accessed_at);
+"""
+
+# Returned by ``get`` on a miss (None is a valid cached value)
+MISS = object()
+
+
+def lookup_key(service, query, params=None):
+    """Cache key for ``query`` to ``service``: whitespace-normalized, params sorted."""
+    query = " ".join(str(query).split())
+    return f"{service}\x1f{query}\x1f{json.dumps(params or {}, sort_keys=True)}"
+
+
+class ResultCache:
+    """
+    Persistent TTL cache for API lookups (Intelligence X, Shodan).
+
+    Entries expire after the service's TTL; empty results ("no leaks") are
+    cached as negatives with their own TTL. Once stored values exceed
+    ``max_bytes`` the least recently used are evicted. With ``refresh`` set,
+    every read misses so fresh answers overwrite the cache.
+    """
+
+    def __init__(self, path=None, max_bytes=None, ttl=None, negative_ttl=None, refresh=False):
+        cfg = config.get("lookup_cache") or {}
+        self.path = Path(path or Path(config.base_dir) / cfg.get("path", "data/cache/lookups.sqlite3"))
+        self.max_bytes = int(max_bytes or float(cfg.get("max_mb", 64)) * 1024 * 1024)
+        hours = dict(cfg.get("ttl_hours") or {})
+        self.ttl = {k: float(v) * 3600 for k, v in hours.items()}
+        self.ttl.update(ttl or {})
+        self.default_ttl = self.ttl.pop("default", 86400)
+        self.negative_ttl = float(
+            negative_ttl or float(cfg.get("negative_ttl_hours", 24)) * 3600
+        )
+        self.refresh = refresh
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM lookups"
+        ).fetchone()[0]
+        self.hits = {}
+        self.misses = {}
+
+    def get(self, service, query, params=None):
+        """Returns the cached value, or ``MISS``."""
+        key = lookup_key(service, query, params)
+        row = None
+        if not self.refresh:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, size, expires_at FROM lookups WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[2] < time.time():
+                    self._conn.execute("DELETE FROM lookups WHERE key = ?", (key,))
+                    self._total -= row[1]
+                    row = None
+                elif row is not None:
+                    self._conn.execute(
+                        "UPDATE lookups SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                    )
+                self._conn.commit()
+        counter = self.misses if row is None else self.hits
+        counter[service] = counter.get(service, 0) + 1
+        return MISS if row is None else json.loads(row[0])
+
+    def put(self, service, query, value, params=None):
+        """Stores ``value``; empty values are cached with the negative TTL."""
+        key = lookup_key(service, query, params)
+        text = json.dumps(value, ensure_ascii=False, default=str)
+        negative = not value
+        now = time.time()
+        expires = now + (self.negative_ttl if negative else self.ttl.get(service, self.default_ttl))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM lookups WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, service, text, int(negative), len(text), expires, now),
+            )
+            self._total += len(text) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+            self._conn.commit()
+
+    def _evict(self, target):
+        rows = self._conn.execute("SELECT key, size FROM lookups ORDER BY accessed_at").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._conn.executemany("DELETE FROM lookups WHERE key = ?", doomed)
+        logger.info(f"Lookup cache evicted {len(doomed)} entries")
+
+    def stats(self):
+        hits = sum(self.hits.values())
+        lookups = hits + sum(self.misses.values())
+        return {
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "by_service": {
+                s: {"hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0)}
+                for s in sorted(set(self.hits) | set(self.misses))
+            },
+            "size_bytes": self._total,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return f"lookup cache hits={s['hits']} misses={s['misses']} hit_rate={s['hit_rate']:.0%}"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
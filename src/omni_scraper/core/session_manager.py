@@ -48,3 +48,12 @@ class SessionManager:
         """
         return self.session
 
+    def get(self, url, timeout=30, **kwargs):
+        """
+        GET through the managed session. Raises requests.HTTPError for 4xx/5xx
+        responses (after the adapter's own retries), so callers can inspect
+        ``error.response``.
+        """
+        resp = self.session.get(url, timeout=timeout, **kwargs)
+        resp.raise_for_status()
+        return resp
@@ -1,4 +1,3 @@
-import time
 from stem import Signal
 from stem.control import Controller
 from omni_scraper.config.settings import config
@@ -16,9 +15,23 @@ class TorManager:
         self.control_port = tor_cfg.get("control_port", 9051)
         self.socks_port = tor_cfg.get("socks_port", 9050)
         self.tor_port = self.socks_port  # Alias for backward compatibility with tests
+        self.socks_ports = list(tor_cfg.get("socks_ports") or [self.socks_port])
         self.password = tor_cfg.get("password")
         self.retry_count = 0
         self.max_retries = tor_cfg.get("max_retries", 3)
+        self._controller = None
+
+    def controller(self):
+        """
+        Returns an authenticated controller connection, reusing the previous
+        one while it is alive instead of reconnecting for every signal.
+        """
+        if self._controller is None or not self._controller.is_alive():
+            self.close()
+            controller = Controller.from_port(port=self.control_port)
+            controller.authenticate(password=self.password)
+            self._controller = controller
+        return self._controller
 
     def renew_identity(self):
         """
@@ -26,13 +39,12 @@ class TorManager:
         Returns True if successful, otherwise False.
         """
         try:
-            with Controller.from_port(port=self.control_port) as controller:
-                controller.authenticate(password=self.password)
-                controller.signal(Signal.NEWNYM)
-                logger.info("Tor circuit renewed successfully.")
-                self.retry_count = 0
-                return True
+            self.controller().signal(Signal.NEWNYM)
+            logger.info("Tor circuit renewed successfully.")
+            self.retry_count = 0
+            return True
         except Exception as e:
+            self.close()
             self.retry_count += 1
             logger.error(
                 f"Failed to renew Tor identity (attempt {self.retry_count}/{self.max_retries}): {e}"
@@ -42,6 +54,15 @@ class TorManager:
                 raise
             return False
 
+    def close(self):
+        """Closes the persistent controller connection, if any."""
+        if self._controller is not None:
+            try:
+                self._controller.close()
+            except Exception:
+                pass
+            self._controller = None
+
     def get_proxies(self):
         """
         Returns a dictionary of HTTP and HTTPS proxy configurations for use with requests or aiohttp.
@@ -51,8 +72,29 @@ class TorManager:
             "https": f"socks5h://127.0.0.1:{self.socks_port}",
         }
 
-    def get_socks_url(self):
+    def get_socks_url(self, isolation=None, port=None):
         """
         Returns a single SOCKS5 proxy URL for use in session configuration.
+        A distinct ``isolation`` key is sent as the SOCKS username, which Tor
+        (IsolateSOCKSAuth, on by default) maps to its own circuit.
         """
-        return f"socks5h://127.0.0.1:{self.socks_port}"
+        auth = f"{isolation}:x@" if isolation else ""
+        return f"socks5h://{auth}127.0.0.1:{port or self.socks_port}"
+
+    def proxy_connector(self, isolation=None, port=None, **kwargs):
+        """
+        Returns an aiohttp_socks ProxyConnector for Tor. Hostnames are resolved
+        by Tor (rdns), which .onion addresses require; aiohttp_socks does not
+        accept the socks5h:// scheme, so the connector is built explicitly.
+        """
+        from aiohttp_socks import ProxyConnector, ProxyType
+
+        return ProxyConnector(
+            host="127.0.0.1",
+            port=port or self.socks_port,
+            proxy_type=ProxyType.SOCKS5,
+            username=isolation,
+            password="x" if isolation else None,
+            rdns=True,
+            **kwargs,
+        )
@@ -0,0 +1,129 @@
+import hashlib
+import math
+from array import array
+
+
+def url_fingerprint(url):
+    """64-bit fingerprint of a (canonical) URL; never 0, which marks empty slots."""
+    fp = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+    return fp or 1
+
+
+class FingerprintSet:
+    """
+    Set of URLs stored as 64-bit fingerprints in an open-addressing table.
+
+    Costs 8 bytes per slot (about 11-16 bytes per URL at the load factors
+    used here) instead of a full Python string per URL. A collision makes two
+    URLs look identical; at 64 bits that stays below one in a million for
+    ten million URLs.
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity=1024):
+        self._alloc(int(capacity / self.MAX_LOAD) + 1)
+        self._count = 0
+
+    def _alloc(self, slots):
+        size = 1 << max(4, (slots - 1).bit_length())
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._limit = int(size * self.MAX_LOAD)
+
+    def _insert(self, fp):
+        table, mask = self._table, self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == 0:
+                table[i] = fp
+                return True
+            if slot == fp:
+                return False
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old = self._table
+        self._alloc(len(old) * 2)
+        for fp in old:
+            if fp:
+                self._insert(fp)
+
+    def add(self, url):
+        """Adds ``url``; returns True if it was not seen before."""
+        if self._count >= self._limit:
+            self._grow()
+        if self._insert(url_fingerprint(url)):
+            self._count += 1
+            return True
+        return False
+
+    def __contains__(self, url):
+        fp = url_fingerprint(url)
+        table, mask = self._table, self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == 0:
+                return False
+            if slot == fp:
+                return True
+            i = (i + 1) & mask
+
+    def __len__(self):
+        return self._count
+
+    def memory_bytes(self):
+        return self._table.itemsize * len(self._table)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over URL fingerprints.
+
+    Sized up front for ``capacity`` URLs at ``error_rate`` false positives;
+    a false positive means a never-seen URL is treated as seen and skipped.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        capacity = max(1, int(capacity))
+        self.bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url):
+        fp = url_fingerprint(url)
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, url):
+        new = False
+        arr = self._array
+        for pos in self._positions(url):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not arr[byte] & mask:
+                arr[byte] |= mask
+                new = True
+        if new:
+            self._count += 1
+        return new
+
+    def __contains__(self, url):
+        arr = self._array
+        return all(arr[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(url))
+
+    def __len__(self):
+        return self._count
+
+    def memory_bytes(self):
+        return len(self._array)
+
+
+def make_seen_set(mode="fingerprint", capacity=1_000_000, error_rate=0.001):
+    if mode == "bloom":
+        return BloomFilter(capacity, error_rate)
+    if mode == "fingerprint":
+        return FingerprintSet(min(int(capacity), 1 << 16))
+    raise ValueError(f"Unknown seen-set mode {mode!r}; use fingerprint or bloom")
@@ -0,0 +1,84 @@
+import asyncio
+
+from omni_scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class WorkerPool:
+    """
+    Keeps ``size`` workers pulling from a frontier until the crawl is done.
+
+    The frontier must provide ``get``, ``task_done`` and ``join`` (an
+    ``asyncio.Queue`` or ``HostScheduler``). A crawl is done when every item
+    ever queued has been handled, i.e. the frontier is empty *and* nothing is
+    in flight, so a momentarily empty frontier never retires a worker.
+    ``stop()`` ends the run early: no new items are taken, and items already
+    in flight are allowed to finish. A handler that raises is logged and
+    counted in ``failed``; the worker moves on to the next item.
+    """
+
+    def __init__(self, frontier, handler, size):
+        self.frontier = frontier
+        self.handler = handler
+        self.size = max(1, int(size))
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.handled = 0
+        self.failed = 0
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    @property
+    def stopping(self):
+        return self._stopping.is_set()
+
+    async def _next(self):
+        """Waits for the next item, or returns None once the pool is stopping."""
+        if self._stopping.is_set():
+            return None
+        getter = asyncio.ensure_future(self.frontier.get())
+        stopper = asyncio.ensure_future(self._stopping.wait())
+        try:
+            await asyncio.wait({getter, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopper.cancel()
+            if not getter.done():
+                getter.cancel()
+        if getter.done() and not getter.cancelled():
+            return getter.result()
+        return None
+
+    async def _worker(self):
+        while True:
+            item = await self._next()
+            if item is None:
+                return
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                await self.handler(item)
+            except Exception:
+                self.failed += 1
+                logger.exception(f"Handler failed for {item!r}")
+            finally:
+                self.in_flight -= 1
+                self.handled += 1
+                self.frontier.task_done()
+
+    async def run(self):
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.size)]
+        drained = asyncio.ensure_future(self.frontier.join())
+        stopped = asyncio.ensure_future(self._stopping.wait())
+        try:
+            await asyncio.wait({drained, stopped}, return_when=asyncio.FIRST_COMPLETED)
+            # Either the frontier is drained (all workers idle) or we are
+            # stopping; both ways, workers exit once their current item is done.
+            self._stopping.set()
+            await asyncio.gather(*workers)
+        finally:
+            for task in (drained, stopped, *workers):
+                task.cancel()
+            await asyncio.gather(drained, stopped, *workers, return_exceptions=True)
@@ -1,60 +1,166 @@
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+
 import aiohttp
-from aiohttp_socks import ProxyConnector
-from bs4 import BeautifulSoup
 
 from ..config.settings import config
-from ..utils.helpers import extract_emails, is_onion, normalize_url
+from ..core.adaptive_limit import AdaptiveLimiter
+from ..core.circuit_pool import CircuitPool
+from ..core.fetcher import Fetcher
+from ..core.http_cache import ResponseCache
+from ..core.metrics import Metrics, MetricsExporter, trace_config
+from ..core.parse_pool import ParsePool
+from ..utils.helpers import is_onion, safe_filename
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
 class AsyncScraper:
-    def __init__(self, use_tor=True):
+    def __init__(self, use_tor=True, parse_pool=None, cache_mode=None):
         self.cfg = config.get("crawler") or {}
         self.timeout = int(self.cfg.get("request_timeout", 30))
         self.delay = float(self.cfg.get("request_delay", 1))
         self.user_agent = self.cfg.get("user_agent", "OmniScraper-Scraper/async")
         self.use_tor = use_tor
-        self.proxy_url = f"socks5h://127.0.0.1:{config.get('tor.socks_port', 9050)}"
+        self.circuits = None
+        # Stage timings and counters, per host
+        self.metrics = Metrics() if config.get("metrics.enabled", True) else None
+        self.parse_pool = parse_pool or ParsePool(metrics=self.metrics)
+        if self.parse_pool.metrics is None:
+            self.parse_pool.metrics = self.metrics
+        self.cache_mode = cache_mode or config.get("cache.mode", "off")
+        self.cache = ResponseCache() if self.cache_mode != "off" else None
+        self.fetcher = None
+        # Batch mode: one pooled session shared by every scrape
+        batch_cfg = config.get("scraper") or {}
+        self.batch_concurrency = int(batch_cfg.get("concurrency", 16))
+        self.limit = int(batch_cfg.get("connection_limit", 100))
+        self.limit_per_host = int(batch_cfg.get("connection_limit_per_host", 4))
+        self._session = None
+        self.adaptive = bool(config.get("adaptive.enabled", True))
+        self.limiter = None
 
-    async def scrape(self, url, save_html=False, html_path=None):
-        connector = ProxyConnector.from_url(self.proxy_url) if self.use_tor else None
+    def close(self):
+        self.parse_pool.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _session_for(self, timeout):
+        traces = [trace_config(self.metrics)] if self.metrics else None
+        if self.use_tor:
+            self.circuits = CircuitPool(
+                timeout=timeout,
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                trace_configs=traces,
+            )
+            return self.circuits
+        connector = aiohttp.TCPConnector(
+            limit=self.limit, limit_per_host=self.limit_per_host
+        )
+        return aiohttp.ClientSession(
+            connector=connector, timeout=timeout, trace_configs=traces
+        )
+
+    @asynccontextmanager
+    async def pooled_session(self):
+        """
+        Shares one session and connection pool across scrapes in the block.
+        Through Tor this is a CircuitPool of isolated circuits.
+        """
         timeout = aiohttp.ClientTimeout(total=self.timeout)
-        headers = {"User-Agent": self.user_agent}
-        async with aiohttp.ClientSession(
-            connector=connector, timeout=timeout
-        ) as session:
+        async with self._session_for(timeout) as session:
+            self._session = session
+            self.fetcher = Fetcher(
+                session, self.user_agent, self.timeout, self.cache_mode, self.cache,
+                self.metrics,
+            )
             try:
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status != 200:
-                        logger.warning(f"Scrape non-200 {url}: {resp.status}")
-                        return {
-                            "url": url,
-                            "status": resp.status,
-                            "error": f"Status {resp.status}",
-                        }
-                    html = await resp.text(errors="ignore")
-                    if save_html and html_path:
-                        with open(html_path, "w", encoding="utf-8") as f:
-                            f.write(html)
-                    text = BeautifulSoup(html, "html.parser").get_text(separator=" ")
-                    emails = extract_emails(text)
-                    links = [
-                        normalize_url(url, a["href"])
-                        for a in BeautifulSoup(html, "html.parser").find_all(
-                            "a", href=True
-                        )
-                        if is_onion(normalize_url(url, a["href"]))
-                    ]
-                    snippet = text.strip()[:5000]
-                    return {
-                        "url": url,
-                        "status": resp.status,
-                        "emails": emails,
-                        "links": links,
-                        "snippet": snippet,
-                    }
-            except Exception as e:
-                logger.exception(f"Scrape failed for {url}: {e}")
-                return {"url": url, "status": None, "error": str(e)}
+                yield session
+            finally:
+                self._session = None
+
+    async def scrape(self, url, save_html=False, html_path=None):
+        if self._session is not None:
+            return await self._scrape(url, save_html, html_path)
+        async with self.pooled_session():
+            return await self._scrape(url, save_html, html_path)
+
+    async def scrape_many(self, urls, concurrency=None, html_dir=None):
+        """
+        Scrapes ``urls`` (any iterable, consumed lazily) through one pooled
+        session, yielding each result as soon as it completes.
+        """
+        concurrency = max(1, int(concurrency or self.batch_concurrency))
+        if self.adaptive and self.cache_mode != "offline":
+            # ``concurrency`` is only the starting point; the limiter adapts it
+            self.limiter = AdaptiveLimiter(concurrency)
+            concurrency = self.limiter.limit.maximum
+        exporter = MetricsExporter(self.metrics) if self.metrics else nullcontext()
+        async with exporter, self.pooled_session():
+            tasks = {}  # task -> url
+            try:
+                for url in urls:
+                    html_path = html_dir and str(html_dir / safe_filename(url))
+                    task = asyncio.ensure_future(self._scrape(url, bool(html_path), html_path))
+                    tasks[task] = url
+                    if len(tasks) >= concurrency:
+                        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield self._outcome(task, tasks.pop(task))
+                while tasks:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield self._outcome(task, tasks.pop(task))
+                logger.info(f"Scrape batch complete: {self.fetcher.transfer_summary()}")
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    @staticmethod
+    def _outcome(task, url):
+        """A finished scrape's result, or an error record if it raised (the batch goes on)."""
+        try:
+            return task.result()
+        except Exception as e:
+            logger.exception(f"Scrape failed for {url}: {e}")
+            return {"url": url, "status": None, "error": str(e) or type(e).__name__}
+
+    async def _fetch(self, url):
+        if self.limiter is None:
+            return await self.fetcher.fetch(url)
+        started = await self.limiter.acquire(url)
+        result = None
+        try:
+            result = await self.fetcher.fetch(url)
+        finally:
+            await self.limiter.release(url, started, result)
+        return result
+
+    async def _scrape(self, url, save_html=False, html_path=None):
+        result = await self._fetch(url)
+        if result.status is None:
+            logger.error(f"Scrape failed for {url}: {result.error}")
+            return {"url": url, "status": None, "error": result.error}
+        if result.skipped:
+            logger.info("Scrape %s: %s", url, result.error)
+            return {"url": url, "status": result.status, "error": result.error}
+        if not result.ok:
+            logger.warning("Scrape non-200 %s: %s", url, result.status)
+            return {"url": url, "status": result.status, "error": result.error}
+        html = result.text
+        if save_html and html_path:
+            with open(html_path, "w", encoding="utf-8") as f:
+                f.write(html)
+        page = await self.parse_pool.parse(html, url, snippet_len=5000)
+        return {
+            "url": url,
+            "status": result.status,
+            "emails": page["emails"],
+            "onions": page["onions"],
+            "pgp_keys": page["pgp_keys"],
+            "wallets": page["wallets"],
+            "links": [link for link in page["links"] if is_onion(link)],
+            "snippet": page["snippet"],
+        }
@@ -1,19 +1,54 @@
 import asyncio
+import time
+from contextlib import nullcontext
 
 import aiohttp
-from aiohttp_socks import ProxyConnector
-from bs4 import BeautifulSoup
 
 from ..config.settings import config
-from ..utils.helpers import extract_emails, is_onion, normalize_url
+from ..core.adaptive_limit import AdaptiveLimiter
+from ..core.circuit_pool import CircuitPool
+from ..core.crawl_state import CrawlStateStore
+from ..core.fetcher import Fetcher
+from ..core.host_scheduler import HostScheduler
+from ..core.link_graph import LinkGraph
+from ..core.link_scorer import LinkScorer
+from ..core.metrics import Metrics, MetricsExporter, trace_config
+from ..core.near_dup import SimHashIndex, threshold_to_distance
+from ..core.parse_pool import ParsePool
+from ..core.recrawl_state import RecrawlStore, content_hash
+from ..core.worker_pool import WorkerPool
+from ..core.url_seen import make_seen_set
+from ..utils.helpers import canonicalize_url, is_onion
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+FRONTIERS = ("fifo", "priority")
+# Every key a crawl result can have (streamed CSV columns); duplicate_of and
+# change only appear on some results
+RESULT_FIELDS = (
+    "url", "depth", "emails", "onions", "pgp_keys", "wallets", "snippet", "duplicate_of", "change",
+)
+
 
 class AsyncWebCrawler:
     def __init__(
-        self, seeds=None, concurrency=None, max_depth=None, max_pages=None, use_tor=True
+        self,
+        seeds=None,
+        concurrency=None,
+        max_depth=None,
+        max_pages=None,
+        use_tor=True,
+        job_id=None,
+        state_dir=None,
+        resume=False,
+        sink=None,
+        keep_results=True,
+        cache_mode=None,
+        shard=None,
+        link_graph=None,
+        frontier=None,
+        incremental=False,
     ):
         self.cfg = config.get("crawler") or {}
         self.max_depth = int(max_depth or self.cfg.get("max_depth", 3))
@@ -22,83 +57,414 @@ class AsyncWebCrawler:
         self.delay = float(self.cfg.get("request_delay", 2))
         self.user_agent = self.cfg.get("user_agent", "OmniScraper-WebCrawler/async")
         self.seeds = seeds or self.cfg.get("seeds", [])
-        self.visited = set()
+        # Every URL ever queued or fetched, as compact fingerprints
+        self.seen = make_seen_set(
+            self.cfg.get("seen_mode", "fingerprint"),
+            self.cfg.get("seen_capacity", 1_000_000),
+            float(self.cfg.get("seen_error_rate", 0.001)),
+        )
+        self.fetched = 0
         self.results = []
+        # Near-duplicate pages (onion mirrors, query-string variants)
+        threshold = float(self.cfg.get("near_dup_threshold", 0.95))
+        self.near_dups = (
+            SimHashIndex(threshold_to_distance(threshold)) if threshold > 0 else None
+        )
+        self.skip_duplicate_links = bool(self.cfg.get("skip_duplicate_links", True))
+        self.duplicates = 0
         self.concurrency = int(concurrency or self.cfg.get("concurrency", 4))
+        self.per_host_concurrency = int(self.cfg.get("per_host_concurrency", 1))
+        self.onion_only = bool(self.cfg.get("onion_only", True))
+        self.parse_workers = int(self.cfg.get("parse_workers", 2))
+        self.parser = self.cfg.get("parser", "html.parser")
+        self.scheduler = None
+        self.pool = None
+        self.parse_pool = None
+        self.cache_mode = cache_mode or config.get("cache.mode", "off")
+        self.fetcher = None
+        # AIMD limits on in-flight requests, overall and per host
+        self.adaptive = bool(config.get("adaptive.enabled", True))
+        self.limiter = None
         self._stop_flag = asyncio.Event()
         self.use_tor = use_tor
-        self.proxy_url = f"socks5h://127.0.0.1:{config.get('tor.socks_port', 9050)}"
+        self.circuits = None
+        # Stage timings and counters, per host
+        self.metrics = Metrics() if config.get("metrics.enabled", True) else None
+        # Crash-safe state: only active when a job id is given
+        self.job_id = job_id
+        self.resume = resume
+        self.store = CrawlStateStore(job_id, state_dir) if job_id else None
+        self.checkpoint_interval = float(self.cfg.get("checkpoint_interval", 30))
+        self._in_flight = {}
+        self._finished = []
+        self._unsaved_results = []
+        # Streaming output: results go to the sink as pages complete
+        self.sink = sink
+        self.keep_results = keep_results
+        self.pages = 0
+        # Set when this crawler is one shard of a multi-process crawl
+        # (sharded_crawler.ShardLink): it owns only some hosts
+        self.shard = shard
+        # Every <a href> edge of the crawled pages, written to this path at the end
+        self.link_graph_path = link_graph or self.cfg.get("link_graph") or None
+        self.link_graph = LinkGraph() if self.link_graph_path else None
+        # "priority" fetches the most promising URLs first instead of breadth-first
+        self.frontier = frontier or config.get("frontier.mode", "fifo")
+        if self.frontier not in FRONTIERS:
+            raise ValueError(f"Unknown frontier {self.frontier!r}; choose from {FRONTIERS}")
+        self.scorer = LinkScorer.from_config() if self.frontier == "priority" else None
+        # Incremental recrawl: only fetch pages that are due, only emit new/changed ones
+        self.incremental = incremental
+        self.recrawl = None
+        self.changes = {"new": 0, "changed": 0, "unchanged": 0, "not_due": 0}
+
+    def _emit(self, result):
+        self.pages += 1
+        if self.sink is not None:
+            self.sink.write(result)
+        if self.keep_results:
+            self.results.append(result)
+            if self.store:  # streamed results are already on disk
+                self._unsaved_results.append(result)
+
+    async def _fetch(self, url):
+        if self.limiter is None:
+            result = await self.fetcher.fetch(url)
+        else:
+            started = await self.limiter.acquire(url)
+            result = None
+            try:
+                result = await self.fetcher.fetch(url)
+            finally:
+                await self.limiter.release(url, started, result)
+        if result.ok:
+            # %-style: formatted on the logging thread, if at all (per-URL
+            # messages are rate-limited)
+            logger.info(
+                "Fetched %s%s (len=%d%s)",
+                url,
+                " from cache" if result.from_cache else "",
+                len(result.text),
+                " truncated" if result.truncated else "",
+            )
+            return result.text
+        if result.skipped:
+            logger.info("%s: %s", url, result.error)
+        elif result.status:
+            logger.warning("%s -> %s", url, result.status)
+        else:
+            logger.warning("Fetch failed %s: %s", url, result.error)
+        return None
 
-    async def _fetch(self, session, url):
-        headers = {"User-Agent": self.user_agent}
+    def _enqueue(self, url, depth, hints=None):
+        """
+        Queues ``url`` unless it is out of scope or already queued/fetched.
+        ``hints`` (emails on the linking page, anchor text) feed the
+        priority frontier's score. Duplicates are found by canonical URL,
+        but the link is fetched as written (minus any fragment).
+        """
+        if depth > self.max_depth:
+            return False
+        key = canonicalize_url(url)
+        if key is None:
+            return False
+        url = url.strip().split("#", 1)[0]
+        if self.shard is not None and not self.shard.owns(url):
+            return self.shard.forward(url, depth, hints)
+        if not self.seen.add(key):
+            return False
+        if self.shard is not None:
+            self.shard.track(1)
+        if self.scorer is None:
+            self.scheduler.put_nowait((url, depth))
+        else:
+            priority = self.scorer.score(url, depth, *(hints or ()))
+            self.scheduler.put_nowait((url, depth), priority)
+        return True
+
+    def _claim(self):
+        """Counts a fetch against max_pages (across all shards when sharded)."""
+        total = self.fetched + 1 if self.shard is None else self.shard.claim()
+        if total is None:
+            self.pool.stop()
+            return False
+        self.fetched += 1
+        if total >= self.max_pages:
+            # Budget reached: let in-flight fetches finish, take nothing new
+            self.pool.stop()
+        return True
+
+    async def _process(self, item):
+        if self.shard is None:
+            return await self._crawl_one(item)
         try:
-            async with session.get(url, headers=headers, timeout=self.timeout) as resp:
-                if resp.status != 200:
-                    logger.warning(f"{url} -> {resp.status}")
-                    return None
-                text = await resp.text(errors="ignore")
-                logger.info(f"Fetched {url} (len={len(text)})")
-                return text
-        except Exception as e:
-            logger.warning(f"Fetch failed {url}: {e}")
-            return None
+            await self._crawl_one(item)
         finally:
-            await asyncio.sleep(self.delay)
-
-    async def _worker(self, session, queue):
-        while (
-            not queue.empty()
-            and len(self.visited) < self.max_pages
-            and not self._stop_flag.is_set()
-        ):
+            self.shard.flush()
+            self.shard.track(-1)
+
+    def _follow(self, url, depth, links, hints=None):
+        """Queues the in-scope ``links`` of ``url``; returns the ones followed."""
+        followed = []
+        for new in links:
+            if self._in_scope(new):
+                followed.append(new)
+                self._enqueue(new, depth + 1, hints(new) if hints else None)
+        return followed
+
+    async def _crawl_one(self, item):
+        url, depth = item
+        queue = self.scheduler
+        released = False
+
+        def release(cooldown=True):
+            # The host's slot is freed exactly once, as soon as the fetch is done
+            nonlocal released
+            if not released:
+                released = True
+                queue.release(url, cooldown=cooldown)
+
+        try:
+            await self._visit(url, depth, release)
+        finally:
+            release(cooldown=False)
+            self._in_flight.pop(url, None)
+
+    async def _visit(self, url, depth, release):
+        state = None
+        if self.recrawl is not None and not self.pool.stopping:
+            state = await asyncio.to_thread(self.recrawl.get, url)
+            if state is not None and state["next_due"] > self._started:
+                # Not due: explore through its last known links, fetch nothing
+                release(cooldown=False)
+                self.changes["not_due"] += 1
+                self._follow(url, depth, state["links"])
+                self._finished.append(url)
+                return
+        if self.pool.stopping or not self._claim():
+            release(cooldown=False)
+            return
+        self._in_flight[url] = depth
+        try:
+            html = await self._fetch(url)
+        finally:
+            release()
+        if html and self.recrawl is not None:
+            digest = content_hash(html)
+            if state is not None and digest == state["content_hash"]:
+                await asyncio.to_thread(
+                    self.recrawl.record, url, depth, digest, state=state, now=self._started
+                )
+                self.changes["unchanged"] += 1
+                if self.link_graph is not None:
+                    self._record_links(url, state["links"])
+                self._follow(url, depth, state["links"])
+                html = None
+        if html:
+            page = await self.parse_pool.parse(
+                html, url, fingerprint=self.near_dups is not None,
+                anchors=self.scorer is not None,
+            )
+            result = {
+                "url": url,
+                "depth": depth,
+                "emails": page["emails"],
+                "onions": page["onions"],
+                "pgp_keys": page["pgp_keys"],
+                "wallets": page["wallets"],
+                "snippet": page["snippet"],
+            }
+            duplicate_of = self._check_duplicate(url, page.get("simhash", 0))
+            if duplicate_of:
+                result["duplicate_of"] = duplicate_of
+            if self.recrawl is not None:
+                result["change"] = "new" if state is None else "changed"
+            self._emit(result)
+            if self.link_graph is not None:
+                self._record_links(url, page["links"])
+            followed = []
+            if not (duplicate_of and self.skip_duplicate_links):
+                anchors = page.get("anchors", {})
+                emails = len(page["emails"])
+
+                def anchor_hints(new):
+                    return emails, anchors.get(new, "")
+
+                followed = self._follow(
+                    url, depth, page["links"], anchor_hints if self.scorer else None
+                )
+            if self.recrawl is not None:
+                status = await asyncio.to_thread(
+                    self.recrawl.record, url, depth, digest, followed, state, self._started
+                )
+                self.changes[status] += 1
+        self._finished.append(url)
+
+    def _record_links(self, url, links):
+        targets = []
+        for link in links:
+            if link.startswith(("http://", "https://")):
+                link = canonicalize_url(link)
+                if link:
+                    targets.append(link)
+        self.link_graph.add_page(canonicalize_url(url) or url, targets)
+
+    def _check_duplicate(self, url, fp):
+        """Returns the URL this page near-duplicates, indexing it if it is new."""
+        if self.near_dups is None or not fp:
+            return None
+        original = self.near_dups.find(fp)
+        if original is None:
+            self.near_dups.add(fp, url)
+            return None
+        self.duplicates += 1
+        logger.info("Near-duplicate %s of %s", url, original)
+        return original
+
+    def _in_scope(self, url):
+        return is_onion(url) if self.onion_only else url.startswith(("http://", "https://"))
+
+    def _restore(self, queue):
+        """Loads a previous checkpoint into memory; returns False if nothing is left."""
+        frontier, visited, results, meta = self.store.load(
+            include_results=self.keep_results
+        )
+        for url in visited:
+            self.seen.add(canonicalize_url(url) or url)
+        self.fetched = len(visited)
+        self.results = results
+        self.seeds = meta.get("seeds", self.seeds)
+        if self.fetched >= self.max_pages:
+            return False
+        for url, depth in frontier:
+            self._enqueue(url, depth)
+        logger.info(
+            f"Resuming job {self.job_id}: frontier={queue.qsize()} "
+            f"visited={self.fetched} results={len(self.results)}"
+        )
+        return not queue.empty()
+
+    async def _checkpoint(self, queue, status="running"):
+        """Snapshots state on the loop, then writes it from a worker thread."""
+        frontier = list(self._in_flight.items()) + queue.snapshot()
+        finished, self._finished = self._finished, []
+        results, self._unsaved_results = self._unsaved_results, []
+        meta = {
+            "seeds": self.seeds,
+            "max_depth": self.max_depth,
+            "max_pages": self.max_pages,
+            "status": status,
+        }
+        # Pages marked visited must have their results on disk first, or a
+        # crash would lose them from the stream and --resume won't refetch them
+        flush = getattr(self.sink, "flush", None)
+        if flush is not None:
+            flush()
+        await asyncio.to_thread(
+            self.store.save_checkpoint, frontier, finished, results, meta
+        )
+
+    async def _checkpoint_loop(self, queue):
+        while not self._stop_flag.is_set():
             try:
-                url, depth = await queue.get()
-            except asyncio.CancelledError:
-                break
-            if url in self.visited:
-                queue.task_done()
-                continue
-            if depth > self.max_depth:
-                queue.task_done()
-                continue
-            self.visited.add(url)
-            html = await self._fetch(session, url)
-            if html:
-                snippet = html.strip()[:2000]
-                emails = extract_emails(html)
-                self.results.append(
-                    {"url": url, "depth": depth, "emails": emails, "snippet": snippet}
+                await asyncio.wait_for(
+                    self._stop_flag.wait(), timeout=self.checkpoint_interval
                 )
-                soup = BeautifulSoup(html, "html.parser")
-                for a in soup.find_all("a", href=True):
-                    new = normalize_url(url, a["href"])
-                    if new and is_onion(new) and new not in self.visited:
-                        queue.put_nowait((new, depth + 1))
-            queue.task_done()
+            except asyncio.TimeoutError:
+                try:
+                    await self._checkpoint(queue)
+                except Exception as e:
+                    logger.error(f"Checkpoint failed for job {self.job_id}: {e}")
 
     async def run(self, seeds=None):
-        seeds = seeds or self.seeds or []
-        if not seeds:
-            logger.error("No seeds")
-            return []
-        connector = ProxyConnector.from_url(self.proxy_url) if self.use_tor else None
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        async with aiohttp.ClientSession(
-            connector=connector, timeout=timeout
-        ) as session:
-            queue = asyncio.Queue()
+        workers = self.concurrency
+        host_limit = None
+        if self.adaptive and self.cache_mode != "offline":
+            self.limiter = AdaptiveLimiter(self.concurrency, self.per_host_concurrency)
+            # Workers only wait on the limiter, so size the pool for its bound
+            workers = self.limiter.limit.maximum
+            host_limit = self.limiter.host_limit
+        queue = self.scheduler = HostScheduler(
+            self.delay, self.per_host_concurrency, host_limit=host_limit
+        )
+        if self.store and self.resume:
+            if not self._restore(queue):
+                logger.info(f"Job {self.job_id} already complete")
+                return self.results
+        elif self.shard is None:
+            # (shards get their seeds from the coordinator instead)
+            seeds = seeds or self.seeds or []
+            if not seeds:
+                logger.error("No seeds")
+                return []
+            self.seeds = list(seeds)
             for s in seeds:
-                queue.put_nowait((s, 0))
-            workers = [
-                asyncio.create_task(self._worker(session, queue))
-                for _ in range(self.concurrency)
-            ]
-            await queue.join()
+                self._enqueue(s, 0)
+        # Fetches are recorded at the run's start, so a page revisited every
+        # 24h is due again at the start of tomorrow's run, not a bit after it
+        self._started = time.time()
+        if self.incremental:
+            self.recrawl = await asyncio.to_thread(RecrawlStore)
+            # Known pages that are due get revisited even if no link leads
+            # there now (shards get theirs from the coordinator, with the seeds)
+            if self.shard is None:
+                for url, depth in await asyncio.to_thread(self.recrawl.due, self._started):
+                    self._enqueue(url, depth)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        traces = [trace_config(self.metrics)] if self.metrics else None
+        if self.use_tor:
+            # Requests are spread over isolated circuits, fastest first
+            session = self.circuits = CircuitPool(timeout=timeout, trace_configs=traces)
+        else:
+            session = aiohttp.ClientSession(timeout=timeout, trace_configs=traces)
+        exporter = MetricsExporter(self.metrics) if self.metrics else nullcontext()
+        checkpointer = (
+            asyncio.create_task(self._checkpoint_loop(queue)) if self.store else None
+        )
+        status = "interrupted"
+        try:
+            async with exporter, session, ParsePool(
+                self.parse_workers, self.parser, metrics=self.metrics
+            ) as parse_pool:
+                self.parse_pool = parse_pool
+                self.fetcher = Fetcher(
+                    session, self.user_agent, self.timeout, self.cache_mode,
+                    metrics=self.metrics,
+                )
+                self.pool = WorkerPool(queue, self._process, workers)
+                listener = self.shard.listen(self) if self.shard else None
+                try:
+                    await self.pool.run()
+                finally:
+                    if listener is not None:
+                        listener.cancel()
+                        await asyncio.gather(listener, return_exceptions=True)
+            status = "complete"
+        finally:
             self._stop_flag.set()
-            for w in workers:
-                w.cancel()
-            await asyncio.gather(*workers, return_exceptions=True)
+            if self.fetcher:
+                self.fetcher.close()
+            if checkpointer:
+                await checkpointer
+                await self._checkpoint(queue, status=status)
+            if self.recrawl is not None:
+                await asyncio.to_thread(self.recrawl.close)
+            if self.link_graph is not None:
+                path = await asyncio.to_thread(self.link_graph.save, self.link_graph_path)
+                logger.info(f"Saved {self.link_graph.summary()} to {path}")
+        stats = queue.stats()
         logger.info(
-            f"Crawl complete: pages={len(self.results)} visited={len(self.visited)}"
+            f"Crawl complete: pages={self.pages} fetched={self.fetched} "
+            f"seen={len(self.seen)} ({self.seen.memory_bytes() // 1024} KiB) "
+            f"near_duplicates={self.duplicates} {self.fetcher.cache_summary()} "
+            f"{self.fetcher.transfer_summary()} "
+            f"hosts={stats['hosts']} politeness_wait={stats['politeness_wait_total']}s "
+            f"peak_workers={self.pool.peak_in_flight}/{workers}"
+            + (f" concurrency_limit={self.limiter.limit.value}" if self.limiter else "")
+            + (
+                " incremental " + " ".join(f"{k}={v}" for k, v in self.changes.items())
+                if self.recrawl else ""
+            )
+            + (f" {self.circuits.summary()}" if self.circuits else "")
         )
         return self.results
@@ -1,21 +1,50 @@
+import asyncio
 import time
 
+import aiohttp
 import requests
 
 from ..config.settings import config
+from ..core.rate_limit import TokenBucket, backoff_delay, parse_retry_after
+from ..core.result_cache import MISS
 from ..core.session_manager import SessionManager
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Statuses that mean "slow down and try again"
+RETRY_STATUSES = (429, 503)
+
+
+class QuotaExhausted(Exception):
+    """The Intelligence X plan quota is used up; resume the run later."""
+
+
+class RateLimited(Exception):
+    """One lookup was still throttled after every retry; the others carry on."""
+
 
 class BreachChecker:
-    def __init__(self, session: SessionManager = None):
+    def __init__(self, session: SessionManager = None, cache=None):
         self.config = config.get("intelx") or {}
-        self.base_url = "https://free.intelx.io"
+        self.base_url = self.config.get("base_url", "https://free.intelx.io")
         self.api_key = self.config.get("api_key", "")
         self.rate_limit_delay = float(self.config.get("rate_limit_delay", 1.0))
+        self.max_retries = int(self.config.get("max_retries", 5))
+        self.backoff_max = float(self.config.get("backoff_max", 60))
+        self.concurrency = int(self.config.get("concurrency", 4))
         self.session_manager = session or SessionManager(use_tor=False)
+        # One request per rate_limit_delay on average, in bursts of ``burst``
+        self.bucket = TokenBucket(
+            1.0 / max(self.rate_limit_delay, 1e-3), self.config.get("burst", 1)
+        )
+        # The plan's daily quota: refills over 24h, never waited on
+        daily = int(self.config.get("daily_quota", 50))
+        self.quota = TokenBucket(daily / 86400, daily) if daily > 0 else None
+        self._last_call = 0.0
+        self.exhausted = False
+        # Optional ResultCache; hits cost no quota
+        self.cache = cache
 
     def _headers(self):
         headers = {
@@ -28,43 +57,185 @@ class BreachChecker:
             logger.warning("No Intelligence X key—limited to 50/day. Get at intelx.io")
         return headers
 
-    def check_email(self, email):
+    def _request(self, email):
         if not email:
             raise ValueError("Email required")
-        url = f"{self.base_url}/search"
-        params = {
-            "term": email,
-            "buckets": 1,
-            "terminate": ["email", "domain"],
-            "limit": 10,
-            "timeout": 5,
-        }
-        try:
-            resp = self.session_manager.get(url, params=params, headers=self._headers())
-            data = resp.json()
-            time.sleep(self.rate_limit_delay)
-            leaks = data.get("records", [])
-            logger.info(f"Intelligence X: {email} -> {len(leaks)} leaks")
-            return [
-                {
-                    "email": email,
-                    "source": leak.get("title"),
-                    "date": leak.get("date"),
-                    "snippet": leak.get("content", "")[:200],
-                }
-                for leak in leaks
-            ]
-        except requests.exceptions.HTTPError as he:
-            if he.response.status_code == 404:
-                logger.info(f"No leaks for {email}")
-                return []
-            elif he.response.status_code == 429:
-                logger.warning("Rate limit; sleeping")
-                time.sleep(self.rate_limit_delay * 2)
-                return self.check_email(email)
-            else:
-                logger.exception(f"Intelligence X error for {email}: {he}")
+        params = [
+            ("term", email),
+            ("buckets", "1"),
+            ("terminate", "email"),
+            ("terminate", "domain"),
+            ("limit", "10"),
+            ("timeout", "5"),
+        ]
+        return f"{self.base_url}/search", params
+
+    def _leaks(self, email, data):
+        leaks = data.get("records") or []
+        logger.info(f"Intelligence X: {email} -> {len(leaks)} leaks")
+        return [
+            {
+                "email": email,
+                "source": leak.get("title"),
+                "date": leak.get("date"),
+                "snippet": (leak.get("content") or "")[:200],
+            }
+            for leak in leaks
+        ]
+
+    def _take_quota(self):
+        if self.quota is not None and not self.quota.try_acquire():
+            raise QuotaExhausted("Daily Intelligence X quota used up")
+
+    def _retry_delay(self, email, status, retry_after, attempt):
+        """
+        Bounded backoff for a 429/503. Raises RateLimited once the retries
+        are used up, or QuotaExhausted if Retry-After is not worth waiting.
+        """
+        if attempt >= self.max_retries:
+            raise RateLimited(f"Still rate limited after {attempt} retries")
+        if retry_after is not None and retry_after > self.backoff_max:
+            raise QuotaExhausted(f"Retry-After {retry_after:.0f}s exceeds backoff_max")
+        delay = backoff_delay(attempt, self.rate_limit_delay, self.backoff_max, retry_after)
+        logger.warning(f"Intelligence X {status} for {email}; retrying in {delay:.1f}s")
+        return delay
+
+    def check_email(self, email):
+        if self.cache is not None:
+            cached = self.cache.get("intelx", email.strip().lower())
+            if cached is not MISS:
+                return cached
+        leaks = self._check_email(email)
+        if self.cache is not None:
+            self.cache.put("intelx", email.strip().lower(), leaks)
+        return leaks
+
+    def _check_email(self, email):
+        url, params = self._request(email)
+        # One lookup costs one unit of quota, however many retries it takes
+        self._take_quota()
+        for attempt in range(self.max_retries + 1):
+            wait = self._last_call + self.rate_limit_delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+            try:
+                resp = self.session_manager.get(url, params=params, headers=self._headers())
+                return self._leaks(email, resp.json())
+            except requests.exceptions.HTTPError as he:
+                status = he.response.status_code
+                if status == 404:
+                    logger.info(f"No leaks for {email}")
+                    return []
+                if status == 402:
+                    raise QuotaExhausted("Intelligence X credits exhausted") from he
+                if status not in RETRY_STATUSES:
+                    logger.exception(f"Intelligence X error for {email}: {he}")
+                    raise
+                retry_after = parse_retry_after(he.response.headers.get("Retry-After"))
+                time.sleep(self._retry_delay(email, status, retry_after, attempt))
+            except requests.exceptions.RetryError as re:
+                # The session's adapter already retried (honouring Retry-After)
+                raise RateLimited(f"Still rate limited: {re}") from re
+            except Exception as e:
+                logger.exception(f"Intelligence X unhandled error for {email}: {e}")
+                raise
+
+    async def check_email_async(self, session, email):
+        """Async ``check_email`` sharing the token bucket and quota across tasks."""
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, "intelx", email.strip().lower())
+            if cached is not MISS:
+                return cached
+        leaks = await self._check_email_async(session, email)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, "intelx", email.strip().lower(), leaks)
+        return leaks
+
+    async def _check_email_async(self, session, email):
+        url, params = self._request(email)
+        self._take_quota()
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            async with session.get(url, params=params, headers=self._headers()) as resp:
+                if resp.status == 404:
+                    logger.info(f"No leaks for {email}")
+                    return []
+                if resp.status == 402:
+                    raise QuotaExhausted("Intelligence X credits exhausted")
+                if resp.status in RETRY_STATUSES:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    delay = self._retry_delay(email, resp.status, retry_after, attempt)
+                    # Every task backs off, not just this one
+                    self.bucket.pause(delay)
+                    continue
+                resp.raise_for_status()
+                return self._leaks(email, await resp.json(content_type=None))
+
+    async def check_many(self, emails, concurrency=None, store=None, checkpoint_every=20):
+        """
+        Checks ``emails`` (any iterable, consumed lazily) concurrently and
+        yields ``{"email", "leaks"}`` or ``{"email", "error"}`` as each
+        completes. With a CrawlStateStore, finished emails are checkpointed
+        and skipped on the next run; the run stops early once the quota is
+        exhausted, with ``self.exhausted`` set. An email still rate limited
+        after every retry gets an error result and is checked again next run.
+        """
+        concurrency = max(1, int(concurrency or self.concurrency))
+        done = set()
+        if store is not None and store.exists():
+            done = store.load(include_results=False)[1]
+            logger.info(f"Resuming breach check: {len(done)} emails already checked")
+        self.exhausted = False
+        finished = []
+
+        async def save(status="running"):
+            nonlocal finished
+            if store is not None:
+                batch, finished = finished, []
+                await asyncio.to_thread(
+                    store.save_checkpoint, [], batch, [], {"status": status}
+                )
+
+        async def one(session, email):
+            try:
+                return {"email": email, "leaks": await self.check_email_async(session, email)}
+            except QuotaExhausted:
                 raise
-        except Exception as e:
-            logger.exception(f"Intelligence X unhandled error for {email}: {e}")
-            raise
+            except Exception as e:
+                return {"email": email, "error": str(e) or type(e).__name__}
+
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            tasks = set()
+            pending = (e for e in emails if e and e not in done)
+            try:
+                while True:
+                    # Once the quota is gone, only drain lookups already started
+                    for email in () if self.exhausted else pending:
+                        tasks.add(asyncio.ensure_future(one(session, email)))
+                        if len(tasks) >= concurrency:
+                            break
+                    if not tasks:
+                        break
+                    completed, tasks = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in completed:
+                        try:
+                            result = task.result()
+                        except QuotaExhausted as e:
+                            if not self.exhausted:
+                                logger.warning(f"Stopping breach check: {e}")
+                            self.exhausted = True
+                            continue
+                        if "error" not in result:
+                            finished.append(result["email"])
+                        yield result
+                    if len(finished) >= checkpoint_every:
+                        await save()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await save("quota_exhausted" if self.exhausted else "complete")
@@ -0,0 +1,353 @@
+"""
+Multi-process crawling: the frontier is partitioned by a hash of the host
+across N shard processes, each running its own AsyncWebCrawler (frontier,
+seen set, sessions, parse pool) for the hosts it owns.
+
+Links to hosts owned by another shard are forwarded to that shard's inbox
+queue. ``max_pages`` is enforced through a shared counter every shard
+claims from, and ``max_depth`` travels with each forwarded link. A shared
+count of outstanding URLs (queued, in flight or in transit between shards)
+tells the coordinator when the crawl is finished. Results stream back to
+the coordinator, which merges them into one list or sink.
+"""
+import asyncio
+import multiprocessing
+import queue
+import zlib
+from pathlib import Path
+
+from ..config.settings import config
+from ..utils.helpers import canonicalize_url
+from ..utils.logger import setup_logger
+from ..core.host_scheduler import host_of
+from ..core.link_graph import LinkGraph
+from ..core.recrawl_state import RecrawlStore
+
+logger = setup_logger(__name__)
+
+# Results are sent to the coordinator in batches of this many
+RESULT_BATCH = 20
+
+
+def shard_of(url, count):
+    """The shard owning ``url``'s host (stable across processes and runs)."""
+    return zlib.crc32(host_of(url).encode()) % count
+
+
+class ShardLink:
+    """A shard's connection to the others and to the crawl-wide counters."""
+
+    def __init__(self, index, count, inboxes, outstanding, claimed, max_pages):
+        self.index = index
+        self.count = count
+        self.inboxes = inboxes
+        self.outstanding = outstanding
+        self.claimed = claimed
+        self.max_pages = max_pages
+        self.forwarded = 0
+        self.received = 0
+        self._outgoing = {}
+
+    def owns(self, url):
+        return shard_of(url, self.count) == self.index
+
+    def forward(self, url, depth, hints=None):
+        """Buffers a link for its owning shard; it counts as outstanding until handled there."""
+        self.track(1)
+        self._outgoing.setdefault(shard_of(url, self.count), []).append((url, depth, hints))
+        self.forwarded += 1
+        return True
+
+    def flush(self):
+        outgoing, self._outgoing = self._outgoing, {}
+        for owner, batch in outgoing.items():
+            self.inboxes[owner].put(batch)
+
+    def track(self, n):
+        with self.outstanding.get_lock():
+            self.outstanding.value += n
+
+    def claim(self):
+        """Takes one page from the global budget; returns the new total, or None if spent."""
+        with self.claimed.get_lock():
+            if self.claimed.value >= self.max_pages:
+                return None
+            self.claimed.value += 1
+            return self.claimed.value
+
+    def listen(self, crawler):
+        """
+        Starts feeding links from this shard's inbox into ``crawler``'s
+        frontier. The frontier is held open until the coordinator sends the
+        stop message (``None``), which also stops the worker pool.
+        """
+        crawler.scheduler.hold()
+        return asyncio.create_task(self._listen(crawler))
+
+    async def _listen(self, crawler):
+        inbox = self.inboxes[self.index]
+        try:
+            while True:
+                try:
+                    # A short timeout lets the thread exit soon after a cancel
+                    batch = await asyncio.to_thread(inbox.get, True, 0.5)
+                except queue.Empty:
+                    continue
+                if batch is None:
+                    return
+                for url, depth, hints in batch:
+                    crawler._enqueue(url, depth, hints)
+                self.received += len(batch)
+                # Accepted links were counted again by _enqueue
+                self.track(-len(batch))
+        finally:
+            crawler.pool.stop()
+            crawler.scheduler.unhold()
+
+
+class QueueSink:
+    """Sink handed to a shard's crawler: results go to the coordinator in batches."""
+
+    def __init__(self, results, index):
+        self.results = results
+        self.index = index
+        self._batch = []
+
+    def write(self, result):
+        self._batch.append(result)
+        if len(self._batch) >= RESULT_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self._batch:
+            self.results.put(("results", self.index, self._batch))
+            self._batch = []
+
+
+def _apply_overrides(overrides):
+    for section, values in (overrides or {}).items():
+        if isinstance(values, dict):
+            config.config.setdefault(section, {}).update(values)
+        else:
+            config.config[section] = values
+
+
+def _shard_config(index):
+    """Per-shard metrics outputs, so shards do not clobber each other's."""
+    metrics = config.config.get("metrics") or {}
+    if metrics.get("prometheus_port"):
+        metrics["prometheus_port"] = int(metrics["prometheus_port"]) + index
+    for key in ("prometheus_file", "summary_file"):
+        if metrics.get(key):
+            metrics[key] = f"{metrics[key]}.shard{index}"
+
+
+def _recrawl_path(overrides):
+    """Where the shards' RecrawlStore lives, given their config overrides."""
+    cfg = {**(config.get("incremental") or {}), **((overrides or {}).get("incremental") or {})}
+    return Path(config.base_dir) / cfg.get("path", "data/crawls/recrawl.sqlite3")
+
+
+def _shard_graph_path(path, index):
+    return f"{path}.shard{index}"
+
+
+def _shard_main(index, count, options, overrides, inboxes, results, outstanding, claimed):
+    """Entry point of a shard process."""
+    _apply_overrides(overrides)
+    _shard_config(index)
+    from .async_web_crawler import AsyncWebCrawler
+
+    options = dict(options)
+    if options.get("link_graph"):
+        options["link_graph"] = _shard_graph_path(options["link_graph"], index)
+    link = ShardLink(index, count, inboxes, outstanding, claimed, options["max_pages"])
+    sink = QueueSink(results, index)
+    crawler = AsyncWebCrawler(**options, sink=sink, keep_results=False, shard=link)
+    try:
+        asyncio.run(crawler.run())
+    finally:
+        sink.flush()
+        results.put((
+            "done",
+            index,
+            {
+                "pages": crawler.pages,
+                "fetched": crawler.fetched,
+                "duplicates": crawler.duplicates,
+                "forwarded": link.forwarded,
+                "received": link.received,
+            },
+        ))
+
+
+class ShardedCrawler:
+    """
+    Runs a crawl as ``workers`` shard processes (see the module docstring).
+    Takes the AsyncWebCrawler options that apply per run; checkpointing
+    (``job_id``/``resume``) is not available in sharded mode. ``overrides``
+    is a ``{section: {key: value}}`` dict applied to each shard's config,
+    since shards are fresh processes that load config themselves.
+    """
+
+    def __init__(
+        self,
+        workers,
+        seeds=None,
+        concurrency=None,
+        max_depth=None,
+        max_pages=None,
+        use_tor=True,
+        sink=None,
+        keep_results=True,
+        cache_mode=None,
+        overrides=None,
+        link_graph=None,
+        frontier=None,
+        incremental=False,
+    ):
+        cfg = config.get("crawler") or {}
+        # Each shard records its own graph; they are merged into this path
+        self.link_graph = link_graph or cfg.get("link_graph") or None
+        self.workers = max(1, int(workers))
+        self.seeds = list(seeds or cfg.get("seeds", []))
+        self.max_pages = int(max_pages or cfg.get("max_pages", 100))
+        self.options = {
+            "concurrency": concurrency,
+            "max_depth": max_depth,
+            "max_pages": self.max_pages,
+            "use_tor": use_tor,
+            "cache_mode": cache_mode,
+            "link_graph": self.link_graph,
+            "frontier": frontier,
+            "incremental": incremental,
+        }
+        self.overrides = overrides
+        self.sink = sink
+        self.keep_results = keep_results
+        self.results = []
+        self.pages = 0
+        self.shard_stats = {}
+        self.failed = []
+
+    def _emit(self, batch):
+        self.pages += len(batch)
+        for result in batch:
+            if self.sink is not None:
+                self.sink.write(result)
+            if self.keep_results:
+                self.results.append(result)
+
+    def run(self):
+        """Runs the crawl to completion (blocking) and returns the merged results."""
+        if not self.seeds:
+            logger.error("No seeds")
+            return []
+        ctx = multiprocessing.get_context("spawn")
+        inboxes = [ctx.Queue() for _ in range(self.workers)]
+        results = ctx.Queue()
+        outstanding = ctx.Value("q", 0)
+        claimed = ctx.Value("q", 0)
+        procs = [
+            ctx.Process(
+                target=_shard_main,
+                args=(i, self.workers, self.options, self.overrides, inboxes, results,
+                      outstanding, claimed),
+                name=f"omni-shard-{i}",
+                # Not daemonic: a shard starts its own parse pool processes
+            )
+            for i in range(self.workers)
+        ]
+        for proc in procs:
+            proc.start()
+        seeds = self._initial_batches()
+        with outstanding.get_lock():
+            outstanding.value += sum(len(batch) for batch in seeds.values())
+        for owner, batch in seeds.items():
+            inboxes[owner].put(batch)
+        logger.info(f"Sharded crawl: {self.workers} shards, seeds={len(self.seeds)}")
+
+        stopping = False
+        try:
+            while len(self.shard_stats) + len(self.failed) < self.workers:
+                try:
+                    kind, index, payload = results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                else:
+                    if kind == "results":
+                        self._emit(payload)
+                    else:
+                        self.shard_stats[index] = payload
+                for index, proc in enumerate(procs):
+                    if (
+                        proc.exitcode not in (None, 0)
+                        and index not in self.shard_stats
+                        and index not in self.failed
+                    ):
+                        logger.error(f"Shard {index} died (exit code {proc.exitcode})")
+                        self.failed.append(index)
+                done = outstanding.value <= 0 or claimed.value >= self.max_pages
+                if not stopping and (done or self.failed):
+                    stopping = True
+                    for inbox in inboxes:
+                        inbox.put(None)
+            # Drain anything still in flight so no shard blocks on a full pipe at exit
+            while any(proc.is_alive() for proc in procs):
+                for q in (results, *inboxes):
+                    try:
+                        while True:
+                            item = q.get_nowait()
+                            if q is results and item[0] == "results":
+                                self._emit(item[2])
+                    except queue.Empty:
+                        pass
+                for proc in procs:
+                    proc.join(timeout=0.05)
+        finally:
+            for proc in procs:
+                if proc.is_alive():
+                    proc.terminate()
+                proc.join()
+        if self.link_graph:
+            self._merge_graphs()
+        forwarded = sum(s["forwarded"] for s in self.shard_stats.values())
+        logger.info(
+            f"Sharded crawl complete: pages={self.pages} shards={self.workers} "
+            f"claimed={claimed.value} forwarded={forwarded} "
+            f"per_shard={[self.shard_stats.get(i, {}).get('pages') for i in range(self.workers)]}"
+            + (f" failed_shards={self.failed}" if self.failed else "")
+        )
+        return self.results
+
+    def _initial_batches(self):
+        """
+        ``{shard: [(url, depth, hints)]}`` to start the crawl with: the seeds
+        and, for an incremental crawl, the pages due for a revisit. Sending
+        due pages from here counts them as outstanding before any shard
+        could see the crawl as finished without them.
+        """
+        start = [(url, 0) for url in self.seeds]
+        if self.options["incremental"]:
+            store = RecrawlStore(_recrawl_path(self.overrides))
+            try:
+                due = store.due()
+            finally:
+                store.close()
+            logger.info(f"Incremental crawl: {len(due)} known pages due for a revisit")
+            start.extend(due)
+        batches = {}
+        for url, depth in start:
+            if canonicalize_url(url):
+                batches.setdefault(shard_of(url, self.workers), []).append((url, depth, None))
+        return batches
+
+    def _merge_graphs(self):
+        graph = LinkGraph()
+        for index in range(self.workers):
+            part = Path(_shard_graph_path(self.link_graph, index))
+            if part.exists():
+                graph.update(LinkGraph.load(part))
+                part.unlink()
+        graph.save(self.link_graph)
+        logger.info(f"Saved {graph.summary()} to {self.link_graph}")
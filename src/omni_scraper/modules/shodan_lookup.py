@@ -1,42 +1,129 @@
+import asyncio
+import ipaddress
+import time
+
 import shodan
 
 from ..config.settings import config
+from ..core.rate_limit import TokenBucket, backoff_delay
+from ..core.result_cache import MISS
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Shodan returns 100 matches per search page
+PAGE_SIZE = 100
+
+
+def normalize_ip(ip):
+    """Canonical text form of ``ip`` (the lookup cache key); raises ValueError if invalid."""
+    return ipaddress.ip_address(ip.strip()).compressed
+
+
+def _summarize(match):
+    return {
+        "ip_str": match.get("ip_str"),
+        "port": match.get("port"),
+        "org": match.get("org"),
+        "data": (match.get("data") or "")[:500],  # trim
+    }
+
 
 class ShodanLookup:
-    def __init__(self):
+    def __init__(self, cache=None):
         api_key = config.get("shodan.api_key")
         if not api_key:
             raise ValueError(
                 "SHODAN_API_KEY not configured. Set in .env or config/default.yaml"
             )
         self.client = shodan.Shodan(api_key)
+        # Optional ResultCache; hits cost no query credits
+        self.cache = cache
+        cfg = config.get("shodan") or {}
+        # Shodan allows about one request per second per key
+        self.bucket = TokenBucket(float(cfg.get("requests_per_second", 1.0)))
+        self.concurrency = int(cfg.get("concurrency", 4))
+        self.max_retries = int(cfg.get("max_retries", 3))
+
+    def _cached(self, service, query, params, fetch):
+        if self.cache is None:
+            return fetch()
+        value = self.cache.get(service, query, params)
+        if value is MISS:
+            value = fetch()
+            self.cache.put(service, query, value, params)
+        return value
 
     def host_search(self, query, limit=10):
         """Run a basic Shodan search query (returns a list of matches)."""
-        results = []
+        return self._cached(
+            "shodan_search", query, {"limit": limit}, lambda: self._host_search(query, limit)
+        )
+
+    def _host_search(self, query, limit):
         try:
             res = self.client.search(query, limit=limit)
-            for match in res.get("matches", []):
-                results.append(
-                    {
-                        "ip_str": match.get("ip_str"),
-                        "port": match.get("port"),
-                        "org": match.get("org"),
-                        "data": match.get("data")[:500],  # trim
-                    }
-                )
+            results = [_summarize(match) for match in res.get("matches", [])]
             logger.info(f"Shodan: query={query} results={len(results)}")
             return results
         except Exception as e:
             logger.exception(f"Shodan search failed: {e}")
             raise
 
+    def _call(self, fn, *args, **kwargs):
+        """Calls the API within the rate limit, backing off on "rate limit" errors."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire_blocking()
+            try:
+                return fn(*args, **kwargs)
+            except shodan.APIError as e:
+                if "rate limit" not in str(e).lower() or attempt == self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"Shodan rate limited; retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+    def _search_page(self, query, page):
+        res = self._call(self.client.search, query, page=page)
+        return {
+            "total": res.get("total", 0),
+            "matches": [_summarize(match) for match in res.get("matches", [])],
+        }
+
+    def iter_search(self, query, max_results=None, start_page=1):
+        """
+        Yields every match for ``query``, one result page at a time, so large
+        result sets stream to the output instead of being held in memory.
+        Each page is cached on its own; ``max_results`` stops early.
+        """
+        page = start_page
+        yielded = 0
+        while True:
+            result = self._cached(
+                "shodan_search", query, {"page": page},
+                lambda p=page: self._search_page(query, p),
+            )
+            for match in result["matches"]:
+                if max_results and yielded >= max_results:
+                    return
+                yielded += 1
+                yield match
+            logger.info(
+                f"Shodan: query={query} page={page} results={yielded}/{result['total']}"
+            )
+            if len(result["matches"]) < PAGE_SIZE or page * PAGE_SIZE >= result["total"]:
+                return
+            page += 1
+
     def host_lookup(self, ip):
         """Get detailed host info."""
+        try:
+            key = normalize_ip(ip)
+        except ValueError:
+            key = ip.strip()  # let Shodan report the bad address
+        return self._cached("shodan_host", key, None, lambda: self._host_lookup(key))
+
+    def _host_lookup(self, ip):
         try:
             info = self.client.host(ip)
             logger.info(f"Shodan host lookup: {ip}")
@@ -44,3 +131,60 @@ class ShodanLookup:
         except Exception as e:
             logger.exception(f"Shodan lookup failed for {ip}: {e}")
             raise
+
+    async def host_lookup_many(self, ips, concurrency=None):
+        """
+        Looks up ``ips`` (any iterable, consumed lazily) in parallel within the
+        rate limit, yielding ``{"ip", "host"}`` or ``{"ip", "error"}`` as each
+        completes. Repeated IPs are looked up once.
+        """
+        concurrency = max(1, int(concurrency or self.concurrency))
+        seen = set()
+
+        async def one(ip):
+            try:
+                if self.cache is not None:
+                    cached = await asyncio.to_thread(self.cache.get, "shodan_host", ip)
+                    if cached is not MISS:
+                        return {"ip": ip, "host": cached}
+                await self.bucket.acquire()
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        info = await asyncio.to_thread(self.client.host, ip)
+                        break
+                    except shodan.APIError as e:
+                        if "rate limit" not in str(e).lower() or attempt == self.max_retries:
+                            raise
+                        self.bucket.pause(backoff_delay(attempt))
+                        await self.bucket.acquire()
+                if self.cache is not None:
+                    await asyncio.to_thread(self.cache.put, "shodan_host", ip, info)
+                logger.info(f"Shodan host lookup: {ip}")
+                return {"ip": ip, "host": info}
+            except Exception as e:
+                logger.warning(f"Shodan lookup failed for {ip}: {e}")
+                return {"ip": ip, "error": str(e) or type(e).__name__}
+
+        tasks = set()
+        try:
+            for raw in ips:
+                try:
+                    ip = normalize_ip(raw)
+                except ValueError:
+                    yield {"ip": raw, "error": "invalid IP address"}
+                    continue
+                if ip in seen:
+                    continue
+                seen.add(ip)
+                tasks.add(asyncio.ensure_future(one(ip)))
+                if len(tasks) >= concurrency:
+                    done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
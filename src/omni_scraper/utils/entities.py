@@ -0,0 +1,175 @@
+"""
+Extraction of emails, onion v3 addresses, PGP public key blocks and crypto
+wallet addresses from page text in one call.
+
+Each kind is pre-filtered with the cheapest scan that finds its candidate
+positions (``str.find`` for ``@``, ``.onion`` and the PGP armor header, one
+character-class regex for wallet-like runs), and each candidate is then
+validated on a small window around it. Nothing is ever matched against
+the whole page with an unbounded pattern, so long runs of word characters
+cannot cause heavy backtracking, and checksummed formats (onion v3, Bitcoin)
+are verified to cut false positives.
+"""
+import base64
+import hashlib
+import re
+
+ENTITY_KINDS = ("emails", "onions", "pgp_keys", "wallets")
+
+PGP_BEGIN = "-----BEGIN PGP PUBLIC KEY BLOCK-----"
+PGP_END = "-----END PGP PUBLIC KEY BLOCK-----"
+PGP_MAX_BLOCK = 64 * 1024
+
+# Wallet candidates: a plausible first character followed by a long alphanumeric run
+WALLET_TRIGGER_RE = re.compile(r"[1348bB0][0-9A-Za-z]{25,}")
+
+# Emails: the local part is matched backwards from "@", the domain forwards
+LOCAL_REV_RE = re.compile(r"[A-Za-z0-9._%+-]{1,64}")
+DOMAIN_RE = re.compile(
+    r"(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.){1,8}([A-Za-z]{2,24})(?![A-Za-z0-9-])"
+)
+# "logo@2x.png" and friends are file names, not addresses
+FILE_TLDS = frozenset({"png", "jpg", "jpeg", "gif", "svg", "webp", "css", "js", "ico"})
+
+ONION_V3_LEN = 56
+BASE32_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz234567")
+
+B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+BTC_B58_RE = re.compile(r"[13][1-9A-HJ-NP-Za-km-z]{25,34}(?![0-9A-Za-z])")
+BTC_BECH32_RE = re.compile(r"(?:bc1|BC1)[02-9ac-hj-np-zAC-HJ-NP-Z]{6,87}(?![0-9A-Za-z])")
+ETH_RE = re.compile(r"0x[0-9a-fA-F]{40}(?![0-9A-Za-z])")
+XMR_RE = re.compile(r"[48][0-9AB][1-9A-HJ-NP-Za-km-z]{93}(?![0-9A-Za-z])")
+
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_CONST, BECH32M_CONST = 1, 0x2BC830A3
+
+
+def _valid_onion_v3(label):
+    """Checks the version byte and SHA3 checksum embedded in a v3 address."""
+    try:
+        raw = base64.b32decode(label.upper())
+    except ValueError:
+        return False
+    pubkey, checksum, version = raw[:32], raw[32:34], raw[34:]
+    if version != b"\x03":
+        return False
+    return hashlib.sha3_256(b".onion checksum" + pubkey + version).digest()[:2] == checksum
+
+
+def _valid_base58check(address):
+    num = 0
+    for ch in address:
+        num = num * 58 + B58.index(ch)
+    pad = len(address) - len(address.lstrip("1"))
+    raw = b"\x00" * pad + num.to_bytes((num.bit_length() + 7) // 8, "big")
+    if len(raw) != 25 or raw[0] not in (0x00, 0x05):
+        return False
+    return hashlib.sha256(hashlib.sha256(raw[:-4]).digest()).digest()[:4] == raw[-4:]
+
+
+def _bech32_polymod(values):
+    generator = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+    chk = 1
+    for value in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ value
+        for i in range(5):
+            if top >> i & 1:
+                chk ^= generator[i]
+    return chk
+
+
+def _valid_bech32(address):
+    address = address.lower()
+    hrp, data = address[:2], [BECH32_CHARSET.index(c) for c in address[3:]]
+    if len(address) not in (42, 62) or not data:
+        return False
+    expanded = [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+    const = BECH32_CONST if data[0] == 0 else BECH32M_CONST
+    return _bech32_polymod(expanded + data) == const
+
+
+def _email_at(text, at):
+    start = max(0, at - 64)
+    local = LOCAL_REV_RE.match(text[start:at][::-1])
+    domain = DOMAIN_RE.match(text, at + 1, at + 256)
+    if not local or not domain or domain.group(1).lower() in FILE_TLDS:
+        return None
+    local = local.group(0)[::-1].lstrip(".")
+    if not local:
+        return None
+    return f"{local}@{domain.group(0)}"
+
+
+def _onion_at(text, dot):
+    start = dot - ONION_V3_LEN
+    if start < 0 or (start > 0 and text[start - 1].isalnum()):
+        return None
+    end = dot + 6
+    if end < len(text) and (text[end].isalnum() or text[end] == "-"):
+        return None
+    label = text[start:dot].lower()
+    if not BASE32_CHARS.issuperset(label) or not _valid_onion_v3(label):
+        return None
+    return f"{label}.onion"
+
+
+def _wallet_at(text, pos):
+    first = text[pos]
+    if first in "bB":
+        m = BTC_BECH32_RE.match(text, pos)
+        if m and _valid_bech32(m.group(0)):
+            return "btc", m.group(0).lower()
+    elif first == "0":
+        m = ETH_RE.match(text, pos)
+        if m:
+            return "eth", m.group(0)
+    elif first in "13":
+        m = BTC_B58_RE.match(text, pos)
+        if m and _valid_base58check(m.group(0)):
+            return "btc", m.group(0)
+    elif first in "48":
+        m = XMR_RE.match(text, pos)
+        if m:
+            return "xmr", m.group(0)
+    return None
+
+
+def _positions(text, needle):
+    pos = text.find(needle)
+    while pos != -1:
+        yield pos
+        pos = text.find(needle, pos + 1)
+
+
+def extract_entities(text, kinds=ENTITY_KINDS):
+    """
+    Returns ``{"emails", "onions", "pgp_keys", "wallets"}`` found in ``text``
+    (only the requested ``kinds``). Emails and onions are sorted and unique,
+    PGP blocks are in page order and ``wallets`` maps chain -> addresses.
+    """
+    result = {}
+    if "emails" in kinds:
+        found = (_email_at(text, at) for at in _positions(text, "@")) if text else ()
+        result["emails"] = sorted(set(filter(None, found)))
+    if "onions" in kinds:
+        found = (_onion_at(text, dot) for dot in _positions(text, ".onion")) if text else ()
+        result["onions"] = sorted(set(filter(None, found)))
+    if "pgp_keys" in kinds:
+        blocks = []
+        for begin in _positions(text or "", PGP_BEGIN):
+            end = text.find(PGP_END, begin, begin + PGP_MAX_BLOCK)
+            if end != -1:
+                blocks.append(text[begin:end + len(PGP_END)])
+        result["pgp_keys"] = list(dict.fromkeys(blocks))
+    if "wallets" in kinds:
+        wallets = {}
+        for m in WALLET_TRIGGER_RE.finditer(text or ""):
+            start = m.start()
+            if start and text[start - 1].isalnum():
+                continue
+            found = _wallet_at(text, start)
+            if found:
+                wallets.setdefault(found[0], set()).add(found[1])
+        result["wallets"] = {chain: sorted(found) for chain, found in sorted(wallets.items())}
+    return {k: result[k] for k in ENTITY_KINDS if k in result}
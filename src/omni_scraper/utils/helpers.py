@@ -1,13 +1,11 @@
-import re
-from urllib.parse import urljoin, urlparse
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 
-EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+from .entities import extract_entities
 
 
 def extract_emails(text):
-    if not text:
-        return []
-    return list(set(EMAIL_RE.findall(text)))
+    """Unique email addresses in ``text`` (see ``entities.extract_entities``)."""
+    return extract_entities(text, ("emails",))["emails"]
 
 
 def normalize_url(base, link):
@@ -17,6 +15,44 @@ def normalize_url(base, link):
         return None
 
 
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url):
+    """
+    Returns a canonical form of ``url`` for de-duplication: lowercase scheme
+    and host, no default port, no fragment, "/" for an empty path and sorted
+    query parameters. Returns None for URLs that cannot be parsed.
+
+    The result is a key (seen set, caches), not a URL to request: the
+    re-encoded query can differ from what the server expects.
+    """
+    try:
+        parsed = urlparse(url.strip())
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or "").lower()
+        if not host:
+            return None
+        port = parsed.port
+    except (AttributeError, ValueError):
+        return None
+    netloc = f"[{host}]" if ":" in host else host  # IPv6 literal
+    if port and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    if parsed.username:
+        userinfo = parsed.username + (f":{parsed.password}" if parsed.password else "")
+        netloc = f"{userinfo}@{netloc}"
+    query = ""
+    if parsed.query:
+        query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, query, ""))
+
+
+def safe_filename(url, suffix=".html"):
+    """Flattens a URL into a file name (the scheme separator and slashes become _)."""
+    return url.replace("://", "_").replace("/", "_") + suffix
+
+
 def is_onion(url):
     try:
         parsed = urlparse(url)
@@ -1,23 +1,86 @@
+import atexit
 import logging
-import logging.handlers
+import queue
+import threading
 from pathlib import Path
 
 from ..config.settings import config
 
+# Process-wide logging thread (logging.queue): records are handed to it and
+# it does the formatting, file rotation and console writes
+_queue_handler = None
+_listener = None
+_setup_lock = threading.Lock()
+_rate_filter = None
 
-def setup_logger(name=__name__):
-    logger = logging.getLogger(name)
-    if logger.handlers:
-        return logger
 
-    level_name = config.get("logging.level") or "INFO"
-    log_level = getattr(logging, level_name.upper(), logging.INFO)
-    logger.setLevel(log_level)
+class _QueueHandler(logging.Handler):
+    """
+    Puts records on the logging thread's queue as they are, so ``%``-style
+    arguments are only formatted there (``logging.handlers.QueueHandler``
+    formats in the caller's thread). Once the thread is stopped, records go
+    straight to its handlers instead.
+    """
+
+    def __init__(self, records):
+        super().__init__()
+        self.queue = records
+        self.direct = None
+
+    def emit(self, record):
+        if self.direct is None:
+            self.queue.put_nowait(record)
+            return
+        for handler in self.direct:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate-limits repetitive records: each ``%``-style message template (e.g.
+    ``"Fetched %s"``) below ERROR gets a token bucket of ``rate`` records
+    per second with bursts of ``burst``. Records without arguments (one-off
+    f-string messages) and errors always pass. The next record let through
+    reports how many similar ones were suppressed.
+    """
+
+    MAX_TEMPLATES = 1000
+
+    def __init__(self, rate, burst):
+        super().__init__()
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._buckets = {}
+
+    def filter(self, record):
+        if self.rate <= 0 or not record.args or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        entry = self._buckets.get(key)
+        if entry is None:
+            from ..core.rate_limit import TokenBucket
+
+            if len(self._buckets) >= self.MAX_TEMPLATES:
+                self._buckets.clear()
+            entry = self._buckets[key] = [TokenBucket(self.rate, self.burst), 0]
+        if not entry[0].try_acquire():
+            entry[1] += 1
+            return False
+        if entry[1] and isinstance(record.args, tuple):
+            record.msg = f"{record.msg} (+%d similar suppressed)"
+            record.args = (*record.args, entry[1])
+            entry[1] = 0
+        return True
+
+
+def _handlers():
+    from logging.handlers import RotatingFileHandler
 
     log_dir = Path(config.base_dir) / "logs"
     log_dir.mkdir(exist_ok=True, parents=True)
 
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = RotatingFileHandler(
         log_dir / config.get("logging.file", "omni_scraper.log"),
         maxBytes=10 * 1024 * 1024,
         backupCount=5,
@@ -30,11 +93,85 @@ def setup_logger(name=__name__):
     )
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
+    return [file_handler, console_handler]
+
+
+def _shared_queue_handler():
+    global _queue_handler, _listener
+    with _setup_lock:
+        if _queue_handler is None:
+            from logging.handlers import QueueListener
+
+            records = queue.SimpleQueue()
+            _listener = QueueListener(records, *_handlers(), respect_handler_level=True)
+            _listener.start()
+            atexit.register(stop_logging)
+            _queue_handler = _QueueHandler(records)
+    return _queue_handler
+
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+def _shared_rate_filter():
+    global _rate_filter
+    if _rate_filter is None:
+        _rate_filter = RateLimitFilter(
+            config.get("logging.rate_limit", 20), config.get("logging.burst", 50)
+        )
+    return _rate_filter
+
+
+def stop_logging():
+    """
+    Writes out queued records and stops the logging thread; later records
+    are written synchronously. Runs at exit, before logging closes the files.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _queue_handler.direct = _listener.handlers
+        _listener = None
+
+
+def _configure(name):
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+
+    level_name = config.get("logging.level") or "INFO"
+    log_level = getattr(logging, level_name.upper(), logging.INFO)
+    logger.setLevel(log_level)
+    logger.addFilter(_shared_rate_filter())
+
+    if config.get("logging.queue", True):
+        logger.addHandler(_shared_queue_handler())
+    else:
+        for handler in _handlers():
+            logger.addHandler(handler)
 
     return logger
 
 
+class _LazyLogger:
+    """
+    Module-level stand-in for a logger. The real one (level from config,
+    rotating file under logs/, console) is set up on first use, so
+    importing a module neither reads config nor opens log files.
+    """
+
+    __slots__ = ("name", "_logger")
+
+    def __init__(self, name):
+        self.name = name
+        self._logger = None
+
+    def __getattr__(self, attr):
+        if self._logger is None:
+            self._logger = _configure(self.name)
+        return getattr(self._logger, attr)
+
+
+def setup_logger(name=__name__):
+    return _LazyLogger(name)
+
+
 logger = setup_logger(__name__)
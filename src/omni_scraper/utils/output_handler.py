@@ -1,4 +1,6 @@
 import csv
+import gzip
+import io
 import json
 from datetime import datetime, timezone
 from pathlib import Path
@@ -6,8 +8,141 @@ from pathlib import Path
 from ..config.settings import config
 from ..utils.logger import setup_logger
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 logger = setup_logger(__name__)
 
+COMPRESSION_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class StreamingSink:
+    """
+    Append-only JSONL/CSV writer for records that arrive one at a time.
+
+    Records are serialized into an in-memory buffer that is written out once
+    it reaches ``buffer_size`` bytes. Output may be gzip or zstd compressed,
+    and a new part file is started whenever the current one grows past
+    ``rotate_bytes`` on disk (0 disables rotation). CSV columns are ``fields``
+    (other keys are left out) or, by default, the keys of the first record;
+    then a later record with another key raises ValueError rather than
+    silently losing the value.
+    """
+
+    def __init__(
+        self,
+        base_path,
+        format="jsonl",
+        compression=None,
+        rotate_bytes=0,
+        buffer_size=64 * 1024,
+        fields=None,
+    ):
+        if format not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported stream format: {format}")
+        compression = None if compression in (None, "", "none") else compression
+        if compression not in COMPRESSION_SUFFIX:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires: pip install zstandard")
+        self.base_path = Path(base_path)
+        self.format = format
+        self.compression = compression
+        self.rotate_bytes = int(rotate_bytes or 0)
+        self.buffer_size = int(buffer_size)
+        self.paths = []
+        self.records = 0
+        self._buffer = io.StringIO()
+        self._fields = list(fields) if fields else None
+        # Keys of the first record, when the columns were taken from it
+        self._inferred = None
+        self._raw = None
+        self._stream = None
+        self.closed = False
+
+    def _next_path(self):
+        suffix = f".{self.format}{COMPRESSION_SUFFIX[self.compression]}"
+        stem = self.base_path.name
+        if self.rotate_bytes:
+            stem = f"{stem}_{len(self.paths) + 1:04d}"
+        return self.base_path.with_name(stem + suffix)
+
+    def _open(self):
+        path = self._next_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._raw = open(path, "wb")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._stream = self._raw
+        self.paths.append(str(path))
+        if self.format == "csv" and self._fields:
+            self._write_csv_header()
+
+    def _close_file(self):
+        if self._stream is not None:
+            self._stream.close()
+            if self._raw is not self._stream and not self._raw.closed:
+                self._raw.close()
+        self._stream = self._raw = None
+
+    def _write_csv_header(self):
+        buf = io.StringIO()
+        csv.writer(buf).writerow(self._fields)
+        self._stream.write(buf.getvalue().encode("utf-8"))
+
+    def write(self, record):
+        if self.format == "jsonl":
+            self._buffer.write(json.dumps(record, ensure_ascii=False))
+            self._buffer.write("\n")
+        else:
+            if self._fields is None:
+                self._fields = list(record.keys())  # header goes out with each part
+                self._inferred = set(self._fields)
+            extra = record.keys() - self._inferred if self._inferred is not None else None
+            if extra:
+                raise ValueError(
+                    f"Record has fields not in the CSV columns: {', '.join(sorted(extra))}"
+                )
+            row = [record.get(k) for k in self._fields]
+            row = [json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else v for v in row]
+            csv.writer(self._buffer).writerow(row)
+        self.records += 1
+        if self._buffer.tell() >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        data = self._buffer.getvalue()
+        if not data:
+            return
+        self._buffer = io.StringIO()
+        if self._stream is None:
+            self._open()
+        self._stream.write(data.encode("utf-8"))
+        self._stream.flush()
+        if self.rotate_bytes and self._raw.tell() >= self.rotate_bytes:
+            self._close_file()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        if self._stream is None and not self.paths:
+            self._open()  # always leave a (possibly empty) output file behind
+        self._close_file()
+        logger.info(f"Streamed {self.records} records to {', '.join(self.paths)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 class OutputHandler:
     def __init__(self):
@@ -24,6 +159,19 @@ class OutputHandler:
         ext = self.format
         return self.dir / f"{prefix}_{self.timestamp}.{ext}"
 
+    def open_stream(self, prefix, compression=None, rotate_mb=None, fields=None):
+        """Returns a StreamingSink writing ``prefix`` files in this handler's format."""
+        compression = compression or config.get("output.compression")
+        rotate_mb = config.get("output.rotate_mb", 0) if rotate_mb is None else rotate_mb
+        return StreamingSink(
+            self.dir / f"{prefix}_{self.timestamp}",
+            format=self.format,
+            compression=compression,
+            rotate_bytes=int(float(rotate_mb) * 1024 * 1024),
+            buffer_size=int(config.get("output.buffer_kb", 64)) * 1024,
+            fields=fields,
+        )
+
     def save(self, prefix, data):
         path = self._filename(prefix)
         try:
@@ -38,6 +186,12 @@ class OutputHandler:
                         writer.writerows(data)
                 else:
                     raise ValueError("CSV requires list of dicts")
+            elif self.format == "jsonl":
+                records = data if isinstance(data, list) else [data]
+                with open(path, "w", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False))
+                        f.write("\n")
             else:
                 with open(path, "w", encoding="utf-8") as f:
                     f.write(str(data))
@@ -0,0 +1,194 @@
+"""
+HTML parse/extract functions that run inside the parse pool.
+
+Everything here is a plain top-level function without config or logging
+side effects, so it can be pickled into worker processes cheaply.
+"""
+import time
+from html.parser import HTMLParser as _StdlibParser
+
+from ..core.near_dup import simhash
+from .entities import extract_entities
+from .helpers import extract_emails, normalize_url
+
+try:
+    import lxml.etree
+    import lxml.html
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:  # selectolax < 1.0 only ships the Modest backend
+        from selectolax.parser import HTMLParser
+
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+BACKENDS = ("html.parser", "lxml", "selectolax")
+# Anchor text kept per link (extract_page(anchors=True))
+ANCHOR_CHARS = 200
+
+
+def available_backends():
+    return [
+        b
+        for b in BACKENDS
+        if b == "html.parser"
+        or (b == "lxml" and HAS_LXML)
+        or (b == "selectolax" and HAS_SELECTOLAX)
+    ]
+
+
+def resolve_backend(name):
+    """Returns ``name`` if installed, otherwise the stdlib ``html.parser``."""
+    name = name or "html.parser"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend {name!r}; choose from {BACKENDS}")
+    return name if name in available_backends() else "html.parser"
+
+
+class _TextLinkCollector(_StdlibParser):
+    """Streams through the markup once, without building a tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks = []
+        self.hrefs = []
+        self.anchors = []
+        self._anchor = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.hrefs.append(value)
+                    self._anchor = []
+                    self.anchors.append(self._anchor)
+                    break
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._anchor = None
+
+    def handle_data(self, data):
+        self.chunks.append(data)
+        if self._anchor is not None:
+            self._anchor.append(data)
+
+
+def _walk_stdlib(html):
+    collector = _TextLinkCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.chunks, collector.hrefs, ["".join(a) for a in collector.anchors]
+
+
+def _walk_lxml(html):
+    if not html.strip():
+        return [], [], []
+    try:
+        root = lxml.html.fromstring(html)
+    except Exception:
+        return [], [], []
+    chunks, hrefs, anchors = [], [], []
+    # Document order: an element's text, then its children, then its tail
+    for event, el in lxml.etree.iterwalk(root, events=("start", "end")):
+        if event == "end":
+            if el.tail and el is not root:
+                chunks.append(el.tail)
+        # Comments and processing instructions have a non-string tag
+        elif isinstance(el.tag, str):
+            if el.text:
+                chunks.append(el.text)
+            if el.tag == "a":
+                href = el.get("href")
+                if href is not None:
+                    hrefs.append(href)
+                    anchors.append(el.text_content())
+    return chunks, hrefs, anchors
+
+
+def _walk_selectolax(html):
+    tree = HTMLParser(html)
+    root = tree.body or tree.root
+    text = root.text(separator=" ") if root is not None else ""
+    hrefs, anchors = [], []
+    for node in tree.css("a[href]"):
+        href = node.attributes.get("href")
+        if href is not None:
+            hrefs.append(href)
+            anchors.append(node.text())
+    return [text], hrefs, anchors
+
+
+_WALKERS = {"html.parser": _walk_stdlib, "lxml": _walk_lxml, "selectolax": _walk_selectolax}
+
+
+def extract_page(
+    html,
+    base_url,
+    backend="html.parser",
+    snippet_len=2000,
+    fingerprint=False,
+    timings=False,
+    anchors=False,
+):
+    """
+    Parses ``html`` once and returns its text, links, snippet and the
+    entities found in the text (emails, onions, pgp_keys, wallets).
+
+    Links are absolute and de-duplicated; each distinct href is resolved
+    against ``base_url`` exactly once. Emails come from the visible text and
+    ``mailto:`` links. With ``fingerprint`` the result also carries the text's
+    64-bit SimHash under ``"simhash"``. With ``timings`` it carries the
+    seconds spent parsing and extracting under ``"timings"``. With
+    ``anchors`` it maps each link to its anchor text under ``"anchors"``
+    (the texts of repeated links are joined).
+    """
+    start = time.perf_counter()
+    chunks, hrefs, texts = _WALKERS[backend](html)
+    text = " ".join(chunks)
+    links, mailto, resolved, anchor_text = [], [], {}, {}
+    for href, anchor in zip(hrefs, texts):
+        href = href.strip()
+        if href not in resolved:
+            url = None
+            if href[:7].lower() == "mailto:":
+                mailto.append(href[7:].split("?", 1)[0])
+            else:
+                url = normalize_url(base_url, href)
+                if url:
+                    links.append(url)
+            resolved[href] = url
+        url = resolved[href]
+        if anchors and url:
+            anchor = " ".join(anchor.split())
+            if anchor and len(anchor_text.get(url, "")) < ANCHOR_CHARS:
+                seen = anchor_text.get(url)
+                anchor_text[url] = (f"{seen} {anchor}" if seen else anchor)[:ANCHOR_CHARS]
+    parsed = time.perf_counter()
+    entities = extract_entities(text)
+    if mailto:
+        entities["emails"] = sorted(
+            set(entities["emails"]).union(extract_emails(" ".join(mailto)))
+        )
+    page = {
+        "text": text,
+        "links": list(dict.fromkeys(links)),
+        **entities,
+        "snippet": text.strip()[:snippet_len],
+    }
+    if anchors:
+        page["anchors"] = anchor_text
+    if fingerprint:
+        page["simhash"] = simhash(text)
+    if timings:
+        page["timings"] = {"parse": parsed - start, "extract": time.perf_counter() - parsed}
+    return page
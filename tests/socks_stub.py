@@ -0,0 +1,91 @@
+"""A minimal local SOCKS5 proxy standing in for Tor in tests."""
+import asyncio
+import socket
+import struct
+
+
+class SocksStub:
+    """
+    SOCKS5 CONNECT proxy with optional username/password auth.
+
+    Records the username of every connection (Tor's circuit isolation key),
+    and can delay or refuse connections for given usernames to simulate
+    slow or broken circuits. Hosts in ``unreachable`` get a "host
+    unreachable" reply, as Tor gives for a dead site.
+    """
+
+    def __init__(self):
+        self.usernames = []
+        self.delays = {}
+        self.refuse = set()
+        self.unreachable = set()
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            _, nmethods = await reader.readexactly(2)
+            methods = await reader.readexactly(nmethods)
+            username = None
+            if 2 in methods:
+                writer.write(b"\x05\x02")
+                await reader.readexactly(1)
+                username = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+                await reader.readexactly((await reader.readexactly(1))[0])
+                writer.write(b"\x01\x00")
+            else:
+                writer.write(b"\x05\x00")
+            _, _, _, atyp = await reader.readexactly(4)
+            if atyp == 1:
+                host = socket.inet_ntoa(await reader.readexactly(4))
+            elif atyp == 3:
+                host = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+            else:
+                host = socket.inet_ntop(socket.AF_INET6, await reader.readexactly(16))
+            (port,) = struct.unpack("!H", await reader.readexactly(2))
+            self.usernames.append(username)
+            await asyncio.sleep(self.delays.get(username, 0))
+            if username in self.refuse:
+                writer.write(b"\x05\x01\x00\x01" + b"\x00" * 6)
+                await writer.drain()
+                return
+            if host in self.unreachable:
+                writer.write(b"\x05\x04\x00\x01" + b"\x00" * 6)
+                await writer.drain()
+                return
+            upstream_reader, upstream_writer = await asyncio.open_connection(host, port)
+            writer.write(b"\x05\x00\x00\x01" + b"\x00" * 6)
+            await writer.drain()
+            await asyncio.gather(
+                self._pipe(reader, upstream_writer), self._pipe(upstream_reader, writer)
+            )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
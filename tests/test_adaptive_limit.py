@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.adaptive_limit import AdaptiveLimiter, AIMDLimit
+from omni_scraper.core.fetcher import FetchResult
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+
+
+def test_aimd_increases_additively_and_backs_off():
+    now = [0.0]
+    limit = AIMDLimit(4, minimum=1, maximum=6, clock=lambda: now[0])
+    for _ in range(5):
+        limit.on_success(0.1)
+    assert limit.value == 5
+    for _ in range(50):
+        limit.on_success(0.1)
+    assert limit.value == 6
+    now[0] = 1.0
+    limit.on_overload(started=0.5)
+    assert limit.value == 3
+    # Requests already in flight at the decrease do not cut it again
+    limit.on_overload(started=0.9)
+    assert limit.value == 3
+    limit.on_overload(started=1.5)
+    assert limit.value == 1
+    limit.on_overload(started=2.0)
+    assert limit.value == 1
+
+
+def test_aimd_holds_when_latency_rises():
+    limit = AIMDLimit(4, maximum=10)
+    limit.on_success(0.1)
+    before = limit.limit
+    limit.on_success(1.0)
+    assert limit.limit == before
+
+
+@pytest.mark.asyncio
+async def test_limiter_blocks_at_limit_and_records_history():
+    limiter = AdaptiveLimiter(initial=2, host_initial=2, maximum=4)
+    url = "http://a.onion/"
+    started = [await limiter.acquire(url), await limiter.acquire(url)]
+    waiter = asyncio.ensure_future(limiter.acquire(url))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    await limiter.release(url, started[0], FetchResult(url, status=503))
+    assert limiter.limit.value == 1
+    assert limiter.host_limit("a.onion") == 1
+    assert limiter.history[-1][1] == 1
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    await limiter.release(url, started[1], FetchResult(url, timed_out=True))
+    third = await asyncio.wait_for(waiter, timeout=1)
+    assert limiter.limit.value == 1
+    await limiter.release(url, third, None)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_crawler_backs_off_on_429():
+    state = {"active": 0}
+
+    async def page(request):
+        n = int(request.match_info["n"])
+        if state["active"] >= 2:
+            return web.Response(status=429)
+        state["active"] += 1
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            state["active"] -= 1
+        links = "".join(f'<a href="/p/{n * 10 + m}">x</a>' for m in range(1, 11))
+        return web.Response(text=f"<html><body>{links}</body></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/p/{n}", page)
+    async with TestServer(app) as server:
+        crawler = AsyncWebCrawler(use_tor=False, concurrency=8, max_depth=3, max_pages=60)
+        crawler.delay = 0
+        crawler.per_host_concurrency = 8
+        crawler.onion_only = False
+        await asyncio.wait_for(crawler.run([str(server.make_url("/p/1"))]), timeout=20)
+    assert crawler.limiter.host_limit(server.host) < 8
+    assert min(limit for _, limit in crawler.limiter.history) < 8
@@ -1,5 +1,66 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.parse_pool import ParsePool
 from omni_scraper.modules.async_scraper import AsyncScraper
 
 def test_async_scraper_creation():
     scraper = AsyncScraper()
     assert scraper is not None
+
+
+@pytest.mark.asyncio
+async def test_scrape_many_shares_one_connection_pool():
+    peers = set()
+
+    async def page(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(0.01)
+        return web.Response(
+            text=f'<a href="http://x.onion/{request.path}">x</a> me@x.onion', content_type="text/html"
+        )
+
+    app = web.Application()
+    app.router.add_get("/{n}", page)
+    scraper = AsyncScraper(use_tor=False, parse_pool=ParsePool(workers=0))
+    scraper.limit_per_host = 3
+    async with TestServer(app) as server:
+        urls = (str(server.make_url(f"/{n}")) for n in range(30))
+        results = [r async for r in scraper.scrape_many(urls, concurrency=10)]
+    assert len(results) == 30
+    assert all(r["emails"] == ["me@x.onion"] for r in results)
+    assert len(peers) <= 3
+
+
+@pytest.mark.asyncio
+async def test_scrape_reports_errors():
+    scraper = AsyncScraper(use_tor=False, parse_pool=ParsePool(workers=0))
+    result = await scraper.scrape("http://127.0.0.1:9/")
+    assert result["status"] is None and result["error"]
+
+
+@pytest.mark.asyncio
+async def test_scrape_many_survives_a_failing_page():
+    async def page(request):
+        return web.Response(text="<p>me@x.onion</p>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{n}", page)
+    scraper = AsyncScraper(use_tor=False, parse_pool=ParsePool(workers=0))
+    real_parse = scraper.parse_pool.parse
+
+    async def parse(html, url, **kwargs):
+        if url.endswith("/3"):
+            raise RuntimeError("parser crashed")
+        return await real_parse(html, url, **kwargs)
+
+    scraper.parse_pool.parse = parse
+    async with TestServer(app) as server:
+        urls = [str(server.make_url(f"/{n}")) for n in range(6)]
+        results = [r async for r in scraper.scrape_many(urls, concurrency=2)]
+    assert sorted(r["url"] for r in results) == sorted(urls)
+    failed = [r for r in results if "error" in r]
+    assert failed == [{"url": urls[3], "status": None, "error": "parser crashed"}]
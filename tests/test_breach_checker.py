@@ -24,3 +24,112 @@ def test_check_email_no_api_key(mock_session_manager):
     
     result = checker.check_email("test@example.com")
     assert result == []
+
+
+def _intelx_app(state):
+    from aiohttp import web
+
+    async def search(request):
+        term = request.query["term"]
+        state["requests"].append(term)
+        if term in state.get("always", ()):
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if term in state["throttle"]:
+            state["throttle"].discard(term)
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.json_response({"records": [{"title": f"leak of {term}", "content": "x"}]})
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_check_email_async_honours_retry_after():
+    import aiohttp
+    from aiohttp.test_utils import TestServer
+
+    state = {"requests": [], "throttle": {"a@example.com"}}
+    async with TestServer(_intelx_app(state)) as server:
+        checker = BreachChecker()
+        checker.base_url = str(server.make_url("")).rstrip("/")
+        checker.rate_limit_delay = 0.01
+        async with aiohttp.ClientSession() as session:
+            leaks = await checker.check_email_async(session, "a@example.com")
+    assert state["requests"] == ["a@example.com"] * 2
+    assert leaks[0]["source"] == "leak of a@example.com"
+
+
+@pytest.mark.asyncio
+async def test_check_many_stops_at_quota_and_resumes(tmp_path):
+    from aiohttp.test_utils import TestServer
+
+    from omni_scraper.core.crawl_state import CrawlStateStore
+    from omni_scraper.core.rate_limit import TokenBucket
+
+    emails = [f"user{n}@example.com" for n in range(5)]
+    state = {"requests": [], "throttle": set()}
+    store = CrawlStateStore("breach_test", tmp_path)
+    async with TestServer(_intelx_app(state)) as server:
+        first = BreachChecker()
+        first.base_url = str(server.make_url("")).rstrip("/")
+        first.bucket = TokenBucket(100, 5)
+        first.quota = TokenBucket(0, 3)
+        results = [r async for r in first.check_many(emails, concurrency=2, store=store)]
+        assert first.exhausted
+        assert len(results) == 3
+
+        second = BreachChecker()
+        second.base_url = first.base_url
+        second.bucket = TokenBucket(100, 5)
+        rest = [r async for r in second.check_many(emails, concurrency=2, store=store)]
+    assert not second.exhausted
+    assert sorted(r["email"] for r in results + rest) == emails
+    assert len(state["requests"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_retries_cost_no_quota_and_fail_one_email(tmp_path):
+    from aiohttp.test_utils import TestServer
+
+    from omni_scraper.core.rate_limit import TokenBucket
+
+    emails = ["a@example.com", "stuck@example.com", "b@example.com"]
+    state = {"requests": [], "throttle": set(), "always": {"stuck@example.com"}}
+    async with TestServer(_intelx_app(state)) as server:
+        checker = BreachChecker()
+        checker.base_url = str(server.make_url("")).rstrip("/")
+        checker.rate_limit_delay = 0.001
+        checker.max_retries = 2
+        checker.bucket = TokenBucket(1000, 5)
+        checker.quota = TokenBucket(0, 4)
+        results = [r async for r in checker.check_many(emails, concurrency=1)]
+    assert not checker.exhausted
+    assert [r["email"] for r in results] == emails
+    assert results[1] == {"email": "stuck@example.com", "error": "Still rate limited after 2 retries"}
+    assert state["requests"].count("stuck@example.com") == 3
+    assert round(checker.quota.tokens) == 1  # one unit per email, not per attempt
+
+
+@pytest.mark.asyncio
+async def test_cached_lookup_skips_api_and_quota(tmp_path):
+    import aiohttp
+    from aiohttp.test_utils import TestServer
+
+    from omni_scraper.core.rate_limit import TokenBucket
+    from omni_scraper.core.result_cache import ResultCache
+
+    state = {"requests": [], "throttle": set()}
+    cache = ResultCache(tmp_path / "lookups.sqlite3")
+    async with TestServer(_intelx_app(state)) as server:
+        checker = BreachChecker(cache=cache)
+        checker.base_url = str(server.make_url("")).rstrip("/")
+        checker.bucket = TokenBucket(100, 5)
+        checker.quota = TokenBucket(0, 1)
+        async with aiohttp.ClientSession() as session:
+            first = await checker.check_email_async(session, "A@example.com")
+            second = await checker.check_email_async(session, "a@example.com ")
+    assert first == second
+    assert len(state["requests"]) == 1
+    assert cache.stats()["hits"] == 1
+    cache.close()
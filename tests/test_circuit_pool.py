@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from aiohttp_socks import ProxyError
+
+from omni_scraper.core.circuit_pool import Circuit, CircuitPool, is_circuit_error
+from omni_scraper.core.tor_manager import TorManager
+
+from .socks_stub import SocksStub
+
+
+async def _hello(request):
+    resp = web.Response(text="hello")
+    # A new connection per request, so every request crosses the proxy
+    resp.force_close()
+    return resp
+
+
+def _tor(stub):
+    tor = TorManager()
+    tor.socks_ports = [stub.port]
+    return tor
+
+
+async def _fetch_all(pool, url, n):
+    async def one():
+        try:
+            async with pool.get(url) as resp:
+                return await resp.text()
+        except Exception:
+            return None
+
+    return await asyncio.gather(*(one() for _ in range(n)))
+
+
+def test_pick_prefers_untried_then_fastest():
+    fast, slow, fresh = (Circuit(name, 9050, None) for name in ("fast", "slow", "fresh"))
+    fast.record(0.1)
+    slow.record(1.0)
+    pool = CircuitPool(size=3, tor=TorManager())
+    pool.circuits = [fast, slow, fresh]
+    assert pool.pick() is fresh
+    fresh.record(0.5)
+    assert pool.pick() is fast
+    fast.in_flight = 10
+    assert pool.pick() is fresh
+
+
+@pytest.mark.asyncio
+async def test_requests_use_isolated_circuits():
+    server = TestServer(web.Application())
+    server.app.router.add_get("/", _hello)
+    async with server, SocksStub() as stub:
+        async with CircuitPool(size=3, tor=_tor(stub)) as pool:
+            texts = await _fetch_all(pool, str(server.make_url("/")), 6)
+            isolations = {c.isolation for c in pool.circuits}
+        assert texts == ["hello"] * 6
+        assert set(stub.usernames) == isolations
+        assert len(isolations) == 3
+
+
+@pytest.mark.asyncio
+async def test_slow_circuit_is_retired():
+    server = TestServer(web.Application())
+    server.app.router.add_get("/", _hello)
+    async with server, SocksStub() as stub:
+        pool = CircuitPool(size=3, tor=_tor(stub), slow_factor=3, min_samples=2)
+        async with pool:
+            slow = pool.circuits[0]
+            stub.delays[slow.isolation] = 0.3
+            for _ in range(6):
+                await _fetch_all(pool, str(server.make_url("/")), 3)
+            assert pool.retired >= 1
+            assert slow.retired and slow not in pool.circuits
+            assert all(c.ewma is None or c.ewma < 0.3 for c in pool.circuits)
+
+
+@pytest.mark.asyncio
+async def test_failing_circuit_is_replaced():
+    server = TestServer(web.Application())
+    server.app.router.add_get("/", _hello)
+    async with server, SocksStub() as stub:
+        async with CircuitPool(size=2, tor=_tor(stub), max_errors=2) as pool:
+            broken = pool.circuits[0]
+            stub.refuse.add(broken.isolation)
+            await _fetch_all(pool, str(server.make_url("/")), 8)
+            assert broken.retired and broken.errors == 2
+            assert len(pool.circuits) == 2 and broken not in pool.circuits
+            texts = await _fetch_all(pool, str(server.make_url("/")), 4)
+            assert texts == ["hello"] * 4
+
+
+def test_only_circuit_failures_count():
+    assert is_circuit_error(ProxyError("General SOCKS server failure", 0x01))
+    assert is_circuit_error(ProxyError("TTL expired", 0x06))
+    assert not is_circuit_error(ProxyError("Host unreachable", 0x04))
+    assert not is_circuit_error(ProxyError("Onion service descriptor not found", 0xF0))
+    assert not is_circuit_error(TimeoutError())
+    assert not is_circuit_error(ConnectionResetError())
+    assert not is_circuit_error(None)
+
+
+@pytest.mark.asyncio
+async def test_dead_host_does_not_retire_circuits():
+    server = TestServer(web.Application())
+    server.app.router.add_get("/", _hello)
+    async with server, SocksStub() as stub:
+        async with CircuitPool(size=2, tor=_tor(stub), max_errors=2) as pool:
+            circuits = list(pool.circuits)
+            stub.unreachable.add("localhost")
+            dead = str(server.make_url("/")).replace("127.0.0.1", "localhost")
+            assert await _fetch_all(pool, dead, 6) == [None] * 6
+            assert pool.circuits == circuits and pool.retired == 0
+            assert all(c.errors == 0 for c in circuits)
+
+
+@pytest.mark.asyncio
+async def test_failed_body_counts_one_request():
+    server = TestServer(web.Application())
+    server.app.router.add_get("/", _hello)
+    async with server, SocksStub() as stub:
+        async with CircuitPool(size=1, tor=_tor(stub), max_errors=5) as pool:
+            circuit = pool.circuits[0]
+            await _fetch_all(pool, str(server.make_url("/")), 2)
+            with pytest.raises(ProxyError):
+                async with pool.get(str(server.make_url("/"))):
+                    raise ProxyError("General SOCKS server failure", 0x01)
+            assert (circuit.requests, circuit.errors, circuit.samples) == (3, 1, 3)
@@ -4,3 +4,14 @@ def test_cli_parser_creation():
     parser = create_parser()
     assert parser is not None
     assert hasattr(parser, 'parse_args')
+
+
+def test_crawl_rejects_checkpoint_options_with_workers():
+    from click.testing import CliRunner
+
+    from omni_scraper.cli import cli
+
+    for option in ("--job-id", "--resume"):
+        result = CliRunner().invoke(cli, ["crawl", "http://a.onion/", "--workers", "2", option, "x"])
+        assert result.exit_code == 2
+        assert "not supported with --workers" in result.output
@@ -0,0 +1,87 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.crawl_state import CrawlStateStore, new_job_id
+from omni_scraper.core.host_scheduler import HostScheduler
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+
+
+def test_store_roundtrip(tmp_path):
+    store = CrawlStateStore("job1", tmp_path)
+    store.save_checkpoint(
+        [("http://b.onion/", 1)], ["http://a.onion/"], [{"url": "http://a.onion/"}],
+        {"seeds": ["http://a.onion/"]},
+    )
+    store.save_checkpoint([], ["http://b.onion/"], [{"url": "http://b.onion/"}])
+    frontier, visited, results, meta = store.load()
+    assert frontier == []
+    assert visited == {"http://a.onion/", "http://b.onion/"}
+    assert [r["url"] for r in results] == ["http://a.onion/", "http://b.onion/"]
+    assert meta["seeds"] == ["http://a.onion/"]
+
+
+def test_new_job_id_unique():
+    assert new_job_id() != new_job_id()
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_finished_pages(tmp_path):
+    hits = []
+
+    async def page(request):
+        hits.append(request.path)
+        return web.Response(text="<html>contact admin@example.com</html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{name}", page)
+    async with TestServer(app) as server:
+        done, todo = str(server.make_url("/done")), str(server.make_url("/todo"))
+        CrawlStateStore("job2", tmp_path).save_checkpoint(
+            [(todo, 1)], [done], [{"url": done}], {"seeds": [done]}
+        )
+        crawler = AsyncWebCrawler(use_tor=False, job_id="job2", state_dir=tmp_path, resume=True)
+        crawler.delay = 0
+        results = await crawler.run()
+
+    assert hits == ["/todo"]
+    assert [r["url"] for r in results] == [done, todo]
+    _, visited, _, meta = CrawlStateStore("job2", tmp_path).load()
+    assert visited == {done, todo}
+    assert meta["status"] == "complete"
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_flushes_sink_first(tmp_path):
+    events = []
+
+    class BufferedSink:
+        def write(self, result):
+            events.append(("write", result["url"]))
+
+        def flush(self):
+            events.append(("flush",))
+
+    crawler = AsyncWebCrawler(use_tor=False, job_id="job3", state_dir=tmp_path, sink=BufferedSink())
+    save = crawler.store.save_checkpoint
+    crawler.store.save_checkpoint = lambda *args: (events.append(("save",)), save(*args))
+    crawler._emit({"url": "http://a.onion/"})
+    await crawler._checkpoint(HostScheduler())
+    assert events == [("write", "http://a.onion/"), ("flush",), ("save",)]
+
+
+@pytest.mark.asyncio
+async def test_streamed_crawl_checkpoints_no_results(tmp_path):
+    class Sink:
+        def write(self, result):
+            pass
+
+    crawler = AsyncWebCrawler(
+        use_tor=False, job_id="job4", state_dir=tmp_path, sink=Sink(), keep_results=False
+    )
+    crawler._finished.append("http://a.onion/")
+    crawler._emit({"url": "http://a.onion/"})
+    await crawler._checkpoint(HostScheduler())
+    _, visited, results, _ = CrawlStateStore("job4", tmp_path).load()
+    assert visited == {"http://a.onion/"}
+    assert results == []
@@ -0,0 +1,61 @@
+import base64
+import hashlib
+import os
+
+from omni_scraper.utils.entities import extract_entities
+from omni_scraper.utils.helpers import extract_emails
+
+
+def make_onion_v3(pubkey=None):
+    pubkey = pubkey or os.urandom(32)
+    checksum = hashlib.sha3_256(b".onion checksum" + pubkey + b"\x03").digest()[:2]
+    return base64.b32encode(pubkey + checksum + b"\x03").decode().lower() + ".onion"
+
+
+def test_emails_validated_in_windows():
+    text = (
+        "Contact test@example.com, ..admin@lbs.edu.ng or logo@2x.png. "
+        "Broken: user@ and @example.com and a@b"
+    )
+    assert extract_emails(text) == ["admin@lbs.edu.ng", "test@example.com"]
+    # Long word runs around "@" stay cheap and still match the window
+    assert extract_emails("x" * 200_000 + "@example.org") == ["x" * 64 + "@example.org"]
+
+
+def test_onion_v3_checksum():
+    good = make_onion_v3()
+    bad = good[:10] + ("a" if good[10] != "a" else "b") + good[11:]
+    text = f"mirror http://{good}/ fake {bad} short abc.onion mail admin@{good}"
+    entities = extract_entities(text)
+    assert entities["onions"] == [good]
+    assert entities["emails"] == [f"admin@{good}"]
+
+
+def test_pgp_blocks_and_wallets():
+    key = (
+        "-----BEGIN PGP PUBLIC KEY BLOCK-----\n\nmQINBGRkZXZ1c2VyQGV4YW1wbGUub3Jn\n=abcd\n"
+        "-----END PGP PUBLIC KEY BLOCK-----"
+    )
+    eth = "0x" + "ab" * 20
+    xmr = (
+        "44AFFq5kSiGBoZ4NMDwYtN18obc8AemS33DBLWs3H7otXft3XjrpDtQGv7SqSsaBYBb98uNbr2VBBEt7f2wfn3RVGQBEP3A"
+    )
+    text = (
+        f"key: {key} donate 1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa or "
+        "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy or bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4 or "
+        "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0 "
+        f"eth {eth} xmr {xmr}. Not wallets: 1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb 1999 0x1234"
+    )
+    entities = extract_entities(text)
+    assert entities["pgp_keys"] == [key]
+    assert entities["wallets"] == {
+        "btc": sorted([
+            "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa",
+            "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy",
+            "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4",
+            "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0",
+        ]),
+        "eth": [eth],
+        "xmr": [xmr],
+    }
+    assert extract_entities(text, ("wallets",)).keys() == {"wallets"}
@@ -0,0 +1,99 @@
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.fetcher import Fetcher
+from omni_scraper.core.http_cache import ResponseCache
+
+PAGE = "<html><body>" + "<p>hello world</p>" * 2000 + "</body></html>"
+
+
+def make_app(seen):
+    async def big(request):
+        resp = web.StreamResponse(headers={"Content-Type": "text/html"})
+        await resp.prepare(request)
+        try:
+            for _ in range(64):
+                await resp.write(b"<p>" + b"x" * 65536 + b"</p>")
+                seen["chunks"] += 1
+        except ConnectionError:
+            pass
+        return resp
+
+    async def image(request):
+        return web.Response(body=b"\x89PNG" + b"\x00" * 5000, content_type="image/png")
+
+    async def untyped_html(request):
+        return web.Response(body=PAGE.encode(), headers={"Content-Type": "application/octet-stream"})
+
+    async def untyped_binary(request):
+        return web.Response(body=b"\x00\x01" * 5000, headers={"Content-Type": "application/octet-stream"})
+
+    async def compressed(request):
+        seen["accept_encoding"] = request.headers.get("Accept-Encoding")
+        resp = web.Response(text=PAGE, content_type="text/html")
+        resp.enable_compression()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/big", big)
+    app.router.add_get("/image", image)
+    app.router.add_get("/untyped-html", untyped_html)
+    app.router.add_get("/untyped-binary", untyped_binary)
+    app.router.add_get("/compressed", compressed)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_body_is_capped_and_types_gated():
+    seen = {"chunks": 0}
+    async with TestServer(make_app(seen)) as server, aiohttp.ClientSession() as session:
+        fetcher = Fetcher(session, "test", 30, max_bytes=256 * 1024)
+
+        big = await fetcher.fetch(str(server.make_url("/big")))
+        assert big.ok and big.truncated
+        assert len(big.text) == 256 * 1024
+
+        image = await fetcher.fetch(str(server.make_url("/image")))
+        assert image.skipped and not image.ok and image.status == 200
+        assert "image/png" in image.error
+
+        kept = await fetcher.fetch(str(server.make_url("/untyped-html")))
+        assert kept.ok and kept.text == PAGE
+        dropped = await fetcher.fetch(str(server.make_url("/untyped-binary")))
+        assert dropped.skipped
+
+    # The server gave up long before writing all 4 MB
+    assert seen["chunks"] < 64
+    assert fetcher.transfer["truncated"] == 1
+    assert fetcher.transfer["skipped"] == 2
+    assert fetcher.transfer["bytes_not_read"] >= 5004 + 10000
+
+
+@pytest.mark.asyncio
+async def test_truncated_body_is_not_cached(tmp_path):
+    seen = {"chunks": 0}
+    cache = ResponseCache(tmp_path)
+    async with TestServer(make_app(seen)) as server, aiohttp.ClientSession() as session:
+        url = str(server.make_url("/big"))
+        fetcher = Fetcher(session, "test", 30, "read-write", cache, max_bytes=1000)
+        big = await fetcher.fetch(url)
+        assert big.truncated and len(big.text) == 1000
+
+        offline = await Fetcher(session, "test", 30, "offline", cache).fetch(url)
+        assert not offline.ok and not offline.from_cache
+    assert cache.stored == 0
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_compression_is_negotiated_and_counted():
+    seen = {"chunks": 0}
+    async with TestServer(make_app(seen)) as server, aiohttp.ClientSession() as session:
+        fetcher = Fetcher(session, "test", 30)
+        result = await fetcher.fetch(str(server.make_url("/compressed")))
+    assert result.text == PAGE
+    assert "gzip" in seen["accept_encoding"]
+    assert fetcher.transfer["bytes"] == len(PAGE)
+    assert fetcher.transfer["compression_saved"] > len(PAGE) // 2
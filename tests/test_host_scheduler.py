@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from omni_scraper.core.host_scheduler import HostScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_cooling_host_does_not_block_other_hosts():
+    clock = FakeClock()
+    sched = HostScheduler(delay=10, clock=clock)
+    for url in ["http://a.onion/1", "http://a.onion/2", "http://b.onion/1"]:
+        sched.put_nowait((url, 0))
+
+    assert (await sched.get())[0] == "http://a.onion/1"
+    sched.release("http://a.onion/1")
+    # a.onion is cooling down, so the next worker is handed b.onion
+    assert (await sched.get())[0] == "http://b.onion/1"
+    assert sched.queue_depths() == {"a.onion": 1}
+
+    clock.now += 10
+    assert (await sched.get())[0] == "http://a.onion/2"
+    assert sched.stats()["politeness_wait_by_host"] == {"a.onion": 10.0}
+
+
+@pytest.mark.asyncio
+async def test_per_host_concurrency_limit():
+    sched = HostScheduler(delay=0, per_host_concurrency=1)
+    sched.put_nowait(("http://a.onion/1", 0))
+    sched.put_nowait(("http://a.onion/2", 0))
+    await sched.get()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(sched.get(), timeout=0.05)
+    sched.release("http://a.onion/1")
+    assert (await asyncio.wait_for(sched.get(), timeout=1))[0] == "http://a.onion/2"
+
+
+@pytest.mark.asyncio
+async def test_join_waits_for_task_done():
+    sched = HostScheduler()
+    sched.put_nowait(("http://a.onion/", 0))
+    await sched.get()
+    joiner = asyncio.ensure_future(sched.join())
+    await asyncio.sleep(0)
+    assert not joiner.done()
+    sched.task_done()
+    await asyncio.wait_for(joiner, timeout=1)
+    assert sched.empty()
+
+
+@pytest.mark.asyncio
+async def test_priority_order_within_and_across_hosts():
+    clock = FakeClock()
+    sched = HostScheduler(delay=10, clock=clock)
+    sched.put_nowait(("http://a.onion/low", 1), priority=1)
+    sched.put_nowait(("http://b.onion/mid", 1), priority=5)
+    sched.put_nowait(("http://a.onion/fifo-1", 1))
+    sched.put_nowait(("http://a.onion/fifo-2", 1))
+    # Arrives while a.onion is already waiting: a.onion moves ahead of b.onion
+    sched.put_nowait(("http://a.onion/top", 1), priority=9)
+
+    assert (await sched.get())[0] == "http://a.onion/top"
+    sched.release("http://a.onion/top")
+    assert (await sched.get())[0] == "http://b.onion/mid"
+    sched.release("http://b.onion/mid")
+    clock.now += 10
+    assert (await sched.get())[0] == "http://a.onion/low"
+    sched.release("http://a.onion/low", cooldown=False)
+    assert (await sched.get())[0] == "http://a.onion/fifo-1"
+    assert sched.snapshot() == [("http://a.onion/fifo-2", 1)]
@@ -0,0 +1,67 @@
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.fetcher import Fetcher
+from omni_scraper.core.http_cache import ResponseCache
+
+BODY = "<html>" + "x" * 1000 + "</html>"
+
+
+def make_app(log):
+    async def page(request):
+        log.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text=BODY, content_type="text/html", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_revalidation_and_offline(tmp_path):
+    log = []
+    cache = ResponseCache(tmp_path)
+    async with TestServer(make_app(log)) as server, aiohttp.ClientSession() as session:
+        url = str(server.make_url("/page"))
+        fetcher = Fetcher(session, "test", 10, "read-write", cache)
+        first = await fetcher.fetch(url)
+        second = await fetcher.fetch(url)
+        assert first.text == second.text == BODY
+        assert not first.from_cache and second.from_cache
+        assert log == [None, '"v1"']
+
+        offline = Fetcher(session, "test", 10, "offline", cache)
+        assert (await offline.fetch(url)).text == BODY
+        missing = await offline.fetch(str(server.make_url("/other")))
+        assert missing.text is None and len(log) == 2
+
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2 and stats["revalidated"] == 1
+    assert stats["bytes_saved"] == 2 * len(BODY)
+
+
+def test_lru_eviction_by_size(tmp_path):
+    import os
+
+    cache = ResponseCache(tmp_path, max_bytes=5000)
+    for i in range(5):
+        cache.put(f"http://a.onion/{i}", 200, os.urandom(2000).hex())
+    assert cache.stats()["size_bytes"] <= 5000
+    assert cache.get("http://a.onion/0") is None
+    assert cache.get("http://a.onion/4") is not None
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(tmp_path, max_age=1e-9)
+    cache.put("http://a.onion/", 200, "old", etag='"x"')
+    assert cache.get("http://a.onion/") is None
+    assert cache.stats()["size_bytes"] == 0
+
+
+def test_unknown_cache_mode():
+    with pytest.raises(ValueError):
+        Fetcher(None, "test", 10, "sometimes")
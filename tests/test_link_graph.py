@@ -0,0 +1,93 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.link_graph import LinkGraph, pagerank, rank_hosts
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+
+
+def build():
+    graph = LinkGraph()
+    graph.add_page("http://hub.onion/", [
+        "http://a.onion/", "http://b.onion/", "http://a.onion/", "http://hub.onion/",
+    ])
+    graph.add_page("http://a.onion/", ["http://hub.onion/x", "http://b.onion/"])
+    graph.add_page("http://b.onion/", ["http://hub.onion/", "http://c.onion/"])
+    return graph
+
+
+def test_csr_layout_and_roundtrip(tmp_path):
+    graph = build()
+    assert graph.pages == 3
+    assert graph.nodes == 5  # c.onion and hub.onion/x were never crawled
+    assert graph.edges == 6  # repeats and the self-link dropped
+    assert list(graph.indptr) == [0, 2, 4, 6]
+    assert [graph.urls[t] for t in graph.indices[0:2]] == ["http://a.onion/", "http://b.onion/"]
+    assert graph.hosts == ["hub.onion", "a.onion", "b.onion", "c.onion"]
+
+    loaded = LinkGraph.load(graph.save(tmp_path / "links.graph"))
+    for name in ("urls", "hosts", "url_host", "row_node", "indptr", "indices"):
+        assert getattr(loaded, name) == getattr(graph, name), name
+    merged = LinkGraph()
+    merged.update(loaded)
+    merged.add_page("http://c.onion/", ["http://hub.onion/"])
+    assert merged.pages == 4 and merged.nodes == 5
+
+
+def test_pagerank_matches_reference():
+    np = pytest.importorskip("numpy")
+    src = np.array([0, 0, 1, 2, 2])
+    dst = np.array([1, 2, 2, 0, 3])  # node 3 has no out-links
+    ranks, iterations = pagerank(src, dst, 4)
+    assert iterations < 100
+    assert ranks.sum() == pytest.approx(1.0)
+
+    # Plain dense power iteration with the same dangling-node handling
+    rank = [0.25] * 4
+    out = {0: [1, 2], 1: [2], 2: [0, 3], 3: []}
+    for _ in range(200):
+        new = [0.15 / 4 + 0.85 * sum(rank[n] for n in out if not out[n]) / 4] * 4
+        for node, targets in out.items():
+            for t in targets:
+                new[t] += 0.85 * rank[node] / len(targets)
+        rank = new
+    assert list(ranks) == pytest.approx(rank, abs=1e-8)
+
+
+def test_rank_hosts():
+    pytest.importorskip("numpy")
+    rows = rank_hosts(build())
+    assert rows[0]["host"] == "hub.onion"
+    by_host = {row["host"]: row for row in rows}
+    assert by_host["hub.onion"]["in_degree"] == 2
+    assert by_host["hub.onion"]["inbound_links"] == 2
+    assert by_host["b.onion"]["in_degree"] == 2
+    assert by_host["c.onion"] == {
+        "host": "c.onion", "pagerank": by_host["c.onion"]["pagerank"],
+        "in_degree": 1, "inbound_links": 1, "out_degree": 0, "pages": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_crawler_records_link_graph(tmp_path):
+    async def page(request):
+        n = int(request.match_info["n"])
+        links = "".join(f'<a href="/p/{c}#top">x</a>' for c in (n + 1, n + 2))
+        return web.Response(text=f"<html>{links}</html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/p/{n}", page)
+    path = tmp_path / "links.graph"
+    async with TestServer(app) as server:
+        crawler = AsyncWebCrawler(
+            seeds=[str(server.make_url("/p/0"))], max_depth=2, use_tor=False, link_graph=path
+        )
+        crawler.onion_only = False
+        crawler.delay = 0
+        crawler.near_dups = None  # the pages are near-identical
+        await crawler.run()
+    graph = LinkGraph.load(path)
+    assert graph.pages == crawler.pages == 5  # /p/0 to /p/4
+    assert graph.edges == 10
+    assert graph.nodes == 7  # /p/5 and /p/6 were beyond max_depth
+    assert all("#" not in url for url in graph.urls)
@@ -0,0 +1,54 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.link_scorer import LinkScorer
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+
+
+def test_signals_order_urls():
+    scorer = LinkScorer()
+    plain = scorer.score("http://a.onion/page", 1)
+    assert scorer.score("http://new.onion/page", 1) > scorer.score("http://a.onion/page2", 1)
+    assert scorer.score("http://a.onion/x", 1, parent_emails=4) > plain
+    assert scorer.score("http://a.onion/y", 1, anchor="Contact the team") > plain
+    assert scorer.score("http://a.onion/staff/contact", 1) > plain
+    assert scorer.score("http://a.onion/login", 1) < plain
+    assert scorer.score("http://a.onion/logo.png", 1) < plain
+    assert scorer.score("http://deep.onion/", 3) < scorer.score("http://shallow.onion/", 1)
+
+
+def test_empty_pattern_lists_disable_matching():
+    scorer = LinkScorer(keywords=[], url_patterns=[], avoid_patterns=[])
+    assert scorer.score("http://a.onion/contact/login", 0, anchor="contact") == 2.0
+
+
+@pytest.mark.asyncio
+async def test_priority_crawl_fetches_promising_links_first():
+    async def page(request):
+        name = request.match_info["name"]
+        if name == "index":
+            links = "".join(f'<a href="/filler{n}">more</a>' for n in range(10))
+            links += '<a href="/x">Contact the staff</a>'
+            return web.Response(text=f"<html>{links}</html>", content_type="text/html")
+        body = "admin@x.onion" if name == "x" else name
+        return web.Response(text=f"<html>{body}</html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{name}", page)
+    async with TestServer(app) as server:
+        fetched = {}
+        for frontier in ("fifo", "priority"):
+            crawler = AsyncWebCrawler(
+                seeds=[str(server.make_url("/index"))], concurrency=1, max_pages=2,
+                use_tor=False, frontier=frontier,
+            )
+            crawler.onion_only = False
+            crawler.delay = 0
+            crawler.adaptive = False
+            results = await crawler.run()
+            fetched[frontier] = [r["url"].rsplit("/", 1)[1] for r in results]
+    assert fetched["fifo"] == ["index", "filler0"]
+    assert fetched["priority"] == ["index", "x"]
+    with pytest.raises(ValueError):
+        AsyncWebCrawler(frontier="random")
@@ -0,0 +1,66 @@
+import logging
+import queue
+import subprocess
+import sys
+
+from omni_scraper.utils.logger import RateLimitFilter, _QueueHandler
+
+
+def _record(msg, *args, level=logging.INFO):
+    return logging.LogRecord("omni_scraper.t", level, __file__, 1, msg, args, None)
+
+
+def test_queue_handler_defers_formatting():
+    class Url:
+        calls = 0
+
+        def __str__(self):
+            Url.calls += 1
+            return "http://a.onion/"
+
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("omni_scraper.test_queue_handler")
+    logger.propagate = False
+    logger.addHandler(_QueueHandler(records))
+    logger.warning("Fetched %s", Url())
+    record = records.get_nowait()
+    assert Url.calls == 0  # nothing formatted on the caller's side
+    assert record.getMessage() == "Fetched http://a.onion/"
+
+
+def test_rate_limit_filter_counts_suppressed():
+    rate_filter = RateLimitFilter(rate=0.001, burst=3)
+    passed = [rate_filter.filter(_record("Fetched %s", n)) for n in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    # Other templates, argument-less messages and errors have their own allowance
+    assert rate_filter.filter(_record("Near-duplicate %s of %s", "a", "b"))
+    assert all(rate_filter.filter(_record("Crawl done")) for _ in range(10))
+    assert all(rate_filter.filter(_record("Failed %s", n, level=logging.ERROR)) for n in range(10))
+
+    bucket, _ = rate_filter._buckets[("omni_scraper.t", logging.INFO, "Fetched %s")]
+    bucket.tokens = 1
+    record = _record("Fetched %s", 10)
+    assert rate_filter.filter(record)
+    assert record.getMessage() == "Fetched 10 (+7 similar suppressed)"
+
+
+def test_logging_thread_writes_and_drains(tmp_path):
+    script = (
+        "from omni_scraper.config.settings import config\n"
+        "from omni_scraper.utils.logger import setup_logger, stop_logging\n"
+        "config.config['logging'].update(queue=True, rate_limit=1, burst=5, file='t.log')\n"
+        f"config.base_dir = {str(tmp_path)!r}\n"
+        "log = setup_logger('omni_scraper.t')\n"
+        "for n in range(100):\n"
+        "    log.info('Fetched %s', n)\n"
+        "log.info('Crawl finished')\n"
+        "stop_logging()\n"
+        "log.info('After %s', 'stop')\n"
+    )
+    subprocess.run([sys.executable, "-c", script], capture_output=True, check=True)
+    lines = (tmp_path / "logs" / "t.log").read_text().splitlines()
+    fetched = [line for line in lines if " - Fetched " in line]
+    assert [line.rsplit(" ", 1)[1] for line in fetched[:5]] == ["0", "1", "2", "3", "4"]
+    assert len(fetched) < 10
+    assert lines[-2].endswith("Crawl finished")
+    assert lines[-1].endswith("After stop")  # written directly once the thread is gone
@@ -0,0 +1,83 @@
+import json
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.metrics import Histogram, Metrics, MetricsExporter
+from omni_scraper.core.parse_pool import ParsePool
+from omni_scraper.modules.async_scraper import AsyncScraper
+
+
+def test_histogram_quantiles():
+    hist = Histogram()
+    for ms in range(1, 101):
+        hist.observe(ms / 1000)
+    assert hist.count == 100
+    assert hist.max == 0.1
+    assert 0.025 < hist.quantile(0.5) <= 0.05
+    assert 0.05 < hist.quantile(0.99) <= 0.1
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_metrics_fold_extra_hosts_and_export_prometheus():
+    metrics = Metrics(max_hosts=2)
+    for host in ("a.onion", "b.onion", "c.onion", "d.onion"):
+        metrics.observe("fetch", 0.2, host)
+        metrics.inc("requests", host=host)
+    snap = metrics.snapshot(per_host=True)
+    assert snap["counters"] == {"requests": 4}
+    assert snap["stages"]["fetch"]["count"] == 4
+    assert set(snap["hosts"]) == {"a.onion", "b.onion", "other"}
+    assert snap["hosts"]["other"]["counters"]["requests"] == 2
+    text = metrics.prometheus()
+    assert 'omni_scraper_stage_seconds_bucket{stage="fetch",host="all",le="+Inf"} 4' in text
+    assert 'omni_scraper_stage_seconds_count{stage="fetch",host="other"} 2' in text
+    assert 'omni_scraper_events_total{event="requests",host="a.onion"} 1' in text
+    assert json.loads(metrics.stats_line())["stages"]["fetch"]["count"] == 4
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_scraper_records_stages(tmp_path):
+    async def page(request):
+        return web.Response(text="<p>me@x.onion</p>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{n}", page)
+    scraper = AsyncScraper(use_tor=False, parse_pool=ParsePool(workers=0))
+    scraper.adaptive = False
+    async with TestServer(app) as server:
+        urls = [str(server.make_url(f"/{n}")) for n in range(5)]
+        results = [r async for r in scraper.scrape_many(urls, concurrency=2)]
+    assert len(results) == 5
+    snap = scraper.metrics.snapshot(per_host=True)
+    for stage in ("connect", "ttfb", "download", "fetch", "parse", "extract", "parse_wait"):
+        assert snap["stages"][stage]["count"] >= 1, stage
+    assert snap["stages"]["fetch"]["count"] == 5
+    assert snap["counters"]["requests"] == 5
+    assert snap["counters"]["responses_2xx"] == 5
+    assert snap["counters"]["connections_created"] <= 2
+    assert snap["hosts"]["127.0.0.1"]["counters"]["requests"] == 5
+
+    port = _free_port()
+    prom = tmp_path / "metrics.prom"
+    summary = tmp_path / "summary.json"
+    exporter = MetricsExporter(
+        scraper.metrics, interval=0, prometheus_file=prom, prometheus_port=port,
+        summary_file=summary,
+    )
+    async with exporter:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as resp:
+                served = await resp.text()
+    assert 'event="responses_2xx",host="all"} 5' in served
+    assert prom.read_text().startswith("# HELP omni_scraper_stage_seconds")
+    assert "127.0.0.1" in json.loads(summary.read_text())["hosts"]
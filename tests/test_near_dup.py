@@ -0,0 +1,71 @@
+import csv
+import random
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.near_dup import SimHashIndex, simhash, threshold_to_distance
+from omni_scraper.modules.async_web_crawler import RESULT_FIELDS, AsyncWebCrawler
+from omni_scraper.utils.output_handler import StreamingSink
+
+rnd = random.Random(7)
+WORDS = [f"w{rnd.randint(0, 5000)}" for _ in range(2000)]
+TEXT = " ".join(WORDS)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def test_simhash_near_and_far():
+    edited = " ".join(WORDS[:1000] + ["mirror", "banner"] + WORDS[1000:])
+    other = " ".join(reversed(WORDS))
+    assert hamming(simhash(TEXT), simhash(edited)) <= 3
+    assert hamming(simhash(TEXT), simhash(other)) > 10
+    assert simhash("") == 0
+
+
+def test_index_finds_within_distance_only():
+    index = SimHashIndex(max_distance=3)
+    fp = simhash(TEXT)
+    index.add(fp, "http://a.onion/")
+    assert index.find(fp ^ 0b101) == "http://a.onion/"
+    assert index.find(fp ^ 0b11111) is None
+    assert threshold_to_distance(0.95) == 3
+
+
+@pytest.mark.asyncio
+async def test_crawler_marks_mirrors_and_skips_their_links(tmp_path):
+    body = f"<p>{TEXT}</p>"
+
+    async def index(request):
+        return web.Response(
+            text='<a href="/page?ref=1">a</a><a href="/mirror">b</a>', content_type="text/html"
+        )
+
+    async def page(request):
+        extra = '<a href="/only-from-mirror">x</a>' if request.path == "/mirror" else ""
+        return web.Response(text=body + extra, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", index)
+    app.router.add_get("/{name}", page)
+    async with TestServer(app) as server:
+        sink = StreamingSink(tmp_path / "crawl", "csv", fields=RESULT_FIELDS)
+        crawler = AsyncWebCrawler(use_tor=False, max_depth=3, sink=sink)
+        crawler.delay = 0
+        crawler.onion_only = False
+        crawler.parse_workers = 0
+        results = await crawler.run([str(server.make_url("/"))])
+        sink.close()
+
+    urls = {r["url"].split("/", 3)[-1]: r for r in results}
+    assert set(urls) == {"", "page?ref=1", "mirror"}
+    assert crawler.duplicates == 1
+    dup = [r for r in results if "duplicate_of" in r]
+    assert len(dup) == 1
+    # The mirror is never the first result, but its column is still written
+    with open(sink.paths[0], newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["duplicate_of"] for r in rows if r["duplicate_of"]] == [dup[0]["duplicate_of"]]
@@ -1,5 +1,81 @@
-from omni_scraper.utils.output_handler import OutputHandler
+import csv
+import gzip
+import json
+
+import pytest
+
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+from omni_scraper.utils.output_handler import OutputHandler, StreamingSink
 
 def test_output_handler_creation():
     handler = OutputHandler()
     assert handler is not None
+
+
+def test_save_jsonl_writes_json_lines(tmp_path):
+    handler = OutputHandler()
+    handler.format, handler.dir = "jsonl", tmp_path
+    one = handler.save("single", {"ip": "1.2.3.4", "ports": [80]})
+    many = handler.save("many", [{"url": "a"}, {"url": "b"}])
+    assert _read_jsonl([one]) == [{"ip": "1.2.3.4", "ports": [80]}]
+    assert _read_jsonl([many]) == [{"url": "a"}, {"url": "b"}]
+
+
+def _read_jsonl(paths):
+    rows = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def test_streaming_sink_jsonl_gzip_rotation(tmp_path):
+    with StreamingSink(tmp_path / "crawl", "jsonl", "gzip", rotate_bytes=200, buffer_size=100) as sink:
+        for i in range(50):
+            sink.write({"url": f"http://x{i}.onion/", "emails": [f"a{i}@x.onion"]})
+    assert len(sink.paths) > 1
+    assert all(p.endswith(".jsonl.gz") for p in sink.paths)
+    assert [r["url"] for r in _read_jsonl(sink.paths)] == [f"http://x{i}.onion/" for i in range(50)]
+
+
+def test_streaming_sink_csv_header_per_part(tmp_path):
+    with StreamingSink(tmp_path / "crawl", "csv", rotate_bytes=60, buffer_size=1) as sink:
+        for i in range(5):
+            sink.write({"url": f"http://x{i}.onion/", "emails": ["a@b.onion"]})
+    for path in sink.paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["url", "emails"]
+        assert json.loads(rows[1][1]) == ["a@b.onion"]
+
+
+def test_streaming_sink_csv_columns(tmp_path):
+    with StreamingSink(tmp_path / "given", "csv", fields=["url", "duplicate_of"]) as sink:
+        sink.write({"url": "http://a.onion/", "snippet": "left out"})
+        sink.write({"url": "http://b.onion/", "duplicate_of": "http://a.onion/"})
+    with open(sink.paths[0], newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        ["url", "duplicate_of"], ["http://a.onion/", ""], ["http://b.onion/", "http://a.onion/"]
+    ]
+
+    with StreamingSink(tmp_path / "inferred", "csv") as sink:
+        sink.write({"url": "http://a.onion/"})
+        with pytest.raises(ValueError, match="duplicate_of"):
+            sink.write({"url": "http://b.onion/", "duplicate_of": "http://a.onion/"})
+
+
+def test_crawler_streams_without_keeping_results(tmp_path):
+    class ListSink:
+        def __init__(self):
+            self.rows = []
+
+        def write(self, record):
+            self.rows.append(record)
+
+    sink = ListSink()
+    crawler = AsyncWebCrawler(use_tor=False, sink=sink, keep_results=False)
+    crawler._emit({"url": "http://a.onion/"})
+    assert sink.rows == [{"url": "http://a.onion/"}]
+    assert crawler.results == [] and crawler.pages == 1
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from omni_scraper.core import parse_pool
+from omni_scraper.core.parse_pool import ParsePool
+
+HTML = (
+    '<html><body><p>Mail admin@example.com</p>'
+    '<a href="/about">About</a><a href="http://x.onion/">X</a></body></html>'
+)
+
+
+@pytest.mark.asyncio
+async def test_process_pool_parse():
+    async with ParsePool(workers=1, backend="html.parser") as pool:
+        pages = await asyncio.gather(*(pool.parse(HTML, "http://abc.onion/") for _ in range(4)))
+    assert all(p["links"][0] == "http://abc.onion/about" for p in pages)
+    assert pool.parsed == 4
+
+
+@pytest.mark.asyncio
+async def test_pending_pages_are_bounded(monkeypatch):
+    calls = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow_extract(*args):
+        with lock:
+            calls["running"] += 1
+            calls["peak"] = max(calls["peak"], calls["running"])
+        time.sleep(0.02)
+        with lock:
+            calls["running"] -= 1
+        return {}
+
+    monkeypatch.setattr(parse_pool, "extract_page", slow_extract)
+    pool = ParsePool(workers=1, max_pending=2)
+    # Threads stand in for worker processes; more of them than the bound
+    pool._executor = ThreadPoolExecutor(max_workers=8)
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, pool.pending)
+            await asyncio.sleep(0.001)
+
+    watcher = asyncio.ensure_future(watch())
+    await asyncio.gather(*(pool.parse(HTML, "http://abc.onion/") for _ in range(10)))
+    watcher.cancel()
+    pool.close()
+    assert peak == 2 and calls["peak"] == 2
+    assert pool.parsed == 10 and pool.pending == 0
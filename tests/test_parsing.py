@@ -0,0 +1,58 @@
+import pytest
+
+from omni_scraper.utils.parsing import available_backends, extract_page, resolve_backend
+
+HTML = """<html><head><title>Index</title></head><body>
+<p>Mail admin@example.com &amp; friends</p>
+<a href="/about">About</a> <a href="/about">About again</a>
+<a href="http://x.onion/">X</a> <a href="mailto:ops@abc.onion?subject=hi">ops</a>
+<!-- hidden@example.com -->
+</body></html>"""
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_extract_page_backends(backend):
+    page = extract_page(HTML, "http://abc.onion/index", backend, snippet_len=20)
+    assert page["links"] == ["http://abc.onion/about", "http://x.onion/"]
+    assert page["emails"] == ["admin@example.com", "ops@abc.onion"]
+    assert "friends" in page["text"] and "&" in page["text"]
+    assert "hidden@example.com" not in page["text"]
+    assert len(page["snippet"]) == 20
+    assert "anchors" not in page
+    anchors = extract_page(HTML, "http://abc.onion/index", backend, anchors=True)["anchors"]
+    assert anchors == {"http://abc.onion/about": "About About again", "http://x.onion/": "X"}
+
+
+ORDER_HTML = (
+    "<html><body><p>Hello <b>bold</b> world<i>x</i> tail <!-- c --> "
+    '<a href="/a">link <em>deep</em></a> end</p><div>next<span>block</span></div></body></html>'
+)
+
+
+def test_backends_agree_on_text_order():
+    pages = [
+        extract_page(ORDER_HTML, "http://abc.onion/", backend, fingerprint=True)
+        for backend in available_backends()
+    ]
+    words = {" ".join(page["text"].split()) for page in pages}
+    assert words == {"Hello bold world x tail link deep end next block"}
+    assert len({page["simhash"] for page in pages}) == 1
+
+
+def test_each_href_resolved_once(monkeypatch):
+    import omni_scraper.utils.parsing as parsing
+
+    calls = []
+    monkeypatch.setattr(parsing, "normalize_url", lambda base, link: calls.append(link) or base + link)
+    extract_page(HTML, "http://abc.onion", "html.parser")
+    assert calls == ["/about", "http://x.onion/"]
+
+
+def test_empty_document():
+    for backend in available_backends():
+        assert extract_page("", "http://abc.onion/", backend)["links"] == []
+
+
+def test_resolve_backend_rejects_unknown():
+    with pytest.raises(ValueError):
+        resolve_backend("regex")
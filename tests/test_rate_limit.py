@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import pytest
+
+from omni_scraper.core.rate_limit import TokenBucket, backoff_delay, parse_retry_after
+
+
+def test_token_bucket_burst_then_refill():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=3, clock=lambda: now[0])
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == pytest.approx(0.5)
+    now[0] = 0.5
+    assert bucket.try_acquire()
+    bucket.pause(10)
+    now[0] = 5.0
+    assert not bucket.try_acquire()
+    assert bucket.wait_time() == pytest.approx(5.5)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_waiters():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+    # One token up front, then five more at 20 ms each
+    assert time.monotonic() - start >= 0.09
+
+
+def test_retry_after_and_backoff():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert [backoff_delay(a, 1, 10) for a in range(5)] == [1, 2, 4, 8, 10]
+    assert backoff_delay(0, 1, 10, retry_after=5) == 5
+    assert backoff_delay(0, 1, 10, retry_after=30) == 10
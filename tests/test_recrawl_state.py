@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.config.settings import config
+from omni_scraper.core.recrawl_state import RecrawlStore, content_hash
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+
+HOUR = 3600
+
+
+def test_intervals_adapt_to_changes(tmp_path):
+    store = RecrawlStore(
+        tmp_path / "r.sqlite3", initial=24 * HOUR, minimum=6 * HOUR, maximum=48 * HOUR
+    )
+    url = "http://a.onion/"
+    assert store.record(url, 2, "h1", ["http://a.onion/x"], now=0) == "new"
+    assert store.get(url)["next_due"] == 24 * HOUR
+    assert store.record(url, 1, "h1", now=24 * HOUR) == "unchanged"
+    state = store.get(url)
+    assert state["interval"] == 36 * HOUR
+    assert state["links"] == ["http://a.onion/x"]  # kept when not given
+    assert state["depth"] == 1
+    assert store.record(url, 1, "h1", now=60 * HOUR) == "unchanged"
+    assert store.get(url)["interval"] == 48 * HOUR  # capped
+    for now in (108, 132, 156):
+        assert store.record(url, 1, f"h{now}", now=now * HOUR) == "changed"
+    state = store.get(url)
+    assert state["interval"] == 6 * HOUR  # 24, 12, then floored at 6
+    # history, newest fetch lowest: 3 changes, 2 unchanged, first fetch (new)
+    assert (state["fetches"], state["changes"], state["history"]) == (6, 3, 0b100111)
+    assert state["last_changed"] == 156 * HOUR
+
+    store.record("http://b.onion/", 0, "b", now=0)
+    assert store.due(now=30 * HOUR) == [("http://b.onion/", 0)]
+    assert store.stats(now=30 * HOUR)["pages"] == 2
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_incremental_crawl_skips_unchanged_pages(tmp_path, monkeypatch):
+    monkeypatch.setitem(config.config["incremental"], "path", str(tmp_path / "r.sqlite3"))
+    pages = {"index": '<a href="/a">a</a> <a href="/b">b</a>', "a": "alpha", "b": "beta"}
+    hits = []
+
+    async def page(request):
+        name = request.match_info["name"]
+        hits.append(name)
+        return web.Response(text=f"<html>{pages[name]}</html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{name}", page)
+
+    async with TestServer(app) as server:
+        async def crawl():
+            hits.clear()
+            crawler = AsyncWebCrawler(
+                seeds=[str(server.make_url("/index"))], use_tor=False, incremental=True
+            )
+            crawler.onion_only = False
+            crawler.delay = 0
+            crawler.near_dups = None
+            results = await crawler.run()
+            return {r["url"].rsplit("/", 1)[1]: r["change"] for r in results}, crawler
+
+        first, _ = await crawl()
+        assert first == {"index": "new", "a": "new", "b": "new"}
+
+        # Nothing is due yet: no requests, nothing emitted, links still walked
+        second, crawler = await crawl()
+        assert second == {} and hits == []
+        assert crawler.changes["not_due"] == 3
+
+        with sqlite3.connect(tmp_path / "r.sqlite3") as conn:
+            conn.execute("UPDATE pages SET next_due = 0")
+        pages["b"] = "beta v2"
+        pages["index"] += ' <a href="/c">c</a>'
+        pages["c"] = "gamma"
+        third, crawler = await crawl()
+        assert third == {"index": "changed", "b": "changed", "c": "new"}
+        assert sorted(hits) == ["a", "b", "c", "index"]
+        assert crawler.changes["unchanged"] == 1
+        a_url, b_url = str(server.make_url("/a")), str(server.make_url("/b"))
+
+    store = RecrawlStore(tmp_path / "r.sqlite3")
+    a = store.get(a_url)
+    assert a["content_hash"] == content_hash("<html>alpha</html>")
+    assert a["interval"] > store.get(b_url)["interval"]
+    store.close()
@@ -0,0 +1,44 @@
+import time
+
+from omni_scraper.core.result_cache import MISS, ResultCache, lookup_key
+
+
+def test_key_normalizes_query_and_params():
+    assert lookup_key("shodan_search", " port:80  org:x ", {"b": 1, "a": 2}) == lookup_key(
+        "shodan_search", "port:80 org:x", {"a": 2, "b": 1}
+    )
+    assert lookup_key("intelx", "a@b.com") != lookup_key("shodan_host", "a@b.com")
+
+
+def test_ttl_negative_ttl_and_stats(tmp_path):
+    cache = ResultCache(
+        tmp_path / "lookups.sqlite3", ttl={"intelx": 60}, negative_ttl=0.05
+    )
+    cache.put("intelx", "a@b.com", [{"source": "x"}])
+    cache.put("intelx", "none@b.com", [])
+    assert cache.get("intelx", "a@b.com") == [{"source": "x"}]
+    assert cache.get("intelx", "none@b.com") == []
+    time.sleep(0.1)
+    assert cache.get("intelx", "none@b.com") is MISS
+    assert cache.get("intelx", "a@b.com") == [{"source": "x"}]
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 1
+    assert stats["by_service"]["intelx"] == {"hits": 3, "misses": 1}
+    cache.close()
+
+
+def test_lru_eviction_and_refresh(tmp_path):
+    path = tmp_path / "lookups.sqlite3"
+    cache = ResultCache(path, max_bytes=3500)
+    for n in range(3):
+        cache.put("shodan_host", f"10.0.0.{n}", {"data": "x" * 1000})
+        time.sleep(0.01)
+    cache.get("shodan_host", "10.0.0.0")  # now most recently used
+    cache.put("shodan_host", "10.0.0.9", {"data": "x" * 1000})
+    assert cache.get("shodan_host", "10.0.0.1") is MISS
+    assert cache.get("shodan_host", "10.0.0.0") is not MISS
+    cache.close()
+
+    refreshing = ResultCache(path, refresh=True)
+    assert refreshing.get("shodan_host", "10.0.0.0") is MISS
+    refreshing.close()
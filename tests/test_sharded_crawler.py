@@ -0,0 +1,135 @@
+import asyncio
+import sqlite3
+from collections import Counter
+
+import pytest
+from aiohttp import web
+
+from omni_scraper.core.recrawl_state import RecrawlStore
+from omni_scraper.modules.sharded_crawler import ShardedCrawler, shard_of
+
+HOSTS = [f"127.0.0.{n}" for n in range(1, 5)]
+OVERRIDES = {
+    "crawler": {"onion_only": False, "request_delay": 0, "parse_workers": 0},
+    "metrics": {"enabled": False},
+    "logging": {"level": "ERROR"},
+}
+
+
+async def start_site(pages):
+    """Page n links to pages 2n+1 and 2n+2, spread over four hosts on one port."""
+    port = None
+
+    def url(n):
+        return f"http://{HOSTS[n % len(HOSTS)]}:{port}/p/{n}"
+
+    async def page(request):
+        n = int(request.match_info["n"])
+        links = "".join(
+            f'<a href="{url(c)}">{c}</a>' for c in (2 * n + 1, 2 * n + 2) if c < pages
+        )
+        return web.Response(text=f"<html><body>{links}</body></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/p/{n}", page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, HOSTS[0], 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    for host in HOSTS[1:]:
+        await web.TCPSite(runner, host, port).start()
+    return runner, url
+
+
+def test_shard_of_is_stable_per_host():
+    owners = {shard_of(f"http://{h}:1/p/{n}", 3) for h in HOSTS[:1] for n in range(20)}
+    assert len(owners) == 1
+    assert shard_of("http://a.onion/x", 3) == shard_of("http://a.onion/y?q=1", 3)
+
+
+@pytest.mark.asyncio
+async def test_sharded_crawl_covers_site_once():
+    runner, url = await start_site(31)  # a full binary tree of depth 4
+    try:
+        crawler = ShardedCrawler(
+            2, seeds=[url(0)], max_depth=4, max_pages=100, use_tor=False, overrides=OVERRIDES
+        )
+        results = await asyncio.to_thread(crawler.run)
+    finally:
+        await runner.cleanup()
+    urls = Counter(r["url"] for r in results)
+    assert set(urls) == {url(n) for n in range(31)}
+    assert max(urls.values()) == 1
+    # Each page was fetched by the shard owning its host
+    owned = Counter(shard_of(u, 2) for u in urls)
+    assert {i: s["pages"] for i, s in crawler.shard_stats.items()} == {0: owned[0], 1: owned[1]}
+
+
+@pytest.mark.asyncio
+async def test_sharded_crawl_limits_hold_globally():
+    runner, url = await start_site(200)
+    try:
+        shallow = ShardedCrawler(
+            2, seeds=[url(0)], max_depth=2, max_pages=100, use_tor=False, overrides=OVERRIDES
+        )
+        shallow_results = await asyncio.to_thread(shallow.run)
+        capped = ShardedCrawler(
+            3, seeds=[url(0)], max_depth=10, max_pages=25, use_tor=False, overrides=OVERRIDES
+        )
+        capped_results = await asyncio.to_thread(capped.run)
+    finally:
+        await runner.cleanup()
+    assert {r["url"] for r in shallow_results} == {url(n) for n in range(7)}
+    assert len(capped_results) == 25
+
+
+@pytest.mark.asyncio
+async def test_sharded_incremental_crawl_shares_the_store(tmp_path):
+    path = tmp_path / "recrawl.sqlite3"
+    overrides = {**OVERRIDES, "incremental": {"path": str(path)}}
+    runner, url = await start_site(31)
+    try:
+        crawler = ShardedCrawler(
+            2, seeds=[url(0)], max_depth=4, max_pages=100, use_tor=False,
+            overrides=overrides, incremental=True,
+        )
+        results = await asyncio.to_thread(crawler.run)
+        store = RecrawlStore(path)
+        assert store.stats()["pages"] == 31  # every shard's records made it
+        assert store.get(url(0))["links"] == [url(1), url(2)]
+        store.close()
+
+        # Everything is due; the seed is a leaf, so only the due list leads
+        # to the other pages, and every shard must get its share of it
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE pages SET next_due = 0")
+        revisit = ShardedCrawler(
+            2, seeds=[url(30)], max_depth=4, max_pages=100, use_tor=False,
+            overrides=overrides, incremental=True,
+        )
+        assert await asyncio.to_thread(revisit.run) == []  # nothing changed
+    finally:
+        await runner.cleanup()
+    assert len(results) == 31 and {r["change"] for r in results} == {"new"}
+    store = RecrawlStore(path)
+    assert {store.get(url(n))["fetches"] for n in range(31)} == {2}
+    store.close()
+
+
+def test_coordinator_sends_due_pages_with_the_seeds(tmp_path):
+    path = tmp_path / "recrawl.sqlite3"
+    store = RecrawlStore(path)
+    for n in range(8):
+        store.record(f"http://{HOSTS[n % 4]}/p/{n}", 2, "h", now=0)
+    store.close()
+    crawler = ShardedCrawler(
+        2, seeds=["http://seed.onion/"], use_tor=False, incremental=True,
+        overrides={"incremental": {"path": str(path)}},
+    )
+    batches = crawler._initial_batches()
+    sent = sorted(item for batch in batches.values() for item in batch)
+    assert sent == sorted(
+        [("http://seed.onion/", 0, None)] + [(f"http://{HOSTS[n % 4]}/p/{n}", 2, None) for n in range(8)]
+    )
+    assert all(shard_of(url, 2) == owner for owner, batch in batches.items() for url, _, _ in batch)
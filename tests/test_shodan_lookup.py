@@ -1,5 +1,73 @@
 from omni_scraper.modules.shodan_lookup import ShodanLookup
+import pytest
+
 
 def test_shodan_lookup_creation():
     lookup = ShodanLookup()
     assert lookup is not None
+
+
+class FakeShodan:
+    def __init__(self, total):
+        self.total = total
+        self.pages = []
+        self.hosts = []
+
+    def search(self, query, page=1):
+        self.pages.append(page)
+        start = (page - 1) * 100
+        count = max(0, min(100, self.total - start))
+        matches = [
+            {"ip_str": f"10.0.{n // 256}.{n % 256}", "port": 80, "data": "x"}
+            for n in range(start, start + count)
+        ]
+        return {"total": self.total, "matches": matches}
+
+    def host(self, ip):
+        self.hosts.append(ip)
+        return {"ip_str": ip, "ports": [80]}
+
+
+def _lookup(monkeypatch, total=0):
+    from omni_scraper.config.settings import config
+    from omni_scraper.core.rate_limit import TokenBucket
+
+    monkeypatch.setitem(config.config["shodan"], "api_key", "test-key")
+    lookup = ShodanLookup()
+    lookup.client = FakeShodan(total)
+    lookup.bucket = TokenBucket(1000, 10)
+    return lookup
+
+
+def test_iter_search_walks_pages(monkeypatch):
+    lookup = _lookup(monkeypatch, total=250)
+    matches = list(lookup.iter_search("port:80"))
+    assert len(matches) == 250
+    assert lookup.client.pages == [1, 2, 3]
+
+    lookup.client.pages = []
+    assert len(list(lookup.iter_search("port:80", max_results=150))) == 150
+    assert lookup.client.pages == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_host_lookup_many_dedupes(monkeypatch):
+    lookup = _lookup(monkeypatch)
+    ips = ["8.8.8.8", " 8.8.8.8", "not-an-ip", "1.1.1.1", "8.8.8.8"]
+    results = [r async for r in lookup.host_lookup_many(ips, concurrency=2)]
+    assert sorted(lookup.client.hosts) == ["1.1.1.1", "8.8.8.8"]
+    assert len(results) == 3
+    assert [r["ip"] for r in results if "error" in r] == ["not-an-ip"]
+
+
+@pytest.mark.asyncio
+async def test_single_and_batch_lookups_share_cache_keys(monkeypatch, tmp_path):
+    from omni_scraper.core.result_cache import ResultCache
+
+    lookup = _lookup(monkeypatch)
+    lookup.cache = ResultCache(tmp_path / "lookups.sqlite3")
+    lookup.host_lookup(" 2001:DB8:0::1 ")
+    results = [r async for r in lookup.host_lookup_many(["2001:db8::1"])]
+    assert results == [{"ip": "2001:db8::1", "host": {"ip_str": "2001:db8::1", "ports": [80]}}]
+    assert lookup.client.hosts == ["2001:db8::1"]
+    lookup.cache.close()
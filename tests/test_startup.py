@@ -0,0 +1,53 @@
+import re
+import subprocess
+import sys
+
+from omni_scraper import cli
+from omni_scraper.core.http_cache import CACHE_MODES
+
+# Modules no command needs just to start (each is imported by the command using it)
+HEAVY = (
+    "aiohttp", "aiohttp_socks", "bs4", "dotenv", "lxml", "numpy", "requests",
+    "selectolax", "shodan", "stem", "yaml",
+)
+# Cumulative import time of omni_scraper.cli; click alone is most of it
+BUDGET_MS = 100
+
+
+def _python(*args):
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+
+
+def test_cli_import_is_lazy():
+    out = _python(
+        "-c",
+        "import logging, sys, omni_scraper.cli\n"
+        "from omni_scraper.config.settings import config\n"
+        f"heavy = {HEAVY!r}\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in heavy))\n"
+        "print(config._config is None)\n"
+        "print(bool(logging.getLogger('omni_scraper.cli').handlers))\n",
+    ).stdout.split("\n")
+    assert out[0] == "[]"
+    assert out[1] == "True"  # config not read yet
+    assert out[2] == "False"  # no log handlers opened yet
+
+
+def test_cli_import_time_budget():
+    timings = []
+    for _ in range(3):
+        stderr = _python("-X", "importtime", "-c", "import omni_scraper.cli").stderr
+        match = re.search(r"\|\s*(\d+)\s*\|\s*omni_scraper\.cli$", stderr, re.MULTILINE)
+        timings.append(int(match.group(1)) / 1000)
+    assert min(timings) < BUDGET_MS, f"omni_scraper.cli took {min(timings):.0f}ms to import"
+
+
+def test_help_runs_without_loading_commands():
+    out = _python("-m", "omni_scraper.cli", "--help").stdout
+    assert "crawl" in out and "breach-check" in out
+
+
+def test_cache_modes_match_http_cache():
+    assert cli.CACHE_MODES == CACHE_MODES
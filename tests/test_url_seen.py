@@ -0,0 +1,64 @@
+import pytest
+
+from omni_scraper.core.host_scheduler import HostScheduler
+from omni_scraper.core.url_seen import BloomFilter, FingerprintSet, make_seen_set
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+from omni_scraper.utils.helpers import canonicalize_url
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("HTTP://Abc.ONION:80/a?b=2&a=1#frag", "http://abc.onion/a?a=1&b=2"),
+        ("https://abc.onion", "https://abc.onion/"),
+        ("http://abc.onion:8080/x", "http://abc.onion:8080/x"),
+        ("http://[::1]:8080/x", "http://[::1]:8080/x"),
+        ("not a url", None),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_fingerprint_set_grows_and_dedups():
+    seen = FingerprintSet(capacity=4)
+    urls = [f"http://x.onion/{i}" for i in range(5000)]
+    assert all(seen.add(u) for u in urls)
+    assert not any(seen.add(u) for u in urls)
+    assert len(seen) == 5000
+    assert "http://x.onion/5000" not in seen
+    assert seen.memory_bytes() < 5000 * 32
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"http://x.onion/{i}")
+    assert all(f"http://x.onion/{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"http://y.onion/{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_make_seen_set_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        make_seen_set("trie")
+
+
+def test_crawler_dedups_at_enqueue_time():
+    crawler = AsyncWebCrawler(use_tor=False, max_depth=2)
+    crawler.scheduler = HostScheduler()
+    queued = [crawler._enqueue("http://hub.onion/#top", 1) for _ in range(500)]
+    assert queued.count(True) == 1
+    assert not crawler._enqueue("HTTP://HUB.onion:80/", 2)
+    assert not crawler._enqueue("http://deep.onion/", 3)
+    assert crawler.scheduler.qsize() == 1
+
+
+def test_crawler_fetches_links_as_written():
+    crawler = AsyncWebCrawler(use_tor=False)
+    crawler.scheduler = HostScheduler()
+    for url in ("http://a.onion/s?q=a+b&flag#x", "http://[::1]:8080/s?b=%20&a"):
+        assert crawler._enqueue(url, 0)
+    assert not crawler._enqueue("http://a.onion/s?flag=&q=a+b", 0)  # same canonical URL
+    queued = [url for url, _ in crawler.scheduler.snapshot()]
+    assert sorted(queued) == ["http://[::1]:8080/s?b=%20&a", "http://a.onion/s?q=a+b&flag"]
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from omni_scraper.core.parse_pool import ParsePool
+from omni_scraper.core.worker_pool import WorkerPool
+from omni_scraper.modules.async_web_crawler import AsyncWebCrawler
+
+
+def make_site(pages, fan_out, latency):
+    """Local stand-in site: /p/<n> links to the next ``fan_out`` pages."""
+    state = {"active": 0, "peak": 0, "hits": 0}
+
+    async def page(request):
+        n = int(request.match_info["n"])
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        state["hits"] += 1
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            state["active"] -= 1
+        links = "".join(
+            f'<a href="/p/{m}">page {m}</a>'
+            for m in range(n * fan_out + 1, n * fan_out + fan_out + 1)
+            if m < pages
+        )
+        return web.Response(text=f"<html><body>{links}</body></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/p/{n}", page)
+    return app, state
+
+
+def make_crawler(concurrency, max_pages):
+    crawler = AsyncWebCrawler(
+        use_tor=False, concurrency=concurrency, max_depth=10, max_pages=max_pages
+    )
+    crawler.delay = 0
+    crawler.per_host_concurrency = concurrency
+    # Fixed concurrency: the pool size is the limit
+    crawler.adaptive = False
+    crawler.onion_only = False
+    return crawler
+
+
+@pytest.mark.asyncio
+async def test_pool_survives_momentarily_empty_frontier():
+    queue = asyncio.Queue()
+    handled = []
+
+    async def handler(item):
+        await asyncio.sleep(0.01)
+        handled.append(item)
+        if item < 4:
+            # Children only appear after the parent finished
+            queue.put_nowait(item * 2 + 1)
+            queue.put_nowait(item * 2 + 2)
+
+    queue.put_nowait(0)
+    pool = WorkerPool(queue, handler, size=4)
+    await asyncio.wait_for(pool.run(), timeout=5)
+    assert sorted(handled) == list(range(9))
+    assert pool.peak_in_flight == 4
+
+
+@pytest.mark.asyncio
+async def test_pool_survives_failing_handler():
+    queue = asyncio.Queue()
+    handled = []
+
+    async def handler(item):
+        await asyncio.sleep(0)
+        if item % 2:
+            raise RuntimeError(f"boom {item}")
+        handled.append(item)
+
+    for item in range(10):
+        queue.put_nowait(item)
+    pool = WorkerPool(queue, handler, size=2)
+    await asyncio.wait_for(pool.run(), timeout=5)
+    assert sorted(handled) == [0, 2, 4, 6, 8]
+    assert (pool.handled, pool.failed) == (10, 5)
+
+
+@pytest.mark.asyncio
+async def test_crawler_keeps_all_workers_busy():
+    app, state = make_site(pages=60, fan_out=20, latency=0.05)
+    async with TestServer(app) as server:
+        crawler = make_crawler(concurrency=8, max_pages=1000)
+        results = await asyncio.wait_for(crawler.run([str(server.make_url("/p/0"))]), timeout=20)
+    assert len(results) == 60
+    assert state["peak"] == 8
+    assert crawler.pool.peak_in_flight == 8
+
+
+@pytest.mark.asyncio
+async def test_crawler_stops_cleanly_at_max_pages():
+    app, state = make_site(pages=200, fan_out=20, latency=0.01)
+    async with TestServer(app) as server:
+        crawler = make_crawler(concurrency=8, max_pages=25)
+        results = await asyncio.wait_for(crawler.run([str(server.make_url("/p/0"))]), timeout=20)
+    assert len(results) == 25
+    assert state["hits"] == 25
+
+
+@pytest.mark.asyncio
+async def test_crawler_cleans_up_after_a_failing_page(tmp_path, monkeypatch):
+    from omni_scraper.config.settings import config
+    from omni_scraper.core.recrawl_state import RecrawlStore
+
+    monkeypatch.setitem(config.config["incremental"], "path", str(tmp_path / "r.sqlite3"))
+    real_get = RecrawlStore.get
+
+    def get(store, url):
+        if url.endswith("/p/3"):
+            raise RuntimeError("store unavailable")
+        return real_get(store, url)
+
+    monkeypatch.setattr(RecrawlStore, "get", get)
+    app, state = make_site(pages=12, fan_out=3, latency=0)
+    async with TestServer(app) as server:
+        crawler = make_crawler(concurrency=1, max_pages=100)
+        crawler.incremental = True
+        crawler.per_host_concurrency = 1
+        real_parse = ParsePool.parse
+
+        async def parse(pool, html, url, **kwargs):
+            if url.endswith("/p/5"):
+                raise RuntimeError("parser crashed")
+            return await real_parse(pool, html, url, **kwargs)
+
+        monkeypatch.setattr(ParsePool, "parse", parse)
+        results = await asyncio.wait_for(crawler.run([str(server.make_url("/p/0"))]), timeout=10)
+    # /p/3 failed before its fetch (so its links /p/10 and /p/11 were never
+    # found), /p/5 after it; the host slot was freed both times
+    assert {r["url"].rsplit("/", 1)[1] for r in results} == {"0", "1", "2", "4", "6", "7", "8", "9"}
+    assert crawler.pool.failed == 2
+    assert crawler._in_flight == {}